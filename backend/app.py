@@ -1,15 +1,21 @@
-from flask import Flask, jsonify, send_file
+from flask import Flask, jsonify, request
 from flask_cors import CORS
-import pandas as pd
 import os
 import sys
 from pathlib import Path
 import threading
 import time
-import schedule
 import logging
-import requests
 import shutil
+import gzip
+import hashlib
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 # Set up logging
 log_dir = os.path.join(os.path.dirname(__file__), 'logs')
@@ -29,18 +35,25 @@ logger = logging.getLogger('gcaf-leaderboard')
 
 # Add the project root directory to the path to import scraper module
 sys.path.append(str(Path(__file__).parent))
-try:
-    from scripts.cloud_profile_scraper import scrape_cloud_profile, calculate_points, calculate_milestone
-    from scripts.scheduler import run_scraper
-except ImportError:
-    logger.error("Failed to import scraper modules. Check file paths and module structure.")
-    # Import placeholders for development
-    def run_scraper():
-        logger.warning("Using placeholder run_scraper function")
-        return
+# Shared modules living in src/ are imported by their module name
+sys.path.append(str(Path(__file__).parent / 'src'))
+from http_session import get_session
+from publisher import atomic_write, link_mirrors
+from metrics import scrape_metrics, METRICS_FILE_NAME
+from changefeed import ChangeFeed, changes_path_for, clean_row
+from columnar import load_columnar
+from leaderboard_index import LeaderboardIndex, QueryError, MAX_NEIGHBORS, MAX_SEARCH_RESULTS, is_member_row
+from update_stream import UpdateBroker
+from leader import FileLease, LEADER_LOCK_NAME, SCRAPE_LOCK_NAME, FOLLOW_INTERVAL_SECONDS
+from jobs import JobManager, FORWARD_POLL_SECONDS
+from refresh_planner import RefreshPlanner
+from timer_scheduler import TimerScheduler
+from cloud_profile_scraper import plan_refresh
+from scheduler import run_scraper
 
 app = Flask(__name__)
-CORS(app)  # Enable CORS for all routes
+# Enable CORS for all routes; browsers may read the generation header
+CORS(app, expose_headers=['X-Leaderboard-Generation'])
 
 # Get absolute paths to important directories
 PROJECT_ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
@@ -78,6 +91,15 @@ if os.environ.get('RENDER') == 'true' or os.path.exists('/opt/render'):
     RENDER_DATA_PATH = os.path.join(PROJECT_ROOT, 'data', 'profiles_data.csv')
     RENDER_PUBLIC_DATA_PATH = os.path.join(PROJECT_ROOT, 'public', 'profiles_data.csv')
 
+# PROFILES_DATA_PATH is the canonical published file; the other locations
+# are kept for backwards compatibility and point at it
+MIRROR_DATA_PATHS = [ROOT_PROFILES_DATA_PATH, PUBLIC_DATA_PATH]
+if os.environ.get('RENDER') == 'true' or os.path.exists('/opt/render'):
+    MIRROR_DATA_PATHS.extend([RENDER_DATA_PATH, RENDER_PUBLIC_DATA_PATH])
+
+# Last scrape cycle's metrics, saved by whichever process scraped
+METRICS_PATH = os.path.join(DATA_DIR, METRICS_FILE_NAME)
+
 logger.info(f"Profiles data path: {PROFILES_DATA_PATH}")
 logger.info(f"Root profiles data path: {ROOT_PROFILES_DATA_PATH}")
 logger.info(f"Public data path: {PUBLIC_DATA_PATH}")
@@ -98,150 +120,509 @@ logger.info(f"Using APP_URL: {APP_URL}")
 def keep_alive():
     """Ping the health endpoint to keep the service alive"""
     try:
-        response = requests.get(f"{APP_URL}/api/health")
+        response = get_session().get(f"{APP_URL}/api/health")
         logger.info(f"Keep-alive ping: Status {response.status_code}")
         return response.status_code == 200
     except Exception as e:
         logger.error(f"Keep-alive ping failed: {str(e)}")
         return False
 
-def ensure_csv_files():
+# Seconds between refresh ticks. Each tick the scrape leader queues the
+# profiles that are due (active members every few minutes, dormant ones
+# hourly; see refresh_planner) within the per-minute request budget.
+# Also the HTTP cache lifetime of published data.
+REFRESH_TICK_SECONDS = 60
+
+# Process-wide in-memory snapshot of the published data. It holds the
+# memory-mapped columnar table ('table', shared by all worker processes
+# through the page cache) and the serialized API payloads, each with its
+# ETag and pre-compressed gzip/brotli variants. The snapshot is replaced as a
+# whole after every publish, so requests never observe a half-updated state.
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+# Query parameters that select a ranked page instead of the full leaderboard
+LEADERBOARD_QUERY_PARAMS = ('limit', 'offset', 'sort', 'milestone', 'fields')
+# Serialized pages kept per snapshot, most recently used last
+PAGE_CACHE_SIZE = 256
+# Brotli quality for cached payloads. The default (11) takes seconds on a
+# large leaderboard; 5 compresses about as well as gzip -9 in milliseconds.
+BROTLI_QUALITY = int(os.environ.get('BROTLI_QUALITY', 5))
+
+# Every gunicorn worker runs the scheduler thread, but only the process
+# holding the leader lease scrapes on schedule; the others follow its
+# publishes. Any scrape (scheduled or manual) also holds the scrape lease,
+# so two processes never scrape and write the CSVs at the same time.
+leader_lease = FileLease(os.path.join(DATA_DIR, LEADER_LOCK_NAME))
+scrape_lease = FileLease(os.path.join(DATA_DIR, SCRAPE_LOCK_NAME))
+
+# Notifies open /api/leaderboard/stream connections whenever a new snapshot
+# is published, so browsers do not have to poll for changes
+update_broker = UpdateBroker()
+
+def build_leaderboard_body(records):
+    """Serialize leaderboard records as a JSON list"""
+    return app.json.dumps(records).encode('utf-8')
+
+def compress_variants(body):
+    """
+    Pre-compress a payload for every supported content encoding.
+
+    Returns:
+        dict: Encoding name ('gzip', 'br') to compressed bytes
+    """
+    variants = {'gzip': gzip.compress(body, compresslevel=6, mtime=0)}
+    if brotli is not None:
+        variants['br'] = brotli.compress(body, mode=brotli.MODE_TEXT, quality=BROTLI_QUALITY)
+    return variants
+
+def build_payload_entry(name, body, last_modified):
+    """
+    Build a cached payload entry for a serialized body.
+
+    Args:
+        name (str): Payload name, used as the ETag prefix
+        body (bytes): Uncompressed payload
+        last_modified (datetime): Publish time of the underlying data
+
+    Returns:
+        dict: Entry with 'body', 'variants', 'etag' and 'last_modified'
     """
-    Make sure all CSV files are consistent by copying the most recent one
-    to all required locations
+    return {
+        'body': body,
+        'variants': compress_variants(body),
+        # Strong validator derived from the content of this data generation
+        'etag': f"{name}-{hashlib.sha256(body).hexdigest()[:20]}",
+        'last_modified': last_modified
+    }
+
+def seed_canonical_csv():
     """
+    Make sure the canonical CSV exists. Older deployments may only have one
+    of the mirror locations, in which case the most recent non-empty one is
+    copied (atomically) to the canonical path once.
+    """
+    if os.path.exists(PROFILES_DATA_PATH) and os.path.getsize(PROFILES_DATA_PATH) > 0:
+        return True
+    
+    candidates = [path for path in MIRROR_DATA_PATHS
+                  if os.path.isfile(path) and os.path.getsize(path) > 0]
+    if not candidates:
+        logger.warning("No CSV files found to seed the canonical data file")
+        return False
+    
+    most_recent_file = max(candidates, key=os.path.getmtime)
+    logger.info(f"Seeding {PROFILES_DATA_PATH} from {most_recent_file}")
+    atomic_write(PROFILES_DATA_PATH, lambda tmp_path: shutil.copyfile(most_recent_file, tmp_path))
+    return True
+
+def publish_mirrors():
+    """Point every mirror location at the canonical CSV"""
+    if os.path.exists(PROFILES_DATA_PATH):
+        link_mirrors(PROFILES_DATA_PATH, MIRROR_DATA_PATHS, logger=logger)
+
+def file_source(path):
+    """Identify a file version by its modification time and size (None if missing)"""
     try:
-        # Build a list of all possible CSV file locations
-        files_to_check = [
-            (PROFILES_DATA_PATH, os.path.exists(PROFILES_DATA_PATH) and os.path.getmtime(PROFILES_DATA_PATH) if os.path.exists(PROFILES_DATA_PATH) else 0),
-            (ROOT_PROFILES_DATA_PATH, os.path.exists(ROOT_PROFILES_DATA_PATH) and os.path.getmtime(ROOT_PROFILES_DATA_PATH) if os.path.exists(ROOT_PROFILES_DATA_PATH) else 0),
-            (PUBLIC_DATA_PATH, os.path.exists(PUBLIC_DATA_PATH) and os.path.getmtime(PUBLIC_DATA_PATH) if os.path.exists(PUBLIC_DATA_PATH) else 0)
-        ]
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+def reload_snapshot():
+    """
+    Rebuild the in-memory snapshot from the columnar snapshot of the
+    canonical CSV (built from the CSV first if the scraper did not publish
+    one). Called once at startup and after every publish, never from the
+    request path.
+
+    Returns:
+        dict: The new snapshot, or None if no data is available
+    """
+    global _snapshot
+    with _snapshot_lock:
+        if not seed_canonical_csv():
+            _snapshot = None
+            return None
         
-        # Add Render-specific paths if they exist
-        if os.environ.get('RENDER') == 'true' or os.path.exists('/opt/render'):
-            render_paths = [
-                (os.path.join(PROJECT_ROOT, 'data', 'profiles_data.csv'), 
-                 os.path.exists(os.path.join(PROJECT_ROOT, 'data', 'profiles_data.csv')) and 
-                 os.path.getmtime(os.path.join(PROJECT_ROOT, 'data', 'profiles_data.csv')) 
-                 if os.path.exists(os.path.join(PROJECT_ROOT, 'data', 'profiles_data.csv')) else 0),
-                
-                (os.path.join(PROJECT_ROOT, 'public', 'profiles_data.csv'), 
-                 os.path.exists(os.path.join(PROJECT_ROOT, 'public', 'profiles_data.csv')) and 
-                 os.path.getmtime(os.path.join(PROJECT_ROOT, 'public', 'profiles_data.csv')) 
-                 if os.path.exists(os.path.join(PROJECT_ROOT, 'public', 'profiles_data.csv')) else 0)
-            ]
-            files_to_check.extend(render_paths)
+        # The export is only rewritten when data changed, so an unchanged
+        # file means the current snapshot is still valid. The scraper
+        # publishes the change feed right after the CSV; a snapshot loaded
+        # in between is updated with the feed alone once it lands.
+        stat = os.stat(PROFILES_DATA_PATH)
+        source = (stat.st_mtime_ns, stat.st_size)
+        feed_source = file_source(changes_path_for(PROFILES_DATA_PATH))
+        if _snapshot is not None and _snapshot['source'] == source:
+            if _snapshot['feed_source'] != feed_source:
+                _snapshot = dict(_snapshot, feed_source=feed_source,
+                                 feed=ChangeFeed(changes_path_for(PROFILES_DATA_PATH)),
+                                 # Cached changes responses were built from the old feed
+                                 pages=OrderedDict(), pages_lock=threading.Lock(), build_locks={})
+                logger.info(f"Loaded change feed generation {_snapshot['feed'].generation}")
+                announce_snapshot(_snapshot)
+            return _snapshot
         
-        # Sort by modification time (most recent first)
-        files_to_check.sort(key=lambda x: x[1], reverse=True)
+        # Map the columnar snapshot instead of parsing the CSV into a DataFrame
+        table = load_columnar(PROFILES_DATA_PATH)
+        last_modified = datetime.fromtimestamp(int(stat.st_mtime), tz=timezone.utc)
+        # Rows as the API serves them, shared by /api/leaderboard, its
+        # changes fallback and the index: members only (not the scraper's
+        # test profile) and without NaN, which is not valid JSON
+        records = [clean_row(record) for record in table.records() if is_member_row(record)]
+        leaderboard_body = build_leaderboard_body(records)
         
-        # Get the most recent file that actually exists
-        most_recent_file = None
-        for file_path, mtime in files_to_check:
-            if os.path.exists(file_path) and mtime > 0:
-                file_size = os.path.getsize(file_path)
-                logger.info(f"Found CSV file: {file_path} (Size: {file_size} bytes)")
-                
-                if file_size > 0:
-                    most_recent_file = file_path
-                    logger.info(f"Selected most recent non-empty CSV file: {most_recent_file}")
-                    break
-                
-        if most_recent_file:
-            logger.info(f"Most recent CSV file: {most_recent_file}")
-            
-            # Copy to all locations
-            destinations = [
-                PROFILES_DATA_PATH, 
-                ROOT_PROFILES_DATA_PATH, 
-                PUBLIC_DATA_PATH
-            ]
-            
-            # Add Render-specific destinations
-            if os.environ.get('RENDER') == 'true' or os.path.exists('/opt/render'):
-                destinations.extend([
-                    os.path.join(PROJECT_ROOT, 'data', 'profiles_data.csv'),
-                    os.path.join(PROJECT_ROOT, 'public', 'profiles_data.csv')
-                ])
-            
-            for dest_file in destinations:
-                if dest_file != most_recent_file:
-                    try:
-                        # Ensure the directory exists
-                        os.makedirs(os.path.dirname(dest_file), exist_ok=True)
-                        
-                        # Copy the file
-                        shutil.copy2(most_recent_file, dest_file)
-                        logger.info(f"Copied {most_recent_file} to {dest_file}")
-                    except Exception as e:
-                        logger.error(f"Error copying {most_recent_file} to {dest_file}: {e}")
+        _snapshot = {
+            'source': source,
+            'feed_source': feed_source,
+            'last_modified': last_modified,
+            'table': table,
+            'rows': records,
+            # Pre-ranked rows and cached orderings for paginated queries
+            'index': LeaderboardIndex(records, table.columns),
+            'pages': OrderedDict(),
+            'pages_lock': threading.Lock(),
+            # One lock per page being built (see snapshot_cached_entry)
+            'build_locks': {},
+            # Row-level diffs published by the scraper alongside the CSV
+            'feed': ChangeFeed(changes_path_for(PROFILES_DATA_PATH)),
+            'entries': {
+                'leaderboard': build_payload_entry('leaderboard', leaderboard_body, last_modified),
+                # Built here rather than on first request: rendering and
+                # compressing the CSV is too slow for the request path
+                'csv': build_payload_entry('csv', table.to_csv_bytes(), last_modified)
+            }
+        }
+        # Build the name search index now rather than on the first search request
+        _snapshot['index'].name_index
+        logger.info(f"Loaded data snapshot from {table.path} ({table.rows} rows)")
+        announce_snapshot(_snapshot)
+        return _snapshot
+
+def announce_snapshot(snapshot):
+    """Push a snapshot's generation to every open update stream"""
+    generation = snapshot['feed'].generation
+    update_broker.publish(generation, {
+        'generation': generation,
+        'last_modified': snapshot['last_modified'].isoformat(),
+        'total': len(snapshot['index'].rows)
+    })
+
+def get_snapshot():
+    """Return the current snapshot, loading it on first use"""
+    snapshot = _snapshot
+    if snapshot is None:
+        snapshot = reload_snapshot()
+    return snapshot
+
+def snapshot_cached_entry(snapshot, key, name, build_body):
+    """
+    Return a payload entry derived from a snapshot, serializing it with
+    build_body() on first use. Entries are cached per snapshot (most
+    recently used kept), so they are dropped automatically when new data
+    is published. Concurrent requests for the same missing entry wait for
+    one build instead of each building it.
+    """
+    with snapshot['pages_lock']:
+        entry = snapshot['pages'].get(key)
+        if entry is not None:
+            snapshot['pages'].move_to_end(key)
+            return entry
+        build_lock = snapshot['build_locks'].setdefault(key, threading.Lock())
+    
+    with build_lock:
+        with snapshot['pages_lock']:
+            entry = snapshot['pages'].get(key)
+        if entry is None:
+            entry = build_payload_entry(name, build_body(), snapshot['last_modified'])
+            with snapshot['pages_lock']:
+                snapshot['pages'][key] = entry
+                while len(snapshot['pages']) > PAGE_CACHE_SIZE:
+                    snapshot['pages'].popitem(last=False)
+                snapshot['build_locks'].pop(key, None)
+    return entry
+
+def leaderboard_page_entry(snapshot, params):
+    """Return the cached payload entry for one leaderboard query"""
+    key = ('page', params['sort'], params['descending'], params['milestones'], params['offset'],
+           params['limit'], tuple(params['fields'] or ()))
+    
+    def build_body():
+        total, rows = snapshot['index'].query(**params)
+        return app.json.dumps({
+            'total': total,
+            'offset': params['offset'],
+            'limit': params['limit'],
+            'sort': f"{'-' if params['descending'] else ''}{params['sort']}",
+            'milestones': snapshot['index'].milestones,
+            'rows': rows
+        }).encode('utf-8')
+    
+    return snapshot_cached_entry(snapshot, key, 'leaderboard-page', build_body)
+
+def leaderboard_changes_entry(snapshot, since):
+    """
+    Return the cached payload entry with the changes published after
+    generation `since`, or the full leaderboard when the feed no longer
+    covers it.
+    """
+    feed = snapshot['feed']
+    changes = feed.changes_since(since)
+    key = ('changes', since if changes is not None else None)
+    
+    def build_body():
+        if changes is None:
+            # The rows /api/leaderboard serves
+            payload = {'generation': feed.generation, 'full': True, 'rows': snapshot['rows']}
         else:
-            logger.warning("No CSV files found to synchronize")
-            
-    except Exception as e:
-        logger.error(f"Error ensuring CSV files consistency: {e}")
-        import traceback
-        logger.error(traceback.format_exc())
+            upserts, removals = changes
+            payload = {'generation': feed.generation, 'full': False, 'upserts': upserts, 'removals': removals}
+        return app.json.dumps(payload).encode('utf-8')
+    
+    return snapshot_cached_entry(snapshot, key, 'leaderboard-changes', build_body)
+
+def cache_max_age(last_modified):
+    """Seconds until the next scheduled scrape is expected to publish new data"""
+    interval = REFRESH_TICK_SECONDS
+    age = (datetime.now(timezone.utc) - last_modified).total_seconds()
+    return int(min(interval, max(0, interval - age)))
+
+def cached_response(entry, mimetype):
+    """
+    Build a response for a cached payload, honouring If-None-Match /
+    If-Modified-Since with a 304 and serving a pre-compressed variant when
+    the client accepts one.
+    """
+    encoding = None
+    for candidate in ('br', 'gzip'):
+        if candidate in entry['variants'] and request.accept_encodings[candidate]:
+            encoding = candidate
+            break
+    
+    # Each encoding is a distinct representation, so it gets its own strong ETag
+    etag = entry['etag'] + (f"-{encoding}" if encoding else '')
+    all_etags = [entry['etag']] + [f"{entry['etag']}-{enc}" for enc in entry['variants']]
+    
+    if request.if_none_match:
+        not_modified = any(request.if_none_match.contains_weak(tag) for tag in all_etags)
+    elif request.if_modified_since:
+        not_modified = entry['last_modified'] <= request.if_modified_since
+    else:
+        not_modified = False
+    
+    if not_modified:
+        response = app.response_class(status=304)
+    else:
+        body = entry['variants'][encoding] if encoding else entry['body']
+        response = app.response_class(body, mimetype=mimetype)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+    
+    response.set_etag(etag)
+    response.last_modified = entry['last_modified']
+    response.headers['Cache-Control'] = f"public, max-age={cache_max_age(entry['last_modified'])}"
+    response.vary.add('Accept-Encoding')
+    return response
 
-def custom_run_scraper():
+def snapshot_json_response(snapshot, payload):
     """
-    Custom wrapper for run_scraper that ensures CSV files are properly distributed
-    after scraping
+    Build an uncached JSON response derived from a snapshot, with a
+    content ETag (honouring If-None-Match) and the snapshot's cache lifetime.
     """
+    response = jsonify(payload)
+    response.add_etag()
+    response.last_modified = snapshot['last_modified']
+    response.headers['Cache-Control'] = f"public, max-age={cache_max_age(snapshot['last_modified'])}"
+    return response.make_conditional(request)
+
+def bounded_int_arg(name, default, maximum):
+    """Read an integer query argument, clamped to [0, maximum]"""
     try:
-        logger.info("Running custom_run_scraper wrapper")
-        # Track time
-        start_time = time.time()
-        
-        # Run the actual scraper
-        run_scraper()
-        
-        # Calculate execution time
-        execution_time = time.time() - start_time
-        minutes, seconds = divmod(execution_time, 60)
-        logger.info(f"Scraper completed in {int(minutes)} minutes and {int(seconds)} seconds")
-        
-        # Ensure all CSV files are updated
-        logger.info("Ensuring all CSV files are consistent")
-        ensure_csv_files()
-        
-        # Check if files exist and log their sizes
-        files_to_check = [PROFILES_DATA_PATH, ROOT_PROFILES_DATA_PATH, PUBLIC_DATA_PATH]
-        for file_path in files_to_check:
-            if os.path.exists(file_path):
-                file_size = os.path.getsize(file_path)
-                logger.info(f"CSV file {file_path} exists with size {file_size} bytes")
-            else:
-                logger.warning(f"CSV file {file_path} does not exist")
-        
+        value = int(request.args.get(name, default))
+    except ValueError:
+        raise QueryError(f"{name} must be an integer")
+    return max(0, min(value, maximum))
+
+def custom_run_scraper(profile_urls=None, progress=None, rate=None):
+    """
+    Custom wrapper for run_scraper that publishes the new data to the mirror
+    locations and the in-memory snapshot after scraping. Scraping and
+    publishing are recorded as one metrics cycle.
+
+    Skipped if another thread or process is already scraping.
+
+    Args:
+        profile_urls (list): Profiles to scrape (default: the whole roster)
+        progress (callable): Called as progress(done, total) while scraping
+        rate (float): Requests per second (default: the scraper's rate limit)
+
+    Returns:
+        bool: True on success, False on failure, None if skipped
+    """
+    if not scrape_lease.acquire():
+        logger.info(f"A scrape is already running (pid {scrape_lease.owner()}), skipping this run")
+        return None
+    try:
+        with scrape_metrics.cycle() as cycle:
+            cycle.success = _scrape_and_publish(profile_urls, progress, rate)
+        scrape_metrics.log_summary(logger.info)
+        return cycle.success
     except Exception as e:
         logger.error(f"Error in custom_run_scraper: {e}")
         import traceback
         logger.error(traceback.format_exc())
+        return False
+    finally:
+        # Other workers report this cycle at /api/metrics
+        scrape_metrics.save_last_cycle(METRICS_PATH)
+        scrape_lease.release()
 
-def run_schedule():
-    """Background thread function to run the scheduler"""
-    logger.info("Starting background scheduler")
+def _scrape_and_publish(profile_urls=None, progress=None, rate=None):
+    """Run the scraper and publish its output. Returns True on success."""
+    logger.info("Running custom_run_scraper wrapper")
+    # Track time
+    start_time = time.time()
     
-    # Schedule the scraper to run every 10 minutes
-    schedule.every(10).minutes.do(custom_run_scraper)
+    # Run the actual scraper. It runs in this process by default, reusing
+    # warm imports, the HTTP connection pool and the profile cache
+    # (set SCRAPER_ISOLATED=1 to run it in a child process instead)
+    success = run_scraper(profile_urls=profile_urls, progress=progress, rate=rate)
     
-    # Schedule the keep-alive ping every 10 minutes
-    schedule.every(10).minutes.do(keep_alive)
+    # Calculate execution time
+    execution_time = time.time() - start_time
+    minutes, seconds = divmod(execution_time, 60)
+    logger.info(f"Scraper completed in {int(minutes)} minutes and {int(seconds)} seconds")
     
-    # Also run immediately on startup
-    logger.info("Running initial scraper job")
-    custom_run_scraper()
+    if not success:
+        logger.warning("Scraper run failed, keeping the current data snapshot")
+        return False
     
-    # Initial keep-alive ping
-    logger.info("Performing initial keep-alive ping")
-    keep_alive_success = keep_alive()
-    logger.info(f"Initial keep-alive ping {'successful' if keep_alive_success else 'failed'}")
+    # Publish: mirrors point at the canonical file, then swap the snapshot
+    with scrape_metrics.timer('publish'):
+        publish_mirrors()
+        reload_snapshot()
+    return True
+
+def run_scrape_job(job):
+    """Run a queued scrape job (see JobManager), reporting its progress"""
+    logger.info(f"Starting scrape job {job.id} ({job.trigger}, "
+                f"{'roster' if job.profile_urls is None else f'{len(job.profile_urls)} profiles'})")
+    return custom_run_scraper(
+        profile_urls=job.profile_urls,
+        progress=lambda done, total: job_manager.progress(job, done, total),
+        rate=job.rate
+    )
+
+# Scheduled and manual scrapes go through one single-flight queue, so a
+# burst of triggers never starts overlapping scrapes. Only the leader runs
+# it; the other workers forward manual triggers to the leader's queue.
+job_manager = JobManager(run_scrape_job, jobs_dir=os.path.join(DATA_DIR, 'jobs'))
+
+# Seconds between keep-alive pings of the health endpoint
+KEEP_ALIVE_SECONDS = 10 * 60
+
+# Fires the leader's periodic tasks on a small worker pool (see run_schedule)
+background_scheduler = TimerScheduler(logger=logger)
+
+# Picks which profiles each refresh tick scrapes; remembers recent attempts
+refresh_planner = RefreshPlanner()
+
+def submit_refresh_batch():
+    """
+    Queue the profiles due for a refresh, up to one tick's share of the
+    request budget. The batch is paced at the budget's rate, so requests
+    are spread over the tick instead of bursting at its start.
+    """
+    if job_manager.queued is not None:
+        # Scraping is behind the schedule; let the queue drain first
+        logger.info(f"Refresh job {job_manager.queued.id} is still queued, skipping this tick")
+        return
+    try:
+        profile_urls = plan_refresh(refresh_planner, PROFILES_DATA_PATH,
+                                    refresh_planner.batch_size(REFRESH_TICK_SECONDS))
+    except Exception as e:
+        logger.error(f"Error planning the refresh batch: {e}")
+        return
+    if not profile_urls:
+        return
+    job, created = job_manager.submit(profile_urls, trigger='schedule', rate=refresh_planner.rate)
+    if not created:
+        logger.info(f"Refresh batch joined job {job.id} ({job.status})")
+
+def resolve_profile_urls(snapshot, payload):
+    """
+    Resolve the profiles a scrape request names to leaderboard profile URLs.
+
+    Args:
+        snapshot (dict): Current snapshot
+        payload (dict): Request body with 'profile_urls' and/or 'member_ids'
+
+    Returns:
+        list: Profile URLs, or None to scrape the whole roster
+
+    Raises:
+        QueryError: If the body is malformed or names unknown profiles
+    """
+    profile_urls = payload.get('profile_urls')
+    member_ids = payload.get('member_ids')
+    if profile_urls is None and member_ids is None:
+        return None
+    for value in (profile_urls, member_ids):
+        if value is not None and not (isinstance(value, list) and all(isinstance(item, str) for item in value)):
+            raise QueryError("profile_urls and member_ids must be lists of strings")
+    
+    # Only profiles already on the leaderboard can be scraped on demand
+    index = snapshot['index'] if snapshot is not None else None
+    known = {row.get('profile_url') for row in index.rows} if index is not None else set()
+    urls, unknown = [], []
+    for url in profile_urls or []:
+        (urls if url in known else unknown).append(url)
+    for member_id in member_ids or []:
+        position = index.by_member_id.get(member_id) if index is not None else None
+        if position is None:
+            unknown.append(member_id)
+        else:
+            urls.append(index.rows[position]['profile_url'])
+    if unknown:
+        raise QueryError(f"Unknown profiles: {', '.join(unknown[:10])}")
+    if not urls:
+        raise QueryError("No profiles to scrape")
+    return urls
+
+def follow_leader():
+    """
+    Pick up the snapshots published by the scrape leader (another worker)
+    until its leader lease becomes free, i.e. that process exited.
+    """
+    logger.info(f"Scrape leader is pid {leader_lease.owner()}, following its publishes")
+    while not leader_lease.acquire():
+        try:
+            # Cheap when nothing changed: the CSV is only stat()ed
+            reload_snapshot()
+        except Exception as e:
+            logger.error(f"Error reloading the published snapshot: {e}")
+        time.sleep(FOLLOW_INTERVAL_SECONDS)
+    logger.info("Previous scrape leader exited, taking over")
+
+def run_schedule():
+    """Background thread function to run the scheduler"""
+    logger.info("Starting background scheduler")
     
-    while True:
-        schedule.run_pending()
-        time.sleep(60)  # Check every minute
+    # Only one process per data directory scrapes; the rest serve its data
+    if not leader_lease.acquire():
+        follow_leader()
+    logger.info(f"Elected scrape leader (pid {os.getpid()})")
+    
+    # Both tasks also fire immediately on startup, on separate pool threads,
+    # so the first refresh never delays the keep-alive ping. Scrapes run in
+    # the job queue, so a refresh tick only plans and queues a batch.
+    background_scheduler.every(REFRESH_TICK_SECONDS, submit_refresh_batch,
+                               name='refresh', overlap='skip', run_now=True)
+    background_scheduler.every(KEEP_ALIVE_SECONDS, keep_alive,
+                               name='keep-alive', overlap='skip', run_now=True)
+    # Manual triggers received by the other workers
+    background_scheduler.every(FORWARD_POLL_SECONDS, job_manager.claim_forwarded,
+                               name='forwarded-jobs', overlap='skip', run_now=True)
+    background_scheduler.run()
 
 # Start the background scheduler in a separate thread
 scheduler_thread = None
@@ -272,61 +653,46 @@ def root():
         "message": "GCAF Leaderboard API is running",
         "endpoints": {
             "leaderboard": "/api/leaderboard",
+            "changes": "/api/leaderboard/changes?since=<generation>",
+            "stream": "/api/leaderboard/stream",
             "csv": "/api/csv",
+            "member": "/api/member/<id>",
+            "search": "/api/search?q=<name>",
             "health": "/api/health",
+            "metrics": "/api/metrics",
             "run-scraper": "/api/run-scraper (POST)",
+            "jobs": "/api/jobs/<id>",
             "sync-csv": "/api/sync-csv (POST)"
         }
     })
 
 @app.route('/api/leaderboard', methods=['GET'])
 def get_leaderboard():
-    """Return leaderboard data as JSON"""
+    """
+    Return leaderboard data as JSON.
+
+    Without query parameters the full leaderboard is returned as a list of
+    rows. With any of limit, offset, sort (column, '-' prefix for
+    descending), milestone (comma separated) or fields (comma separated),
+    a ranked page is returned as {total, offset, limit, sort, milestones, rows},
+    with a server-computed 'rank' available on every row.
+    """
     try:
-        # First ensure CSV files are in sync
-        ensure_csv_files()
-        
-        # All possible CSV file locations
-        possible_paths = [
-            PROFILES_DATA_PATH, 
-            ROOT_PROFILES_DATA_PATH, 
-            PUBLIC_DATA_PATH
-        ]
-        
-        # Add Render-specific paths if they exist
-        if os.environ.get('RENDER') == 'true' or os.path.exists('/opt/render'):
-            render_paths = [
-                os.path.join(PROJECT_ROOT, 'data', 'profiles_data.csv'),
-                os.path.join(PROJECT_ROOT, 'public', 'profiles_data.csv')
-            ]
-            possible_paths.extend(render_paths)
-        
-        # Log all possible paths
-        logger.info("Looking for CSV file in the following locations:")
-        for path in possible_paths:
-            if os.path.exists(path):
-                size = os.path.getsize(path)
-                logger.info(f"  {path} (exists, size: {size} bytes)")
-            else:
-                logger.info(f"  {path} (does not exist)")
-        
-        # Try all locations until we find a valid CSV
-        for csv_path in possible_paths:
-            if os.path.exists(csv_path) and os.path.getsize(csv_path) > 0:
-                try:
-                    df = pd.read_csv(csv_path)
-                    logger.info(f"Loaded leaderboard data from {csv_path} with {len(df)} records")
-                    
-                    # Convert DataFrame to list of dictionaries
-                    leaderboard_data = df.to_dict(orient='records')
-                    return jsonify(leaderboard_data)
-                except Exception as e:
-                    logger.error(f"Error reading {csv_path}: {e}")
-                    continue
-        
-        # If we get here, we couldn't read any CSV file
-        logger.error("Could not read any valid CSV file")
-        return jsonify({"error": "Leaderboard data not found"}), 404
+        snapshot = get_snapshot()
+        if snapshot is None:
+            logger.error("Could not read any valid CSV file")
+            return jsonify({"error": "Leaderboard data not found"}), 404
+        if any(param in request.args for param in LEADERBOARD_QUERY_PARAMS):
+            try:
+                params = snapshot['index'].parse_query(request.args)
+            except QueryError as e:
+                return jsonify({"error": str(e)}), 400
+            response = cached_response(leaderboard_page_entry(snapshot, params), app.json.mimetype)
+        else:
+            response = cached_response(snapshot['entries']['leaderboard'], app.json.mimetype)
+        # Clients pass this to /api/leaderboard/changes to fetch only what changed
+        response.headers['X-Leaderboard-Generation'] = str(snapshot['feed'].generation)
+        return response
     except Exception as e:
         logger.error(f"Error retrieving leaderboard data: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -335,55 +701,198 @@ def get_leaderboard():
 def get_csv():
     """Return the raw CSV file"""
     try:
-        # First ensure CSV files are in sync
-        ensure_csv_files()
-        
-        if os.path.exists(PROFILES_DATA_PATH):
-            return send_file(PROFILES_DATA_PATH, mimetype='text/csv')
-        elif os.path.exists(ROOT_PROFILES_DATA_PATH):
-            return send_file(ROOT_PROFILES_DATA_PATH, mimetype='text/csv')
-        elif os.path.exists(PUBLIC_DATA_PATH):
-            return send_file(PUBLIC_DATA_PATH, mimetype='text/csv')
-        else:
+        snapshot = get_snapshot()
+        if snapshot is None:
             return jsonify({"error": "CSV file not found"}), 404
+        return cached_response(snapshot['entries']['csv'], 'text/csv')
     except Exception as e:
         logger.error(f"Error serving CSV file: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/leaderboard/changes', methods=['GET'])
+def get_leaderboard_changes():
+    """
+    Return the rows changed since generation ?since=N (from the
+    X-Leaderboard-Generation header or a previous changes response).
+
+    Response: {generation, full: false, upserts: [rows], removals: [keys]},
+    where rows are keyed by profile_url (the name for rows without one) and
+    removals lists such keys. When the generation is too old or unknown the
+    full leaderboard is returned instead as {generation, full: true, rows}.
+    """
+    try:
+        snapshot = get_snapshot()
+        if snapshot is None:
+            return jsonify({"error": "Leaderboard data not found"}), 404
+        try:
+            since = int(request.args['since'])
+        except (KeyError, ValueError):
+            return jsonify({"error": "Query parameter 'since' must be a generation number"}), 400
+        response = cached_response(leaderboard_changes_entry(snapshot, since), app.json.mimetype)
+        response.headers['X-Leaderboard-Generation'] = str(snapshot['feed'].generation)
+        return response
+    except Exception as e:
+        logger.error(f"Error retrieving leaderboard changes: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/leaderboard/stream', methods=['GET'])
+def stream_leaderboard_updates():
+    """
+    Server-Sent Events stream announcing new leaderboard data.
+
+    A 'leaderboard' event ({generation, last_modified, total}, id set to the
+    generation) is sent on connect and after every publish; clients then
+    fetch /api/leaderboard/changes?since=<their generation>. Idle streams get
+    a heartbeat comment every STREAM_HEARTBEAT_SECONDS and are closed after
+    STREAM_MAX_SECONDS, after which EventSource reconnects with
+    Last-Event-ID. Returns 503 when STREAM_MAX_CLIENTS streams are open.
+    """
+    try:
+        if get_snapshot() is None:
+            return jsonify({"error": "Leaderboard data not found"}), 404
+        if not update_broker.connect():
+            response = jsonify({"error": "Too many open update streams, poll /api/leaderboard instead"})
+            response.status_code = 503
+            response.headers['Retry-After'] = '60'
+            return response
+        
+        stream = update_broker.stream(last_event_id=request.headers.get('Last-Event-ID'))
+        response = app.response_class(stream, mimetype='text/event-stream')
+        # Runs when the server closes the response, including client disconnects
+        response.call_on_close(update_broker.disconnect)
+        response.headers['Cache-Control'] = 'no-cache'
+        # Stop nginx-style proxies from buffering the stream
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
+    except Exception as e:
+        logger.error(f"Error opening update stream: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/member/<member_id>', methods=['GET'])
+def get_member(member_id):
+    """
+    Return one member's standing: rank, badge breakdown and the members
+    directly above and below. The id is the last segment of the member's
+    public profile URL; ?neighbors=N (default 2) sets how many neighbors.
+    """
+    try:
+        snapshot = get_snapshot()
+        if snapshot is None:
+            return jsonify({"error": "Leaderboard data not found"}), 404
+        try:
+            neighbors = bounded_int_arg('neighbors', 2, MAX_NEIGHBORS)
+        except QueryError as e:
+            return jsonify({"error": str(e)}), 400
+        member = snapshot['index'].member(member_id, neighbors=neighbors)
+        if member is None:
+            return jsonify({"error": f"Member {member_id} not found"}), 404
+        return snapshot_json_response(snapshot, member)
+    except Exception as e:
+        logger.error(f"Error retrieving member {member_id}: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/search', methods=['GET'])
+def search_members():
+    """
+    Search members by name (prefix of the name or of any word in it, or
+    any part of 3+ characters). ?limit=N (default 10) caps the results.
+    """
+    try:
+        snapshot = get_snapshot()
+        if snapshot is None:
+            return jsonify({"error": "Leaderboard data not found"}), 404
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({"error": "Missing search query 'q'"}), 400
+        try:
+            limit = bounded_int_arg('limit', 10, MAX_SEARCH_RESULTS)
+        except QueryError as e:
+            return jsonify({"error": str(e)}), 400
+        results = snapshot['index'].search(query, limit=limit)
+        return snapshot_json_response(snapshot, {"query": query, "results": results})
+    except Exception as e:
+        logger.error(f"Error searching members: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return jsonify({"status": "healthy"})
 
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """
+    Scrape cycle and scheduler task metrics in the Prometheus text format.
+    The scrape cycle reported is the newest one of any process (see
+    METRICS_PATH); counters and scheduler tasks are this process's.
+    """
+    scrape_metrics.load_last_cycle(METRICS_PATH)
+    response = app.response_class(scrape_metrics.render_prometheus() + background_scheduler.render_prometheus(),
+                                  mimetype='text/plain; version=0.0.4')
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
 @app.route('/api/run-scraper', methods=['POST'])
 def trigger_scraper():
-    """Manually trigger the scraper (protected in production)"""
+    """
+    Manually trigger the scraper (protected in production).
+
+    An optional JSON body {"profile_urls": [...]} or {"member_ids": [...]}
+    limits the scrape to those leaderboard members. Triggers are coalesced:
+    a request covered by the running job joins it, anything else is merged
+    into the single queued job. Workers other than the scrape leader hand
+    the request to the leader's queue. Returns 202 with the job id; poll
+    /api/jobs/<id> for its status and progress.
+    """
     try:
         # In production, you might want to add authentication here
-        logger.info("Manual scraper run triggered via API")
+        payload = request.get_json(silent=True) or {}
+        if not isinstance(payload, dict):
+            return jsonify({"error": "Request body must be a JSON object"}), 400
+        try:
+            profile_urls = resolve_profile_urls(get_snapshot(), payload)
+        except QueryError as e:
+            return jsonify({"error": str(e)}), 400
         
-        # Run in a separate thread to not block the response
-        def run_scraper_thread():
-            try:
-                custom_run_scraper()
-            except Exception as e:
-                logger.error(f"Error in manual scraper thread: {str(e)}")
-        
-        thread = threading.Thread(target=run_scraper_thread)
-        thread.daemon = True
-        thread.start()
-        
-        return jsonify({"status": "Scraper started", "message": "The scraper is running in the background. Check logs for completion."}), 200
+        if leader_lease.held:
+            job, created = job_manager.submit(profile_urls)
+            logger.info(f"Manual scraper run triggered via API: {'new' if created else 'joined'} job {job.id}")
+        else:
+            # Only the leader scrapes; a job run here would just be skipped
+            job, created = job_manager.forward(profile_urls), True
+            logger.info(f"Manual scraper run triggered via API: forwarded as {job.id} "
+                        f"to the scrape leader (pid {leader_lease.owner()})")
+        response = jsonify({
+            "job_id": job.id,
+            "status": job.status,
+            "coalesced": not created,
+            "status_url": f"/api/jobs/{job.id}"
+        })
+        response.status_code = 202
+        response.headers['Location'] = f"/api/jobs/{job.id}"
+        return response
     except Exception as e:
         logger.error(f"Error triggering scraper: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Status and progress ({done, total} profiles) of a scrape job"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Job {job_id} not found"}), 404
+    response = jsonify(job)
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
 @app.route('/api/sync-csv', methods=['POST'])
 def sync_csv_files():
     """Synchronize CSV files across all locations"""
     try:
         logger.info("CSV synchronization triggered via API")
-        ensure_csv_files()
+        seed_canonical_csv()
+        publish_mirrors()
+        reload_snapshot()
         return jsonify({"status": "success", "message": "CSV files synchronized"}), 200
     except Exception as e:
         logger.error(f"Error synchronizing CSV files: {str(e)}")
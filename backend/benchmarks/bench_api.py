@@ -0,0 +1,266 @@
+"""
+Load test of the Flask API endpoints.
+
+Serves the WSGI ``app`` from wsgi.py on a local threaded server with a
+synthetic leaderboard of each requested size, then drives it with N
+concurrent keep-alive clients. Each endpoint is measured on its own and
+again while a background publisher rewrites the CSV and swaps the
+snapshot, as the scheduler does after every scrape. Reports requests/sec,
+p50/p99 latency and response size per run.
+
+The app's data paths are redirected to a temporary directory, so the real
+CSV files are never touched, and the background scheduler is not started.
+
+Usage:
+    python benchmarks/bench_api.py [--sizes 100,1000,10000,50000] [--clients 16]
+                                   [--duration 5] [--json report.json]
+                                   [--baseline old.json --max-regression 0.2]
+
+With --baseline the run fails (exit status 1) when any run's requests/sec
+dropped, or its p99 latency grew, by more than --max-regression compared
+to the baseline report.
+"""
+import argparse
+import contextlib
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'src'))
+
+from werkzeug.serving import make_server  # noqa: E402
+
+import app as app_module  # noqa: E402
+from wsgi import app  # noqa: E402
+from cloud_profile_scraper import rows_to_dataframe, write_csv  # noqa: E402
+from metrics import quantile  # noqa: E402
+from scoring import COUNT_COLUMNS, score_rows  # noqa: E402
+
+DEFAULT_ENDPOINTS = ['/api/leaderboard', '/api/csv', '/api/health']
+
+
+def synthetic_rows(size, seed=0):
+    """
+    Builds a scored leaderboard of ``size`` synthetic members.
+
+    Args:
+        size (int): Number of members
+        seed (int): Random seed
+
+    Returns:
+        list: Row dicts with every CSV column
+    """
+    rng = random.Random(seed)
+    rows = []
+    for i in range(size):
+        row = {column: rng.randint(0, 40) for column in COUNT_COLUMNS}
+        row['special_game_badges'] = rng.randint(0, 3)
+        row['name'] = f"Member {i}"
+        row['profile_url'] = f"https://www.cloudskillsboost.google/public_profiles/bench-{seed}-{i}"
+        rows.append(row)
+    return score_rows(rows)
+
+
+def publish_rows(rows, data_path):
+    """Writes rows to the canonical CSV and swaps the API snapshot."""
+    with contextlib.redirect_stdout(open(os.devnull, 'w')):
+        write_csv(rows_to_dataframe(rows), data_path)
+    app_module.reload_snapshot()
+
+
+class Publisher(threading.Thread):
+    """Republishes a slightly changed leaderboard every ``interval`` seconds."""
+
+    def __init__(self, rows, data_path, interval):
+        super().__init__(name="bench-publisher", daemon=True)
+        self.rows = rows
+        self.data_path = data_path
+        self.interval = interval
+        self.publishes = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        rng = random.Random(1)
+        while not self._stop_event.wait(self.interval):
+            # Move a few members so every publish produces new data
+            for row in rng.sample(self.rows, min(10, len(self.rows))):
+                row['game_badges'] += 1
+            self.rows = score_rows(self.rows)
+            publish_rows(self.rows, self.data_path)
+            self.publishes += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def run_load(base_url, endpoint, clients, duration, encoding):
+    """
+    Sends requests from ``clients`` threads for ``duration`` seconds.
+
+    Returns:
+        dict: Request count, errors, latencies (seconds) and bytes received
+    """
+    deadline = time.perf_counter() + duration
+    latencies = []
+    sizes = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def client():
+        session = requests.Session()
+        session.headers['Accept-Encoding'] = encoding
+        local_latencies = []
+        local_sizes = []
+        local_errors = 0
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                response = session.get(base_url + endpoint)
+                # Size on the wire, before requests decodes the body
+                size = int(response.headers.get('Content-Length') or len(response.content))
+                if response.status_code != 200:
+                    local_errors += 1
+            except requests.exceptions.RequestException:
+                local_errors += 1
+                continue
+            local_latencies.append(time.perf_counter() - start)
+            local_sizes.append(size)
+        session.close()
+        with lock:
+            latencies.extend(local_latencies)
+            sizes.extend(local_sizes)
+            errors[0] += local_errors
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': errors[0],
+        'requests_per_sec': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(quantile(latencies, 0.5) * 1000, 2) if latencies else None,
+        'p99_ms': round(quantile(latencies, 0.99) * 1000, 2) if latencies else None,
+        'max_ms': round(latencies[-1] * 1000, 2) if latencies else None,
+        'response_kb': round(sum(sizes) / len(sizes) / 1024, 1) if sizes else None,
+    }
+
+
+def compare(reports, baseline, max_regression):
+    """
+    Compares runs with a baseline report.
+
+    Returns:
+        list: Descriptions of the runs that regressed
+    """
+    baseline_runs = {(run['size'], run['endpoint'], run['publishing']): run for run in baseline['runs']}
+    regressions = []
+    for run in reports:
+        old = baseline_runs.get((run['size'], run['endpoint'], run['publishing']))
+        if not old:
+            continue
+        label = f"{run['endpoint']} size={run['size']} publishing={run['publishing']}"
+        if old['requests_per_sec'] and run['requests_per_sec'] < old['requests_per_sec'] * (1 - max_regression):
+            regressions.append(f"{label}: {old['requests_per_sec']} -> {run['requests_per_sec']} req/s")
+        if old.get('p99_ms') and run.get('p99_ms') and run['p99_ms'] > old['p99_ms'] * (1 + max_regression):
+            regressions.append(f"{label}: p99 {old['p99_ms']} -> {run['p99_ms']} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the leaderboard API")
+    parser.add_argument("--sizes", default="100,1000,10000,50000",
+                        help="Comma separated cohort sizes (default: 100,1000,10000,50000)")
+    parser.add_argument("--endpoints", default=','.join(DEFAULT_ENDPOINTS),
+                        help=f"Comma separated endpoints (default: {','.join(DEFAULT_ENDPOINTS)})")
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent clients (default: 16)")
+    parser.add_argument("--duration", type=float, default=5, help="Seconds per run (default: 5)")
+    parser.add_argument("--publish-interval", type=float, default=0.5,
+                        help="Seconds between publishes in the overlapping runs (default: 0.5)")
+    parser.add_argument("--no-publish", action="store_true", help="Skip the runs overlapping a publish")
+    parser.add_argument("--encoding", default="gzip",
+                        help="Accept-Encoding sent by the clients (default: gzip)")
+    parser.add_argument("--json", dest="json_file", default=None, help="Also write the report as JSON")
+    parser.add_argument("--baseline", default=None, help="JSON report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="Allowed relative regression against the baseline (default: 0.2)")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    sizes = [int(size) for size in args.sizes.split(',')]
+    endpoints = args.endpoints.split(',')
+
+    runs = []
+    with tempfile.TemporaryDirectory(prefix="bench-api-") as work_dir:
+        # Point the app at a private data file; no mirrors, no scheduler
+        data_path = os.path.join(work_dir, 'profiles_data.csv')
+        app_module.PROFILES_DATA_PATH = data_path
+        app_module.MIRROR_DATA_PATHS = []
+        app_module.start_scheduler = lambda: None
+
+        server = make_server('127.0.0.1', 0, app, threaded=True)
+        server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+        server_thread.start()
+        base_url = f"http://127.0.0.1:{server.server_port}"
+
+        print(f"{'size':>7} {'endpoint':<18} {'publish':>7} {'req/s':>9} {'p50 ms':>8} "
+              f"{'p99 ms':>8} {'max ms':>8} {'KB':>8} {'errors':>6}")
+        for size in sizes:
+            rows = synthetic_rows(size)
+            publish_rows(rows, data_path)
+            for publishing in ([False] if args.no_publish else [False, True]):
+                for endpoint in endpoints:
+                    publisher = None
+                    if publishing:
+                        publisher = Publisher([dict(row) for row in rows], data_path, args.publish_interval)
+                        publisher.start()
+                    result = run_load(base_url, endpoint, args.clients, args.duration, args.encoding)
+                    if publisher:
+                        publisher.stop()
+                        result['publishes'] = publisher.publishes
+                        publish_rows(rows, data_path)
+                    run = dict(size=size, endpoint=endpoint, publishing=publishing, **result)
+                    runs.append(run)
+                    print(f"{size:>7} {endpoint:<18} {'yes' if publishing else 'no':>7} "
+                          f"{run['requests_per_sec']:>9} {run['p50_ms']!s:>8} {run['p99_ms']!s:>8} "
+                          f"{run['max_ms']!s:>8} {run['response_kb']!s:>8} {run['errors']:>6}")
+
+        server.shutdown()
+
+    report = {'config': vars(args), 'runs': runs}
+    if args.json_file:
+        with open(args.json_file, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.json_file}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(runs, baseline, args.max_regression)
+        if regressions:
+            print("Regressions against the baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("No regressions against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
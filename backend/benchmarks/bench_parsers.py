@@ -0,0 +1,96 @@
+"""
+Micro-benchmark of the profile HTML parser backends.
+
+Parses saved public-profile pages with every backend in
+profile_parser.PARSER_BACKENDS, checks that they all produce the same
+profile data, and reports the mean and best parse time per page.
+
+Usage:
+    python benchmarks/bench_parsers.py [--repeat N] [fixture.html ...]
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'src'))
+
+from cloud_profile_scraper import parse_profile_page  # noqa: E402
+from profile_parser import PARSER_BACKENDS, LXML_AVAILABLE  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def quiet_parse(html, backend):
+    """Runs parse_profile_page with the scraper's progress prints silenced."""
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        return parse_profile_page(html, 'fixture', parser=backend)
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+
+def time_backend(html, backend, repeat):
+    """
+    Times repeated parses of one page.
+
+    Returns:
+        tuple: (mean seconds, best seconds)
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        quiet_parse(html, backend)
+        timings.append(time.perf_counter() - start)
+    return sum(timings) / len(timings), min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark profile parser backends")
+    parser.add_argument("fixtures", nargs="*",
+                        help="Saved profile HTML files (default: benchmarks/fixtures/*.html)")
+    parser.add_argument("--repeat", type=int, default=20,
+                        help="Parses per backend and fixture (default: 20)")
+    args = parser.parse_args()
+
+    fixtures = args.fixtures or sorted(glob.glob(os.path.join(FIXTURES_DIR, '*.html')))
+    if not fixtures:
+        print("No fixtures found")
+        return 1
+
+    if not LXML_AVAILABLE:
+        print("Note: lxml is not installed, the lxml and targeted backends use html.parser")
+
+    mismatches = 0
+    print(f"{'fixture':<28} {'backend':<12} {'mean ms':>9} {'best ms':>9} {'speedup':>8}")
+    for path in fixtures:
+        with open(path, 'r', encoding='utf-8') as f:
+            html = f.read()
+
+        reference = quiet_parse(html, 'html.parser')
+        baseline_mean = None
+        for backend in PARSER_BACKENDS:
+            result = quiet_parse(html, backend)
+            if result != reference:
+                mismatches += 1
+                print(f"MISMATCH: {os.path.basename(path)} parsed differently by {backend}")
+
+            mean, best = time_backend(html, backend, args.repeat)
+            if baseline_mean is None:
+                baseline_mean = mean
+            print(f"{os.path.basename(path):<28} {backend:<12} {mean * 1000:>9.2f} {best * 1000:>9.2f} "
+                  f"{baseline_mean / mean:>7.1f}x")
+
+    if mismatches:
+        print(f"{mismatches} backend mismatches found")
+        return 1
+    print("All backends produced identical badge lists")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""
+Offline throughput benchmark of the scrape, score and publish stages.
+
+Starts the local stand-in server (benchmarks/standin_server.py), scrapes
+a synthetic cohort from it with the real scraper code, then scores and
+publishes the rows into a temporary profile store and CSV. Reports
+profiles/sec, p50/p99 latencies and peak memory per stage; --json writes
+the same numbers for comparing runs.
+
+Stages:
+    scrape-cold  first cycle, every page downloaded and parsed
+    scrape-warm  second cycle, pages answered with 304 from the ETag cache
+    score        vectorized scoring of --score-members rows
+    publish      profile store upsert and CSV export
+
+Usage:
+    python benchmarks/bench_scraper.py [--profiles 500] [--badges 60]
+                                       [--latency-ms 50] [--error-rate 0.01]
+                                       [--json report.json]
+"""
+import argparse
+import contextlib
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cloud_profile_scraper import scrape_rows, export_store, DEFAULT_MAX_WORKERS  # noqa: E402
+from http_session import configure_session  # noqa: E402
+from metrics import scrape_metrics, quantile  # noqa: E402
+from profile_cache import ProfileCache  # noqa: E402
+from profile_store import ProfileStore  # noqa: E402
+from scoring import score_rows  # noqa: E402
+from standin_server import StandInConfig, start_server  # noqa: E402
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silences the scraper's per-profile progress prints."""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def ms(value):
+    return round(value * 1000, 2)
+
+
+def run_stage(name, func, items, trace_memory):
+    """
+    Runs one stage inside a metrics cycle and collects its numbers.
+
+    Args:
+        name (str): Stage name for the report
+        func (callable): Stage body; returns its result
+        items (int): Number of profiles the stage processes
+        trace_memory (bool): Measure the stage's peak Python allocations
+
+    Returns:
+        tuple: (result of func, report dict)
+    """
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    with scrape_metrics.cycle(), quiet():
+        result = func()
+    elapsed = time.perf_counter() - start
+
+    report = {
+        'stage': name,
+        'items': items,
+        'seconds': round(elapsed, 3),
+        'profiles_per_sec': round(items / elapsed, 1) if elapsed else None,
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+    }
+    if trace_memory:
+        report['peak_alloc_mb'] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1)
+        tracemalloc.stop()
+
+    cycle = scrape_metrics.last_cycle
+    for stage in ('fetch', 'parse'):
+        values = sorted(cycle.samples.get(stage, []))
+        if values:
+            report[f'{stage}_p50_ms'] = ms(quantile(values, 0.5))
+            report[f'{stage}_p99_ms'] = ms(quantile(values, 0.99))
+    if cycle.counters:
+        report['counters'] = dict(cycle.counters)
+    return result, report
+
+
+def print_report(reports):
+    columns = [('stage', 12), ('items', 7), ('seconds', 9), ('profiles_per_sec', 11),
+               ('fetch_p50_ms', 9), ('fetch_p99_ms', 9), ('parse_p50_ms', 9), ('parse_p99_ms', 9),
+               ('peak_rss_mb', 9), ('peak_alloc_mb', 9)]
+    headers = ['stage', 'items', 'seconds', 'profiles/s', 'fetch p50', 'fetch p99',
+               'parse p50', 'parse p99', 'rss MB', 'alloc MB']
+    print(' '.join(f"{header:>{width}}" for header, (_, width) in zip(headers, columns)))
+    for report in reports:
+        cells = []
+        for key, width in columns:
+            value = report.get(key)
+            cells.append(f"{'-' if value is None else value:>{width}}")
+        print(' '.join(cells))
+    for report in reports:
+        if report.get('counters'):
+            print(f"{report['stage']}: {report['counters']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scraper against a local stand-in server")
+    parser.add_argument("--profiles", type=int, default=500, help="Profiles to scrape (default: 500)")
+    parser.add_argument("--badges", type=int, default=60, help="Badges per profile (default: 60)")
+    parser.add_argument("--badge-spread", type=int, default=20, help="Vary badge counts by +/- this much")
+    parser.add_argument("--latency-ms", type=float, default=50, help="Base response delay (default: 50)")
+    parser.add_argument("--jitter-ms", type=float, default=50, help="Extra random response delay (default: 50)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of HTTP 500 responses")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of HTTP 429 responses")
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS,
+                        help=f"Concurrent fetches (default: {DEFAULT_MAX_WORKERS})")
+    parser.add_argument("--rate", type=float, default=1000,
+                        help="Requests per second allowed by the rate limiter (default: 1000)")
+    parser.add_argument("--parser", dest="parser_backend", default=None, help="Parser backend")
+    parser.add_argument("--score-members", type=int, default=50000,
+                        help="Rows scored in the score stage (default: 50000)")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Report peak Python allocations per stage (slows stages down)")
+    parser.add_argument("--json", dest="json_file", default=None, help="Also write the report as JSON")
+    args = parser.parse_args()
+
+    config = StandInConfig(
+        badges=args.badges, badge_spread=args.badge_spread,
+        latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000,
+        error_rate=args.error_rate, throttle_rate=args.throttle_rate
+    )
+    server = start_server(config)
+    configure_session(pool_maxsize=max(args.workers, 10))
+    urls = server.profile_urls(args.profiles)
+    print(f"Stand-in server at {server.base_url}, {args.profiles} profiles x ~{args.badges} badges")
+
+    reports = []
+    with tempfile.TemporaryDirectory(prefix="bench-scraper-") as work_dir:
+        cache = ProfileCache(os.path.join(work_dir, "cache.db"))
+
+        def scrape():
+            return scrape_rows(urls, max_workers=args.workers, per_host_limit=args.workers,
+                               cache=cache, parser=args.parser_backend, rate=args.rate)
+
+        rows, report = run_stage('scrape-cold', scrape, len(urls), args.trace_memory)
+        reports.append(report)
+        _, report = run_stage('scrape-warm', scrape, len(urls), args.trace_memory)
+        reports.append(report)
+
+        # Score a cohort of the requested size built from the scraped rows
+        cohort = [rows[i % len(rows)] for i in range(args.score_members)] if rows else []
+        _, report = run_stage('score', lambda: score_rows(cohort), len(cohort), args.trace_memory)
+        reports.append(report)
+
+        store = ProfileStore(os.path.join(work_dir, "profiles.db"))
+        output_file = os.path.join(work_dir, "profiles_data.csv")
+
+        def publish():
+            store.upsert_rows(rows)
+            export_store(store, output_file)
+
+        _, report = run_stage('publish', publish, len(rows), args.trace_memory)
+        reports.append(report)
+
+    server.shutdown()
+    server.server_close()
+
+    print_report(reports)
+    if args.json_file:
+        with open(args.json_file, 'w', encoding='utf-8') as f:
+            json.dump({'config': vars(args), 'stages': reports}, f, indent=2)
+        print(f"Report written to {args.json_file}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
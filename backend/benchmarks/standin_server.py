@@ -0,0 +1,193 @@
+"""
+Local stand-in for the public-profile site.
+
+Serves synthetic profile pages at /public_profiles/<id> from a threaded
+HTTP server, with injectable latency and error/throttle rates so the
+scraper can be benchmarked without touching the real site. Responses
+carry a strong ETag and honour If-None-Match, like the real pages.
+
+Usage:
+    python benchmarks/standin_server.py [--port 8765] [--badges 60]
+                                        [--latency-ms 50] [--error-rate 0.01]
+"""
+import argparse
+import hashlib
+import os
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_profiles import profile_html  # noqa: E402
+
+PROFILE_PATH = re.compile(r'^/public_profiles/(\d+)$')
+
+
+class StandInConfig:
+    """
+    Behaviour of the stand-in server.
+
+    Attributes:
+        badges (int): Badges per profile (or the mean when badge_spread > 0)
+        badge_spread (int): Badge counts vary uniformly by +/- this much
+        latency (float): Base response delay in seconds
+        jitter (float): Extra uniformly distributed delay in seconds
+        error_rate (float): Fraction of requests answered with HTTP 500
+        throttle_rate (float): Fraction of requests answered with HTTP 429
+        retry_after (int): Retry-After seconds sent with 429 responses
+        seed (int): Cohort seed passed to profile_html
+    """
+
+    def __init__(self, badges=60, badge_spread=0, latency=0.0, jitter=0.0,
+                 error_rate=0.0, throttle_rate=0.0, retry_after=0, seed=0):
+        self.badges = badges
+        self.badge_spread = badge_spread
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.seed = seed
+
+
+class StandInServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the config and rendered pages."""
+
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, address, config):
+        super().__init__(address, StandInHandler)
+        self.config = config
+        self.requests_served = 0
+        self._pages = {}
+        self._lock = threading.Lock()
+
+    def page(self, profile_id):
+        """Returns (body bytes, etag) for a profile, rendering it once."""
+        with self._lock:
+            cached = self._pages.get(profile_id)
+        if cached is not None:
+            return cached
+
+        config = self.config
+        rng = random.Random(f"badges:{config.seed}:{profile_id}")
+        badge_count = max(0, config.badges + rng.randint(-config.badge_spread, config.badge_spread))
+        body = profile_html(profile_id, badge_count, seed=config.seed).encode('utf-8')
+        page = (body, '"' + hashlib.sha1(body).hexdigest() + '"')
+        with self._lock:
+            self._pages[profile_id] = page
+        return page
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def profile_urls(self, count):
+        """URLs of the first ``count`` synthetic profiles."""
+        return [f"{self.base_url}/public_profiles/{i}" for i in range(count)]
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body=b'', headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        config = server.config
+        with server._lock:
+            server.requests_served += 1
+
+        match = PROFILE_PATH.match(self.path)
+        if not match:
+            self._send(404, b'not found')
+            return
+
+        delay = config.latency + (random.uniform(0, config.jitter) if config.jitter else 0)
+        if delay:
+            time.sleep(delay)
+
+        roll = random.random()
+        if roll < config.throttle_rate:
+            self._send(429, b'slow down', {'Retry-After': str(config.retry_after)})
+            return
+        if roll < config.throttle_rate + config.error_rate:
+            self._send(500, b'injected error')
+            return
+
+        body, etag = server.page(int(match.group(1)))
+        if self.headers.get('If-None-Match') == etag:
+            self._send(304, headers={'ETag': etag})
+            return
+        self._send(200, body, {'Content-Type': 'text/html; charset=utf-8', 'ETag': etag})
+
+
+def start_server(config=None, host='127.0.0.1', port=0):
+    """
+    Starts the stand-in server on a background thread.
+
+    Args:
+        config (StandInConfig): Server behaviour (default: StandInConfig())
+        host (str): Interface to bind
+        port (int): Port to bind, 0 picks a free one
+
+    Returns:
+        StandInServer: Running server; call shutdown() to stop it
+    """
+    server = StandInServer((host, port), config or StandInConfig())
+    thread = threading.Thread(target=server.serve_forever, name="standin-server", daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve synthetic public-profile pages")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--badges", type=int, default=60, help="Badges per profile (default: 60)")
+    parser.add_argument("--badge-spread", type=int, default=0, help="Vary badge counts by +/- this much")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Base response delay")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Extra random response delay")
+    parser.add_argument("--error-rate", type=float, default=0, help="Fraction of HTTP 500 responses")
+    parser.add_argument("--throttle-rate", type=float, default=0, help="Fraction of HTTP 429 responses")
+    parser.add_argument("--retry-after", type=int, default=0, help="Retry-After seconds for 429s")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    config = StandInConfig(
+        badges=args.badges, badge_spread=args.badge_spread,
+        latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000,
+        error_rate=args.error_rate, throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after, seed=args.seed
+    )
+    server = StandInServer((args.host, args.port), config)
+    print(f"Serving synthetic profiles at {server.base_url}/public_profiles/<id>")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
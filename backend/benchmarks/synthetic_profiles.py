@@ -0,0 +1,92 @@
+"""
+Synthetic Google Cloud Skills Boost public-profile pages.
+
+Pages carry the markup scrape_cloud_profile reads (h1.ql-display-small,
+the public-profile__hero stats, div.profile-badge with
+span.ql-title-medium and div.ql-caption) plus page noise of a realistic
+size, so parse timings are comparable to the real site. Output is
+deterministic for a given profile id and seed.
+"""
+import random
+
+from badge_classifier import DEFAULT_RULES
+
+FIRST_NAMES = ['Ada', 'Alan', 'Grace', 'Linus', 'Margaret', 'Dennis', 'Barbara', 'Ken', 'Frances', 'Edsger']
+LAST_NAMES = ['Lovelace', 'Turing', 'Hopper', 'Torvalds', 'Hamilton', 'Ritchie', 'Liskov', 'Thompson', 'Allen', 'Dijkstra']
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+
+def badge_names(rng, count):
+    """
+    Picks a mix of badge names covering every badge type.
+
+    Args:
+        rng (random.Random): Random source
+        count (int): Number of badges
+
+    Returns:
+        list: Badge names
+    """
+    names = []
+    for i in range(count):
+        kind = rng.random()
+        if kind < 0.15:
+            names.append(f"Level {rng.randint(1, 3)}: Arcade Game {i}")
+        elif kind < 0.25:
+            names.append(f"Skills Boost Arcade Trivia {rng.choice(MONTHS)} 2025 Week {rng.randint(1, 4)}")
+        elif kind < 0.35:
+            names.append(rng.choice(DEFAULT_RULES['lab_free_courses']))
+        elif kind < 0.37:
+            names.append(rng.choice(DEFAULT_RULES['special_game_badges']))
+        else:
+            names.append(f"Build and Deploy Skill Badge {rng.randint(1, 200)}")
+    return names
+
+
+def profile_html(profile_id, badge_count, seed=0, noise_kb=24):
+    """
+    Renders a synthetic public-profile page.
+
+    Args:
+        profile_id (int): Profile number, selects the name and badges
+        badge_count (int): Number of badge containers
+        seed (int): Extra seed, change it to get a different cohort
+        noise_kb (int): Approximate size of non-profile markup (scripts,
+                        styles) in KiB
+
+    Returns:
+        str: HTML document
+    """
+    rng = random.Random(f"{seed}:{profile_id}")
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {profile_id}"
+
+    parts = [
+        '<!DOCTYPE html><html lang="en"><head><meta charset="utf-8">',
+        f'<title>{name} | Google Cloud Skills Boost</title>',
+        ''.join(f'<link rel="stylesheet" href="/assets/app-{i}.css">' for i in range(6)),
+        '<script>window.__ANALYTICS__={',
+        ','.join(f'"k{i}":"{"x" * 40}"' for i in range(noise_kb * 1024 // 50)),
+        '};</script></head><body><header class="ql-header"><nav>',
+        ''.join(f'<a class="nav-link" href="/nav/{i}">Link {i}</a>' for i in range(20)),
+        '</nav></header><main class="public-profile">',
+        '<div class="public-profile__hero"><img class="ql-avatar" src="/avatar.png">',
+        f'<h1 class="ql-display-small">{name}</h1>',
+        f'<p class="ql-body-1">Member since {rng.randint(2019, 2024)}</p>',
+        '<div class="profile-stats">',
+        f'<div class="ql-subhead-1">{badge_count}</div><div class="ql-headline-6">Badges</div>',
+        f'<div class="ql-subhead-1">{rng.choice(["Bronze", "Silver", "Gold"])}</div>'
+        '<div class="ql-headline-6">League</div>',
+        '</div></div><div class="profile-badges">',
+    ]
+    for i, badge_name in enumerate(badge_names(rng, badge_count)):
+        parts.append(
+            f'<div class="profile-badge"><a class="badge-image" href="/badges/{i}">'
+            f'<img alt="Badge for {badge_name}" src="https://cdn.qwiklabs.com/badge{i}.png"></a>'
+            f'<span class="ql-title-medium l-mts">\n{badge_name}\n</span>'
+            f'<div class="ql-caption l-mbs">\nEarned {rng.choice(MONTHS)} {rng.randint(1, 28)}, 2025 EDT\n</div>'
+            '<ql-button class="badge-share" icon="share">Share</ql-button></div>'
+        )
+    parts.append('</div></main><footer class="ql-footer">')
+    parts.append(''.join(f'<a href="/footer/{i}">Footer {i}</a>' for i in range(30)))
+    parts.append('</footer></body></html>')
+    return ''.join(parts)
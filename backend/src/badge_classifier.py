@@ -0,0 +1,232 @@
+import hashlib
+import json
+import os
+import threading
+
+# Default rules location, overridable from the environment
+DEFAULT_RULES_PATH = os.environ.get(
+    'BADGE_RULES_FILE',
+    os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'rules', 'badge_rules.json'))
+)
+
+# Rules used when no rules file is available
+DEFAULT_RULES = {
+    'lab_free_courses': [
+        "Digital Transformation with Google Cloud",
+        "Exploring Data Transformation with Google Cloud",
+        "Infrastructure and Application Modernization with Google Cloud",
+        "Scaling with Google Cloud Operations",
+        "Innovating with Google Cloud Artificial Intelligence",
+        "Trust and Security with Google Cloud",
+        "Google Drive",
+        "Google Docs",
+        "Google Slides",
+        "Google Meet",
+        "Google Sheets",
+        "Google Calendar",
+        "Responsible AI: Applying AI Principles with Google Cloud",
+        "Responsible AI for Digital Leaders with Google Cloud",
+        "Customer Experience with Google AI Architecture",
+        "Machine Learning Operations (MLOps) with Vertex AI: Model Evaluation",
+        "Conversational AI on Vertex AI and Dialogflow CX",
+        "Building Complex End to End Self-Service Experiences in Dialogflow CX",
+    ],
+    'special_game_badges': ["Arcade TechCare"],
+    'game_badge_prefixes': ["Level "],
+    'game_badge_keywords': ["Base Camp"],
+}
+
+BADGE_TYPES = ('lab_badges', 'skill_badges', 'game_badges', 'trivia_badges', 'special_game_badges')
+
+# Upper bound on memoized badge names; badge names repeat heavily across a
+# cohort, so this comfortably holds every distinct badge of a season
+MAX_CACHED_NAMES = 20000
+
+
+class BadgeClassifier:
+    """
+    Maps badge names to badge types using precompiled rules.
+
+    Lab-free courses and special games are frozenset lookups, game badge
+    prefixes a single str.startswith call, and every classified name is
+    memoized, so repeated names across a cohort cost one dict lookup.
+    """
+
+    def __init__(self, rules=None):
+        rules = dict(DEFAULT_RULES, **(rules or {}))
+        self.lab_free_courses = frozenset(rules['lab_free_courses'])
+        self.special_game_badges = frozenset(rules['special_game_badges'])
+        self.game_badge_prefixes = tuple(rules['game_badge_prefixes'])
+        self.game_badge_keywords = tuple(rules['game_badge_keywords'])
+        # Identifies the rule set, so results classified under other rules can be detected
+        canonical = json.dumps({key: sorted(rules[key]) for key in DEFAULT_RULES}, sort_keys=True)
+        self.digest = hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+        # Rules file and its version (see file_source) when built by from_file
+        self.path = None
+        self.source = None
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path=None):
+        """
+        Builds a classifier from a JSON rules file.
+
+        Missing keys fall back to DEFAULT_RULES; a missing or unreadable file
+        falls back to DEFAULT_RULES entirely.
+
+        Args:
+            path (str): Rules file (default: DEFAULT_RULES_PATH)
+
+        Returns:
+            BadgeClassifier: Classifier for the rules
+        """
+        path = path or DEFAULT_RULES_PATH
+        # Taken before reading, so an edit made while loading is seen next time
+        source = file_source(path)
+        rules = None
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    rules = json.load(f)
+                if not isinstance(rules, dict):
+                    raise ValueError("expected a JSON object")
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable badge rules {path}: {e}")
+                rules = None
+        classifier = cls(rules)
+        classifier.path = path
+        classifier.source = source
+        return classifier
+
+    def _classify(self, badge_name):
+        # Trivia badges end with a week marker, e.g. "... Week 3"
+        if badge_name[-6:-2] == "Week":
+            return 'trivia_badges'
+
+        if badge_name.startswith(self.game_badge_prefixes) or any(
+                keyword in badge_name for keyword in self.game_badge_keywords):
+            return 'game_badges'
+
+        if badge_name in self.special_game_badges:
+            return 'special_game_badges'
+
+        if badge_name in self.lab_free_courses:
+            return 'lab_badges'
+
+        # Default to skill badge if no other category matches
+        return 'skill_badges'
+
+    def classify(self, badge_name):
+        """
+        Returns the badge type of a badge name.
+
+        Args:
+            badge_name (str): Name of the badge
+
+        Returns:
+            str: One of BADGE_TYPES
+        """
+        badge_type = self._cache.get(badge_name)
+        if badge_type is None:
+            badge_type = self._classify(badge_name)
+            with self._lock:
+                if len(self._cache) >= MAX_CACHED_NAMES:
+                    self._cache.clear()
+                self._cache[badge_name] = badge_type
+        return badge_type
+
+    def classify_many(self, badge_names):
+        """
+        Classifies a batch of badge names.
+
+        Args:
+            badge_names (iterable): Badge names
+
+        Returns:
+            list: Badge types, in input order
+        """
+        cache = self._cache
+        classify = self.classify
+        return [cache.get(name) or classify(name) for name in badge_names]
+
+
+_classifier = None
+_classifier_lock = threading.Lock()
+
+
+def file_source(path):
+    """Identifies a rules file version by its modification time and size (None if missing)."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def get_classifier():
+    """
+    Returns the process-wide classifier, loading the rules file on first use.
+
+    Returns:
+        BadgeClassifier: Shared classifier
+    """
+    global _classifier
+    if _classifier is None:
+        with _classifier_lock:
+            if _classifier is None:
+                _classifier = BadgeClassifier.from_file()
+    return _classifier
+
+
+def load_rules(path=None):
+    """
+    Replaces the shared classifier with one built from a rules file, e.g.
+    after the season's rules were edited.
+
+    Args:
+        path (str): Rules file (default: DEFAULT_RULES_PATH)
+
+    Returns:
+        BadgeClassifier: The new shared classifier
+    """
+    global _classifier
+    classifier = BadgeClassifier.from_file(path)
+    with _classifier_lock:
+        _classifier = classifier
+    return classifier
+
+
+def reload_rules_if_changed(path=None):
+    """
+    Reloads the shared classifier when the rules file was edited, created
+    or removed since it was loaded, so season rule updates apply from the
+    next scrape on without a restart. Cached profiles classified under the
+    old rules are reclassified when reused.
+
+    Args:
+        path (str): Rules file (default: DEFAULT_RULES_PATH)
+
+    Returns:
+        bool: True if the rules were reloaded
+    """
+    path = path or DEFAULT_RULES_PATH
+    classifier = get_classifier()
+    if classifier.path == path and classifier.source == file_source(path):
+        return False
+    classifier = load_rules(path)
+    print(f"Loaded badge rules from {path} (rules {classifier.digest})")
+    return True
+
+
+def classify_badges(badge_names):
+    """
+    Classifies a batch of badge names with the shared classifier.
+
+    Args:
+        badge_names (iterable): Badge names
+
+    Returns:
+        list: Badge types, in input order
+    """
+    return get_classifier().classify_many(badge_names)
@@ -0,0 +1,189 @@
+import json
+import math
+import os
+import threading
+import time
+
+from publisher import atomic_write_bytes
+
+# Publishes kept in the feed; older clients get a full snapshot instead
+DEFAULT_CAPACITY = int(os.environ.get('CHANGEFEED_CAPACITY', 100))
+
+
+def changes_path_for(csv_path):
+    """Returns the change feed file published alongside a leaderboard CSV."""
+    return os.path.splitext(csv_path)[0] + '.changes.json'
+
+
+def row_key(row):
+    """
+    Identifies a leaderboard row across publishes: its profile URL, or the
+    name for rows without one (hand-edited CSVs).
+    """
+    url = row.get('profile_url')
+    if isinstance(url, str) and url:
+        return url
+    return f"name:{row.get('name')}"
+
+
+def _clean(value):
+    # NaN is not valid JSON and never equal to itself
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def clean_row(row):
+    """Returns a row with NaN values replaced by None."""
+    return {column: _clean(value) for column, value in row.items()}
+
+
+def diff_rows(old_rows, new_rows):
+    """
+    Computes row-level changes between two leaderboards.
+
+    Args:
+        old_rows (list): Previously published row dicts
+        new_rows (list): Newly published row dicts
+
+    Returns:
+        tuple: (upserts, removals) - rows that are new or changed, and the
+               keys (see row_key) of rows that disappeared
+    """
+    old = {row_key(row): clean_row(row) for row in old_rows}
+    upserts = []
+    seen = set()
+    for row in new_rows:
+        key = row_key(row)
+        seen.add(key)
+        row = clean_row(row)
+        if old.get(key) != row:
+            upserts.append(row)
+    removals = [key for key in old if key not in seen]
+    return upserts, removals
+
+
+class ChangeFeed:
+    """
+    Bounded log of row-level leaderboard changes, persisted as JSON.
+
+    Every publish gets the next generation number and one entry with the
+    rows it added or changed and the keys it removed. Only the newest
+    ``capacity`` entries are kept, like a ring buffer; a client whose last
+    generation has fallen out of the feed needs a full snapshot.
+
+    Before recording, the feed is reloaded if another process (e.g. an
+    isolated scrape) published to the file since, so generations never
+    repeat or go backwards.
+    """
+
+    def __init__(self, path, capacity=DEFAULT_CAPACITY):
+        self.path = path
+        self.capacity = max(1, capacity)
+        self.generation = 0
+        self.entries = []
+        self._source = None
+        self._lock = threading.Lock()
+        self.load()
+
+    def _file_source(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def load(self):
+        """Loads the feed from disk, starting empty if the file is missing or corrupt."""
+        source = self._file_source()
+        if source is None:
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            with self._lock:
+                self.generation = int(data.get('generation', 0))
+                self.entries = list(data.get('entries', []))[-self.capacity:]
+                self._source = source
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"Ignoring unreadable change feed {self.path}: {e}")
+
+    def reload_if_changed(self):
+        """
+        Reloads the feed if the file changed since this object last loaded
+        or wrote it.
+
+        Returns:
+            bool: True if the feed was reloaded
+        """
+        source = self._file_source()
+        if source is None or source == self._source:
+            return False
+        self.load()
+        return True
+
+    def record(self, upserts, removals, published_at=None):
+        """
+        Appends a publish to the feed and writes it to disk atomically.
+
+        Args:
+            upserts (list): New or changed row dicts
+            removals (list): Keys of removed rows
+            published_at (float): Publish timestamp (default: now)
+
+        Returns:
+            int: Generation assigned to the publish
+        """
+        self.reload_if_changed()
+        with self._lock:
+            self.generation += 1
+            self.entries.append({
+                'generation': self.generation,
+                'published_at': published_at or time.time(),
+                'upserts': upserts,
+                'removals': removals,
+            })
+            del self.entries[:-self.capacity]
+            body = json.dumps({'generation': self.generation, 'entries': self.entries},
+                              ensure_ascii=False).encode('utf-8')
+            generation = self.generation
+        atomic_write_bytes(self.path, body)
+        self._source = self._file_source()
+        return generation
+
+    def changes_since(self, since):
+        """
+        Collects the changes published after a generation.
+
+        Later changes to the same row replace earlier ones, so every key
+        appears at most once, either as an upsert or as a removal.
+
+        Args:
+            since (int): Last generation the client has applied
+
+        Returns:
+            tuple: (upserts, removals), or None if the client must reload
+                   the full leaderboard (its generation is unknown or no
+                   longer covered by the feed)
+        """
+        with self._lock:
+            generation = self.generation
+            entries = list(self.entries)
+
+        if since == generation:
+            return [], []
+        oldest = entries[0]['generation'] if entries else generation + 1
+        if since > generation or since < oldest - 1:
+            return None
+
+        changes = {}
+        for entry in entries:
+            if entry['generation'] <= since:
+                continue
+            for row in entry['upserts']:
+                changes[row_key(row)] = row
+            for key in entry['removals']:
+                changes[key] = None
+        upserts = [row for row in changes.values() if row is not None]
+        removals = [key for key, row in changes.items() if row is None]
+        return upserts, removals
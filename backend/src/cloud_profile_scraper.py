@@ -1,73 +1,183 @@
 import requests
-from bs4 import BeautifulSoup
 import json
 import time
 import pandas as pd
 import argparse
 import os
-
-
-def scrape_cloud_profile(url):
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from http_session import get_session, configure_session, POOL_MAXSIZE
+from rate_limiter import HostLimiter, RetryBudget, DEFAULT_RATE, DEFAULT_MAX_RETRIES
+from profile_cache import ProfileCache, badge_section_digest
+from profile_store import ProfileStore
+from roster import load_roster, parse_shard, in_shard, DEFAULT_ROSTER_PATH
+from publisher import atomic_write
+from changefeed import ChangeFeed, changes_path_for, diff_rows
+from columnar import columnar_path_for, csv_source_key, write_columnar
+from leaderboard_index import is_member_row
+from metrics import scrape_metrics
+from scoring import score_rows
+from badge_classifier import get_classifier, classify_badges, reload_rules_if_changed, BADGE_TYPES
+from profile_parser import make_soup, extract_profile, PARSER_BACKENDS, DEFAULT_PARSER
+
+# Default limits for concurrent profile fetching
+DEFAULT_MAX_WORKERS = 16
+DEFAULT_PER_HOST_LIMIT = 8
+
+
+def scrape_cloud_profile(url, cache=None, parser=None, limiter=None):
     """
     Scrapes data from a Google Cloud Skills Boost public profile.
 
+    When a ProfileCache is given, the request is made conditional on the
+    stored ETag/Last-Modified, and the previous result is reused (marked with
+    ``from_cache``) if the server answers 304 or the badge section is
+    unchanged, skipping the HTML parse entirely.
+
+    When a HostLimiter is given, the request is paced by it and throttled or
+    transient failures are retried with backoff.
+
     Args:
         url (str): URL of the public profile
+        cache (ProfileCache): Optional per-profile validator and result cache
+        parser (str): Parser backend passed to parse_profile_page
+        limiter (rate_limiter.HostLimiter): Optional pacing and retry policy
 
     Returns:
         dict: Profile data including badges categorized by type
     """
     profile_start_time = time.time()
-    
-    # Send request to the profile page
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-    }
 
+    cached_entry = cache.get(url) if cache else None
+    request_headers = cache.conditional_headers(url) if cache else {}
+
+    # Send request to the profile page over the shared keep-alive session
     try:
         print(f"Requesting profile URL: {url}")
-        response = requests.get(url, headers=headers)
+        if limiter:
+            # Records fetch latency per request and its pacing wait separately
+            response = limiter.get(get_session(), url, headers=request_headers)
+        else:
+            with scrape_metrics.timer('fetch'):
+                response = get_session().get(url, headers=request_headers)
+        if response.status_code == 304 and cached_entry and cached_entry.get('profile_data') is not None:
+            print(f"Profile not modified, reusing cached data: {url}")
+            scrape_metrics.increment('profiles_not_modified')
+            return reuse_cached_profile(cache, url, cached_entry)
         response.raise_for_status()  # Raise exception for 4XX/5XX status codes
     except requests.exceptions.RequestException as e:
         print(f"Error fetching the profile: {e}")
+        scrape_metrics.increment('profiles_failed')
         return None
 
-    # Parse HTML content
-    soup = BeautifulSoup(response.text, 'html.parser')
+    scrape_metrics.observe('fetch_bytes', len(response.content))
+
+    etag = response.headers.get('ETag')
+    last_modified = response.headers.get('Last-Modified')
+
+    digest = None
+    if cache:
+        digest = badge_section_digest(response.text)
+        if (cached_entry and cached_entry.get('digest') == digest
+                and cached_entry.get('profile_data') is not None):
+            cache.update(url, etag=etag, last_modified=last_modified, digest=digest)
+            print(f"Badge section unchanged, reusing cached data: {url}")
+            scrape_metrics.increment('profiles_unchanged')
+            return reuse_cached_profile(cache, url, cache.get(url))
+
+    profile_data = parse_profile_page(response.text, url, parser=parser)
+    scrape_metrics.increment('profiles_parsed')
+
+    if cache:
+        cache.update(url, etag=etag, last_modified=last_modified, digest=digest, profile_data=profile_data)
+
+    # Calculate and log profile scraping time
+    profile_end_time = time.time()
+    profile_time_seconds = profile_end_time - profile_start_time
+    print(f"Time to scrape profile {profile_data.get('name', url)}: {profile_time_seconds:.2f} seconds")
+
+    return profile_data
+
+
+def reuse_cached_profile(cache, url, cached_entry):
+    """
+    Returns a cached profile for reuse without re-parsing.
+
+    Profiles classified under different badge rules (e.g. after the season's
+    rules file was edited) are re-classified from their cached badge list and
+    stored back, and are not marked ``from_cache`` so their row is rescored.
+
+    Args:
+        cache (ProfileCache): Cache holding the entry
+        url (str): Profile URL
+        cached_entry (dict): Cache entry with 'profile_data'
+
+    Returns:
+        dict: Profile data
+    """
+    profile_data = cached_entry['profile_data']
+    if profile_data.get('badge_rules') == get_classifier().digest:
+        return dict(profile_data, from_cache=True)
+
+    print(f"Badge rules changed, re-classifying cached badges: {url}")
+    profile_data = dict(profile_data)
+    badges = [dict(badge) for badge in profile_data.get('badges', [])]
+    profile_data['badge_counts'], profile_data['badges_by_type'] = categorize_badges(badges)
+    profile_data['badges'] = sum(profile_data['badges_by_type'].values(), [])
+    profile_data['badge_rules'] = get_classifier().digest
+    cache.update(url, etag=cached_entry.get('etag'), last_modified=cached_entry.get('last_modified'),
+                 profile_data=profile_data)
+    return profile_data
+
 
+def categorize_badges(badges):
+    """
+    Classifies badges and groups them by type.
+
+    Sets the 'type' key of every badge dict.
+
+    Args:
+        badges (list): Badge dicts with a 'name' key
+
+    Returns:
+        tuple: (badge_counts, badges_by_type)
+    """
+    badge_counts = {badge_type: 0 for badge_type in BADGE_TYPES}
+    badge_counts['total_badges'] = 0
+    badges_by_type = {badge_type: [] for badge_type in BADGE_TYPES}
+
+    with scrape_metrics.timer('classify'):
+        badge_types = classify_badges([badge_info['name'] for badge_info in badges])
+    for badge_info, badge_type in zip(badges, badge_types):
+        badge_info['type'] = badge_type
+        badges_by_type[badge_type].append(badge_info)
+        badge_counts[badge_type] += 1
+    badge_counts['total_badges'] = len(badges)
+
+    return badge_counts, badges_by_type
+
+
+def parse_profile_page(html, url, parser=None):
+    """
+    Extracts profile name, stats and categorized badges from profile HTML.
+
+    Args:
+        html (str): Raw HTML of the public profile page
+        url (str): URL the page was fetched from
+        parser (str): Parser backend from profile_parser.PARSER_BACKENDS
+                      (default: profile_parser.DEFAULT_PARSER)
+
+    Returns:
+        dict: Profile data including badges categorized by type
+    """
     # Extract profile data
     profile_data = {}
     
-    # Store the profile URL
+    # Store the profile URL and the badge rules it was classified with
     profile_data['profile_url'] = url
-
-    # Profile name
-    try:
-        profile_name = soup.select_one('h1.ql-display-small').text.strip()
-        profile_data['name'] = profile_name
-        print(f"Successfully found profile name: {profile_name}")
-    except (AttributeError, TypeError):
-        profile_data['name'] = "Name not found"
-        print("Could not find profile name")
-
-    # Extract profile details
-    try:
-        profile_details = soup.select_one('div.public-profile__hero')
-        if profile_details:
-            # Extract completion stats
-            stats = {}
-            stat_elements = profile_details.select('div.ql-subhead-1')
-            label_elements = profile_details.select('div.ql-headline-6')
-
-            for i in range(min(len(stat_elements), len(label_elements))):
-                label = label_elements[i].text.strip()
-                value = stat_elements[i].text.strip()
-                stats[label] = value
-
-            profile_data['stats'] = stats
-    except Exception as e:
-        print(f"Error extracting profile details: {e}")
-        profile_data['stats'] = {}
+    profile_data['badge_rules'] = get_classifier().digest
 
     # Initialize badge counters and lists
     badge_counts = {
@@ -87,122 +197,170 @@ def scrape_cloud_profile(url):
         'special_game_badges': []
     }
 
-    # Extract badges
     try:
-        # Find all badge elements
-        badge_containers = soup.select('div.profile-badge')
+        # Parse HTML content
+        with scrape_metrics.timer('parse'):
+            profile_name, stats, badges = extract_profile(make_soup(html, parser))
+    except Exception as e:
+        print(f"Error parsing profile page: {e}")
+        import traceback
+        traceback.print_exc()
+        profile_data['name'] = "Name not found"
+        profile_data['stats'] = {}
+        profile_data['badge_counts'] = badge_counts
+        profile_data['badges_by_type'] = badges_by_type
+        profile_data['badges'] = []
+        return profile_data
 
-        if not badge_containers:
-            print("No badge containers found with selector 'div.profile-badge'")
-            return profile_data
+    # Profile name
+    if profile_name is not None:
+        profile_data['name'] = profile_name
+        print(f"Successfully found profile name: {profile_name}")
+    else:
+        profile_data['name'] = "Name not found"
+        print("Could not find profile name")
 
-        print(f"Found {len(badge_containers)} badge containers")
+    # Profile details
+    if stats is not None:
+        profile_data['stats'] = stats
 
-        # Process each badge
-        for badge_container in badge_containers:
-            badge_info = {}
+    if badges is None:
+        print("No badge containers found with selector 'div.profile-badge'")
+        return profile_data
 
-            # Extract badge name - looking for the span with class ql-title-medium
-            name_elem = badge_container.select_one('span.ql-title-medium')
-            if not name_elem:
-                # Try alternative selectors
-                name_elem = badge_container.select_one('div.ql-title')
-                if not name_elem:
-                    continue
+    print(f"Found {len(badges)} badges")
 
-            badge_name = name_elem.text.strip()
-            badge_info['name'] = badge_name
+    # Classify all badges in one batch and group them by type
+    badge_counts, badges_by_type = categorize_badges(badges)
 
-            # Badge date
-            date_elem = badge_container.select_one('div.ql-caption')
-            if date_elem:
-                badge_info['date'] = date_elem.text.strip()
+    # Add badge counts and categorized badges to profile data
+    profile_data['badge_counts'] = badge_counts
+    profile_data['badges_by_type'] = badges_by_type
+    profile_data['badges'] = sum(badges_by_type.values(), [])  # All badges in a flat list
 
-            # Badge image
-            img_elem = badge_container.select_one('img')
-            if img_elem and img_elem.has_attr('src'):
-                badge_info['image'] = img_elem['src']
+    return profile_data
 
-            # Identify badge type based on name rules
-            badge_type = identify_badge_type(badge_name, badge_info.get('date', ''))
-            badge_info['type'] = badge_type
 
-            # Add badge to appropriate list and increment counter
-            badges_by_type[badge_type].append(badge_info)
-            badge_counts[badge_type] += 1
-            badge_counts['total_badges'] += 1
+def scrape_profiles(profile_urls, max_workers=DEFAULT_MAX_WORKERS, per_host_limit=DEFAULT_PER_HOST_LIMIT, cache=None, parser=None,
+                    rate=DEFAULT_RATE, max_retries=DEFAULT_MAX_RETRIES, progress=None):
+    """
+    Scrapes many public profiles concurrently.
 
-        # Add badge counts and categorized badges to profile data
-        profile_data['badge_counts'] = badge_counts
-        profile_data['badges_by_type'] = badges_by_type
-        profile_data['badges'] = sum(badges_by_type.values(), [])  # All badges in a flat list
+    At most ``max_workers`` requests are in flight at once. Each host gets a
+    HostLimiter that paces requests to ``rate`` per second and adapts its
+    concurrency (up to ``per_host_limit``) to 429/5xx responses. Retries of
+    all hosts draw from one per-cycle retry budget. Results are returned in
+    the same order as ``profile_urls``.
 
-    except Exception as e:
-        print(f"Error extracting badges: {e}")
-        import traceback
-        traceback.print_exc()
-        profile_data['badge_counts'] = badge_counts
-        profile_data['badges_by_type'] = badges_by_type
-        profile_data['badges'] = []
+    Args:
+        profile_urls (list): URLs of the public profiles
+        max_workers (int): Maximum number of requests in flight
+        per_host_limit (int): Maximum number of concurrent requests per host
+        cache (ProfileCache): Optional cache passed to scrape_cloud_profile
+        parser (str): Parser backend passed to scrape_cloud_profile
+        rate (float): Sustained requests per second per host
+        max_retries (int): Maximum retries per profile
+        progress (callable): Called as progress(done, total) after each profile
 
-    # Calculate and log profile scraping time
-    profile_end_time = time.time()
-    profile_time_seconds = profile_end_time - profile_start_time
-    print(f"Time to scrape profile {profile_data.get('name', url)}: {profile_time_seconds:.2f} seconds")
-    
-    return profile_data
+    Returns:
+        list: Profile data dicts from scrape_cloud_profile (None for failures),
+              in input order
+    """
+    profile_urls = list(profile_urls)
+    if not profile_urls:
+        return []
+
+    max_workers = max(1, min(max_workers, len(profile_urls)))
+    per_host_limit = max(1, per_host_limit)
+
+    retry_budget = RetryBudget.for_cycle(len(profile_urls))
+    host_limiters = {}
+    host_lock = threading.Lock()
+
+    def host_limiter(url):
+        host = urlparse(url).netloc.lower()
+        with host_lock:
+            if host not in host_limiters:
+                host_limiters[host] = HostLimiter(
+                    per_host_limit,
+                    rate=rate,
+                    max_retries=max_retries,
+                    budget=retry_budget
+                )
+            return host_limiters[host]
+
+    done = [0]
+    done_lock = threading.Lock()
+
+    def scrape_one(url):
+        try:
+            return scrape_cloud_profile(url, cache=cache, parser=parser, limiter=host_limiter(url))
+        except Exception as e:
+            print(f"Unexpected error scraping {url}: {e}")
+            return None
+        finally:
+            if progress is not None:
+                with done_lock:
+                    done[0] += 1
+                    progress(done[0], len(profile_urls))
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="profile-fetch") as executor:
+        # executor.map preserves input order regardless of completion order
+        results = list(executor.map(scrape_one, profile_urls))
+
+    if retry_budget.remaining == 0:
+        print("Retry budget exhausted for this cycle")
+    return results
+
+
+def _unscored_row(profile_data):
+    """Builds a leaderboard row with badge counts only; the score columns are filled in later."""
+    badge_counts = profile_data.get("badge_counts", {})
+    return {
+        "name": profile_data.get("name", "N/A"),
+        "game_badges": badge_counts.get("game_badges", 0),
+        "special_game_badges": badge_counts.get("special_game_badges", 0),
+        "trivia_badges": badge_counts.get("trivia_badges", 0),
+        "skill_badges": badge_counts.get("skill_badges", 0),
+        "lab_badges": badge_counts.get("lab_badges", 0),
+        "arcade_points": None,
+        "milestone": None,
+        "bonus_points": None,
+        "total_points": None,
+        "profile_url": profile_data.get("profile_url", "N/A")
+    }
 
 
-def identify_badge_type(badge_name, badge_date):
+def build_profile_rows(profiles):
     """
-    Determines badge type based on name and date according to specified rules.
+    Computes the leaderboard CSV rows for many scraped profiles at once.
+
+    Scoring is vectorized over the whole batch (see scoring.score_cohort).
+
+    Args:
+        profiles (list): Profile data dicts from scrape_cloud_profile
+
+    Returns:
+        list: Rows with badge counts, points and milestone, in input order
+    """
+    return score_rows([_unscored_row(profile_data) for profile_data in profiles])
+
+
+def identify_badge_type(badge_name):
+    """
+    Determines badge type based on name according to specified rules.
+
+    The rules live in the badge rules file (see badge_classifier); results
+    are memoized per badge name.
 
     Args:
         badge_name (str): Name of the badge
-        badge_date (str): Date of the badge (if available)
 
     Returns:
-        str: Badge type ('lab_badges', 'skill_badges', 'game_badges', or 'trivia_badges')
-    """
-    # Check for trivia badges based on date pattern
-    if badge_name[-6:-2] == "Week":
-        return 'trivia_badges'
-
-    # Check for game badges
-    if badge_name.startswith('Level ') or 'Base Camp' in badge_name:
-        return 'game_badges'
-
-    # Check for special game badge
-    if badge_name == 'Arcade TechCare':
-        return 'special_game_badges'
-
-    # Check for lab badges (based on the list you provided earlier)
-    lab_free_course_names = [
-        "Digital Transformation with Google Cloud",
-        "Exploring Data Transformation with Google Cloud",
-        "Infrastructure and Application Modernization with Google Cloud",
-        "Scaling with Google Cloud Operations",
-        "Innovating with Google Cloud Artificial Intelligence",
-        "Trust and Security with Google Cloud",
-        "Google Drive",
-        "Google Docs",
-        "Google Slides",
-        "Google Meet",
-        "Google Sheets",
-        "Google Calendar",
-        "Responsible AI: Applying AI Principles with Google Cloud",
-        "Responsible AI for Digital Leaders with Google Cloud",
-        "Customer Experience with Google AI Architecture",
-        "Machine Learning Operations (MLOps) with Vertex AI: Model Evaluation",
-        "Conversational AI on Vertex AI and Dialogflow CX",
-        "Building Complex End to End Self-Service Experiences in Dialogflow CX",
-    ]
-
-    if badge_name in lab_free_course_names:
-        return 'lab_badges'
-
-    # Default to skill badge if no other category matches
-    return 'skill_badges'
+        str: Badge type ('lab_badges', 'skill_badges', 'game_badges', 'trivia_badges'
+             or 'special_game_badges')
+    """
+    return get_classifier().classify(badge_name)
 
 
 def save_to_json(data, filename="profile_data.json"):
@@ -228,15 +386,11 @@ def print_badge_details(profile_url):
     Args:
         profile_url (str): URL of the profile to analyze
     """
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-    }
-
     try:
-        response = requests.get(profile_url, headers=headers)
+        response = get_session().get(profile_url)
         response.raise_for_status()
 
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = make_soup(response.text)
 
         print("Listing badge details...")
 
@@ -279,255 +433,551 @@ def print_badge_details(profile_url):
     except Exception as e:
         print(f"Error listing badge details: {e}")
 
-def calculate_points(badge_counts):
+# Test profile with dummy data to ensure the CSV is never empty
+TEST_PROFILE = {
+    "name": "Test Profile (Ensure CSV Not Empty)",
+    "game_badges": 5,
+    "special_game_badges": 1,
+    "trivia_badges": 5,
+    "skill_badges": 15,
+    "lab_badges": 5,
+    "arcade_points": 13,  # 5 game + 5 trivia + (15//2) skill + 1 special
+    "milestone": "Milestone 1",
+    "bonus_points": 2,
+    "total_points": 15  # arcade_points + bonus
+}
+
+# Columns of the leaderboard CSV
+CSV_COLUMNS = [
+    'name', 'game_badges', 'special_game_badges', 'trivia_badges',
+    'skill_badges', 'lab_badges', 'arcade_points', 'milestone',
+    'bonus_points', 'total_points', 'profile_url'
+]
+
+# Profile cache file of older versions, imported into the cache database on first use
+LEGACY_CACHE_NAME = ".profile_cache.json"
+
+# Profile caches, stores and change feeds kept alive between in-process runs, keyed by file path
+_profile_caches = {}
+_profile_stores = {}
+_change_feeds = {}
+_profile_caches_lock = threading.Lock()
+
+
+def get_profile_cache(cache_file, legacy_file=None):
+    """
+    Returns the ProfileCache for a database, loading it only on first use so
+    repeated in-process runs keep their validators and parsed profiles warm.
+    It is reloaded when another process saved the cache in between.
+
+    Args:
+        cache_file (str): Path of the SQLite database
+        legacy_file (str): JSON cache of older versions, imported (and
+                           removed) when the cache is first loaded
+
+    Returns:
+        ProfileCache: Cache bound to cache_file
+    """
+    cache_file = os.path.abspath(cache_file)
+    with _profile_caches_lock:
+        if cache_file not in _profile_caches:
+            cache = ProfileCache(cache_file)
+            if legacy_file and os.path.exists(legacy_file):
+                cache.import_json(legacy_file)
+            _profile_caches[cache_file] = cache
+        else:
+            # An isolated scrape (another process) may have saved it since
+            _profile_caches[cache_file].reload_if_changed()
+        return _profile_caches[cache_file]
+
+
+def get_profile_store(store_file):
+    """
+    Returns the ProfileStore for a database file, opening it once per process.
+
+    Args:
+        store_file (str): Path of the SQLite database
+
+    Returns:
+        ProfileStore: Store bound to store_file
+    """
+    store_file = os.path.abspath(store_file)
+    with _profile_caches_lock:
+        if store_file not in _profile_stores:
+            _profile_stores[store_file] = ProfileStore(store_file)
+        return _profile_stores[store_file]
+
+
+def get_change_feed(feed_file):
+    """
+    Returns the ChangeFeed for a file, loading it once per process.
+
+    Args:
+        feed_file (str): Path of the change feed
+
+    Returns:
+        ChangeFeed: Feed bound to feed_file
+    """
+    feed_file = os.path.abspath(feed_file)
+    with _profile_caches_lock:
+        if feed_file not in _change_feeds:
+            _change_feeds[feed_file] = ChangeFeed(feed_file)
+        return _change_feeds[feed_file]
+
+
+def read_csv_rows(csv_file):
+    """
+    Reads a published leaderboard CSV as row dicts.
+
+    Args:
+        csv_file (str): CSV path
+
+    Returns:
+        list: Row dicts, empty if the file is missing or unreadable
+    """
+    if not os.path.exists(csv_file):
+        return []
+    try:
+        return pd.read_csv(csv_file).to_dict(orient='records')
+    except (OSError, ValueError, pd.errors.ParserError) as e:
+        print(f"Could not read previous export {csv_file}: {e}")
+        return []
+
+
+def load_roster_if_present(roster_file=None):
+    """
+    Loads the whole roster, or returns None if there is no roster file (e.g.
+    a run given its profiles on the command line).
+    """
+    try:
+        return load_roster(roster_file)
+    except OSError:
+        return None
+
+
+def scrape_rows(profile_urls, max_workers=DEFAULT_MAX_WORKERS, per_host_limit=DEFAULT_PER_HOST_LIMIT,
+                cache=None, parser=None, rate=DEFAULT_RATE, max_retries=DEFAULT_MAX_RETRIES, progress=None):
     """
-    Calculates points based on badge counts.
+    Scrapes profiles and computes their leaderboard rows.
 
     Args:
-        badge_counts (dict): Dictionary containing counts of each badge type.
+        profile_urls (list): URLs of the public profiles
+        max_workers (int): Maximum number of requests in flight
+        per_host_limit (int): Maximum number of concurrent requests per host
+        cache (ProfileCache): Optional cache of validators and previous rows
+        parser (str): Parser backend passed to scrape_cloud_profile
+        rate (float): Sustained requests per second per host
+        max_retries (int): Maximum retries per profile
+        progress (callable): Called as progress(done, total) after each profile
 
     Returns:
-        int: Total points calculated.
-    """
-    game_badges_points = badge_counts.get('game_badges', 0) * 1
-    trivia_badges_points = badge_counts.get('trivia_badges', 0) * 1
-    skill_badges_points = (badge_counts.get('skill_badges', 0) // 2) * 1
-    special_game_badges_points = badge_counts.get('special_game_badges', 0) * 2
-
-    arcade_points = (
-        game_badges_points +
-        trivia_badges_points +
-        skill_badges_points +
-        special_game_badges_points
+        list: Row dicts (see build_profile_rows) for every profile scraped
+              successfully, in roster order
+    """
+    profile_urls = list(profile_urls)
+    print(f"Will attempt to scrape {len(profile_urls)} profiles")
+
+    print("Scraping profiles...")
+    start_time = time.time()
+
+    scraped_profiles = scrape_profiles(
+        profile_urls,
+        max_workers=max_workers,
+        per_host_limit=per_host_limit,
+        cache=cache,
+        parser=parser,
+        rate=rate,
+        max_retries=max_retries,
+        progress=progress
     )
-    return arcade_points
 
+    rows = []
+    to_score = []
+    for url, profile_data in zip(profile_urls, scraped_profiles):
+        if profile_data:
+            print(f"Successfully scraped profile: {profile_data.get('name', 'Unknown')}")
+            # Unchanged profiles reuse their previous row instead of being re-scored
+            row = cache.get_row(url) if cache and profile_data.get("from_cache") else None
+            if row is None:
+                to_score.append((len(rows), url, profile_data))
+            rows.append(row)
+        else:
+            print(f"Failed to scrape profile: {url}")
+
+    # Score every new or changed profile in one vectorized batch
+    with scrape_metrics.timer('score'):
+        scored_rows = build_profile_rows([profile_data for _, _, profile_data in to_score])
+    for (position, url, _), row in zip(to_score, scored_rows):
+        rows[position] = row
+        if cache:
+            cache.set_row(url, row)
+
+    print(f"Scraping completed in {time.time() - start_time:.2f} seconds")
+
+    if cache:
+        cache.save()
 
-def calculate_milestone(badge_counts):
+    return rows
+
+
+def rows_to_dataframe(rows):
     """
-    Determines the milestone achieved and calculates points.
+    Builds the leaderboard DataFrame, sorted by total points (descending).
 
     Args:
-        badge_counts (dict): Dictionary containing counts of each badge type.
+        rows (list): Row dicts
 
     Returns:
-        dict: Milestone details including milestone name, arcade points, bonus points, and total points.
-    """
-    milestones = [
-        {
-            "name": "Milestone 1",
-            "requirements": {
-                "game_badges": 4,
-                "trivia_badges": 4,
-                "skill_badges": 10,
-                "lab_badges": 4
-            },
-            "points": {
-                "game_badges": 4,
-                "trivia_badges": 4,
-                "skill_badges": 5,
-                "bonus": 2
-            }
-        },
-        {
-            "name": "Milestone 2",
-            "requirements": {
-                "game_badges": 6,
-                "trivia_badges": 6,
-                "skill_badges": 20,
-                "lab_badges": 8
-            },
-            "points": {
-                "game_badges": 6,
-                "trivia_badges": 6,
-                "skill_badges": 10,
-                "bonus": 8
-            }
-        },
-        {
-            "name": "Milestone 3",
-            "requirements": {
-                "game_badges": 8,
-                "trivia_badges": 7,
-                "skill_badges": 30,
-                "lab_badges": 12
-            },
-            "points": {
-                "game_badges": 8,
-                "trivia_badges": 7,
-                "skill_badges": 15,
-                "bonus": 15
-            }
-        },
-        {
-            "name": "Ultimate Milestone",
-            "requirements": {
-                "game_badges": 10,
-                "trivia_badges": 8,
-                "skill_badges": 44,
-                "lab_badges": 16
-            },
-            "points": {
-                "game_badges": 10,
-                "trivia_badges": 8,
-                "skill_badges": 22,
-                "bonus": 25
-            }
-        }
-    ]
-
-    # Check for milestone completion
-    for milestone in reversed(milestones):  # Start from the highest milestone
-        req = milestone["requirements"]
-        if (badge_counts.get('game_badges', 0) >= req["game_badges"] and
-                badge_counts.get('trivia_badges', 0) >= req["trivia_badges"] and
-                badge_counts.get('skill_badges', 0) >= req["skill_badges"] and
-                badge_counts.get('lab_badges', 0) >= req["lab_badges"]):
-            # Calculate points
-            points = milestone["points"]
-            arcade_points = points["game_badges"] + points["trivia_badges"]
-            special_game_bonus = min(badge_counts.get('special_game_badges', 0), 2)  # Max 2 special games
-            arcade_points += special_game_bonus  # Add special game bonus points
-            total_points = arcade_points + points["skill_badges"] + points["bonus"]
-
-            # Add bonus points to total_points if milestone is met
-            total_points += points["bonus"]
-
-            return {
-                "milestone": milestone["name"],
-                "arcade_points": arcade_points,
-                "bonus_points": points["bonus"],
-                "total_points": total_points
-            }
-
-    # If no milestone is achieved
-    return {
-        "milestone": "No Milestone Achieved",
-        "arcade_points": 0,
-        "bonus_points": 0,
-        "total_points": 0
-    }
+        pandas.DataFrame: Leaderboard table
+    """
+    df = pd.DataFrame(rows, columns=CSV_COLUMNS)
+    # Stable sort so ties keep their incoming order and output is deterministic
+    df.sort_values(by=['total_points'], ascending=False, kind='stable', inplace=True)
+    return df
+
+
+def write_csv(df, output_file):
+    """
+    Writes the leaderboard CSV atomically.
+
+    Args:
+        df (pandas.DataFrame): Leaderboard table
+        output_file (str): Destination CSV path
+    """
+    # Create parent directory if it doesn't exist
+    os.makedirs(os.path.dirname(os.path.abspath(output_file)) or '.', exist_ok=True)
+
+    # Write to a temp file and rename so readers never see a partial CSV
+    atomic_write(output_file, lambda tmp_path: df.to_csv(tmp_path, index=False))
+    print(f"Data saved to {output_file}")
+
+
+def run_scrape(output_file, profile_urls=None, max_workers=DEFAULT_MAX_WORKERS,
+               per_host_limit=DEFAULT_PER_HOST_LIMIT, cache_file=None, use_cache=True, parser=None,
+               store_file=None, roster_file=None, shard=None, rate=DEFAULT_RATE, max_retries=DEFAULT_MAX_RETRIES,
+               progress=None):
+    """
+    Scrapes the roster into the profile store and exports the leaderboard
+    CSV, in-process.
+
+    Only rows whose values changed are written to the store, and the CSV is
+    regenerated only when the store changed since the last export. Profiles
+    that fail to scrape keep their previously stored row. The badge rules
+    file is reloaded first if it changed since the last run.
+
+    This is the entry point used by scheduler.run_scraper; the command line
+    interface below is a thin wrapper around it.
+
+    Args:
+        output_file (str): Destination CSV path
+        profile_urls (list): URLs to scrape (default: the roster). Stored
+                             profiles missing from the roster are only pruned
+                             when scraping the roster.
+        max_workers (int): Maximum number of requests in flight
+        per_host_limit (int): Maximum number of concurrent requests per host
+        cache_file (str): Profile cache database (default: the profile store)
+        use_cache (bool): Whether to use the profile cache
+        parser (str): Parser backend passed to scrape_cloud_profile
+        store_file (str): Profile store database (default: profiles.db next
+                          to the output file)
+        roster_file (str): Roster file (default: roster.DEFAULT_ROSTER_PATH)
+        shard (tuple): (index, count) roster shard to scrape; shards share the
+                       store, so their results merge into one export
+        rate (float): Sustained requests per second per host
+        max_retries (int): Maximum retries per profile
+        progress (callable): Called as progress(done, total) after each profile
+
+    Returns:
+        int: Number of stored rows that changed (including pruned ones)
+    """
+    output_dir = os.path.dirname(os.path.abspath(output_file))
+
+    # Pick up edited season rules without a restart
+    reload_rules_if_changed()
+
+    store_file = store_file or os.path.join(output_dir, "profiles.db")
+
+    cache = None
+    if use_cache:
+        cache = get_profile_cache(cache_file or store_file,
+                                  legacy_file=os.path.join(output_dir, LEGACY_CACHE_NAME))
+    store = get_profile_store(store_file)
+
+    from_roster = profile_urls is None
+    if from_roster:
+        profile_urls = load_roster(roster_file, shard=shard)
+        if shard:
+            print(f"Scraping shard {shard[0]}/{shard[1]} of the roster")
+
+    scraped_rows = scrape_rows(
+        profile_urls,
+        max_workers=max_workers,
+        per_host_limit=per_host_limit,
+        cache=cache,
+        parser=parser,
+        rate=rate,
+        max_retries=max_retries,
+        progress=progress
+    )
+
+    with scrape_metrics.timer('store'):
+        changed = store.upsert_rows(scraped_rows)
+        if from_roster:
+            # Only prune within our own shard; other shards own the rest
+            changed += store.prune(profile_urls, scope=lambda url: in_shard(url, shard))
+    print(f"Profiles collected: {len(scraped_rows)}, changed: {changed}")
+
+    roster_urls = profile_urls if from_roster and not shard else load_roster_if_present(roster_file)
+    export_store(store, output_file, roster_urls=roster_urls)
+
+    return changed
+
+
+def plan_refresh(planner, output_file, limit, store_file=None, roster_file=None):
+    """
+    Picks the roster profiles due for a refresh (see RefreshPlanner) and
+    prunes stored profiles that left the roster; the next export drops them.
+
+    Args:
+        planner (RefreshPlanner): Planner keeping the refresh attempts
+        output_file (str): Destination CSV path
+        limit (int): Maximum profiles to return
+        store_file (str): Profile store database (default: profiles.db next
+                          to the output file)
+        roster_file (str): Roster file (default: roster.DEFAULT_ROSTER_PATH)
+
+    Returns:
+        list: Profile URLs to scrape, most overdue first
+    """
+    output_dir = os.path.dirname(os.path.abspath(output_file))
+    store = get_profile_store(store_file or os.path.join(output_dir, "profiles.db"))
+    roster_urls = load_roster(roster_file)
+    pruned = store.prune(roster_urls)
+    if pruned:
+        print(f"Pruned {pruned} profiles no longer on the roster")
+    activity = store.fetch_activity()
+    planned = planner.plan(roster_urls, activity, limit)
+    tiers = ', '.join(f"{tier} {count}" for tier, count in planner.tier_counts(roster_urls, activity).items())
+    print(f"Refresh plan: {len(planned)} of {len(roster_urls)} profiles due ({tiers})")
+    return planned
+
+
+def export_store(store, output_file, roster_urls=None):
+    """
+    Exports the profile store to the leaderboard CSV if it changed since the
+    last export, together with its columnar snapshot (read by the API), and
+    records the row-level changes in the change feed published next to it.
+
+    Roster members without a stored row yet keep their row of the previous
+    export. Refresh batches fill a new or emptied store a budget's worth at
+    a time, and members must not drop off the leaderboard until their first
+    batch comes round.
+
+    Readers key their snapshot on the CSV and the feed, so the files are
+    published in order: the columnar snapshot of the new CSV first, then
+    the CSV, then the feed. A reader never pairs a new feed generation
+    with old rows, and never has to rebuild the columnar file itself.
+
+    Args:
+        store (ProfileStore): Store to export
+        output_file (str): Destination CSV path
+        roster_urls (list): Roster profile URLs (default: no carry-over)
+
+    Returns:
+        bool: True if the CSV was rewritten
+    """
+    if not store.needs_export(output_file):
+        print(f"No changes since the last export, keeping {output_file}")
+        return False
+    with scrape_metrics.timer('export'):
+        generation = store.generation()
+        previous_rows = read_csv_rows(output_file)
+        stored_rows = store.fetch_rows()
+        carried_rows = []
+        if roster_urls:
+            missing = set(roster_urls) - {row['profile_url'] for row in stored_rows}
+            carried_rows = [row for row in previous_rows if row.get('profile_url') in missing]
+            if carried_rows:
+                print(f"Keeping the previous rows of {len(carried_rows)} roster members not scraped yet")
+        # Start with the test profile to ensure a non-empty CSV
+        rows = [dict(TEST_PROFILE)] + stored_rows + carried_rows
+        df = rows_to_dataframe(rows)
+        parsed = {}
+
+        def write(tmp_path):
+            df.to_csv(tmp_path, index=False)
+            # Parse the export once, as readers do, for the snapshot and the
+            # diff. The rename keeps the file's mtime and size, so the
+            # columnar snapshot already matches the CSV it is renamed to.
+            parsed['rows'] = pd.read_csv(tmp_path)
+            write_columnar(parsed['rows'], columnar_path_for(output_file), source=csv_source_key(tmp_path))
+
+        os.makedirs(os.path.dirname(os.path.abspath(output_file)) or '.', exist_ok=True)
+        atomic_write(output_file, write)
+        print(f"Data saved to {output_file}")
+        store.mark_exported(generation)
+
+        # Diff what readers parsed before and after, so the feed matches the
+        # CSV exactly; like the API, the feed leaves out the test profile
+        upserts, removals = diff_rows(
+            [row for row in previous_rows if is_member_row(row)],
+            [row for row in parsed['rows'].to_dict(orient='records') if is_member_row(row)]
+        )
+        feed_generation = get_change_feed(changes_path_for(output_file)).record(upserts, removals)
+        print(f"Published generation {feed_generation}: {len(upserts)} rows changed, {len(removals)} removed")
+    return True
+
+
+def rescore_store(output_file, store_file=None, roster_file=None):
+    """
+    Recomputes points and milestones of every stored profile from its badge
+    counts, without scraping, and exports the CSV if any row changed.
+
+    Used after a scoring rules change; the whole cohort is scored in one
+    vectorized batch.
+
+    Args:
+        output_file (str): Destination CSV path
+        store_file (str): Profile store database (default: profiles.db next
+                          to the output file)
+        roster_file (str): Roster file (default: roster.DEFAULT_ROSTER_PATH)
+
+    Returns:
+        int: Number of stored rows that changed
+    """
+    output_dir = os.path.dirname(os.path.abspath(output_file))
+    store = get_profile_store(store_file or os.path.join(output_dir, "profiles.db"))
+
+    start_time = time.time()
+    stored_rows = store.fetch_rows()
+    rescored_rows = score_rows(stored_rows)
+    print(f"Rescored {len(rescored_rows)} profiles in {time.time() - start_time:.3f} seconds")
+
+    # Keep last_scraped untouched; only the score columns are recomputed
+    changed = store.upsert_rows(
+        [row for row, stored in zip(rescored_rows, stored_rows) if row != stored],
+        touch=False
+    )
+    print(f"Profiles changed by rescoring: {changed}")
+    export_store(store, output_file, roster_urls=load_roster_if_present(roster_file))
+    return changed
+
+
+def merge_csv_files(input_files, output_file):
+    """
+    Merges leaderboard CSVs written by separate shard runs.
+
+    Rows are de-duplicated by profile URL (the test profile by name) and
+    sorted by total points, then name, so the result does not depend on the
+    order shards finished in.
+
+    Args:
+        input_files (list): Shard CSV paths
+        output_file (str): Destination CSV path
+
+    Returns:
+        int: Number of rows written
+    """
+    frames = [pd.read_csv(path) for path in input_files if os.path.exists(path)]
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=CSV_COLUMNS)
+    df = df.reindex(columns=CSV_COLUMNS)
+    df['_key'] = df['profile_url'].fillna(df['name'])
+    df = df.drop_duplicates(subset='_key', keep='last').drop(columns='_key')
+    df = df.sort_values(by=['name'], kind='stable')
+    write_csv(rows_to_dataframe(df.to_dict(orient='records')), output_file)
+    return len(df)
+
 
 if __name__ == "__main__":
     # Parse command line arguments
     parser = argparse.ArgumentParser(description="Scrape Google Cloud Skills Boost profiles")
     parser.add_argument("--output", dest="output_file", default="profiles_data.csv",
                       help="Output CSV file path (default: profiles_data.csv)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS,
+                      help=f"Maximum number of profiles fetched concurrently (default: {DEFAULT_MAX_WORKERS})")
+    parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST_LIMIT,
+                      help=f"Maximum concurrent requests per host (default: {DEFAULT_PER_HOST_LIMIT})")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE,
+                      help=f"Sustained requests per second per host (default: {DEFAULT_RATE:g})")
+    parser.add_argument("--max-retries", type=int, default=DEFAULT_MAX_RETRIES,
+                      help=f"Retries per profile on 429/5xx and connection errors (default: {DEFAULT_MAX_RETRIES})")
+    parser.add_argument("--pool-size", type=int, default=POOL_MAXSIZE,
+                      help=f"Maximum pooled keep-alive connections per host (default: {POOL_MAXSIZE})")
+    parser.add_argument("--cache", dest="cache_file", default=None,
+                      help="Profile cache database (default: the profile store database)")
+    parser.add_argument("--parser", dest="parser_backend", choices=PARSER_BACKENDS, default=DEFAULT_PARSER,
+                      help=f"HTML parser backend (default: {DEFAULT_PARSER})")
+    parser.add_argument("--store", dest="store_file", default=None,
+                      help="Profile store database (default: profiles.db next to the output file)")
+    parser.add_argument("--roster", dest="roster_file", default=None,
+                      help=f"Roster file of profile URLs, .csv/.jsonl/.txt (default: {DEFAULT_ROSTER_PATH})")
+    parser.add_argument("--profiles", dest="profiles_file", default=None,
+                      help="Only scrape the profile URLs listed in this file (any roster format); "
+                           "nothing is pruned")
+    parser.add_argument("--shard", default=None,
+                      help="Only scrape shard i of N of the roster, as 'i/N' (0 <= i < N)")
+    parser.add_argument("--merge", nargs="+", metavar="CSV", default=None,
+                      help="Merge shard output CSVs into --output instead of scraping")
+    parser.add_argument("--rescore", action="store_true",
+                      help="Recompute points and milestones of stored profiles instead of scraping")
+    parser.add_argument("--no-cache", action="store_true",
+                      help="Always download and parse every profile")
+    parser.add_argument("--metrics-file", default=None,
+                      help="Also save the scrape cycle's metrics to this JSON file")
     args = parser.parse_args()
+
+    # Size the connection pool so every in-flight request can reuse a connection
+    configure_session(pool_maxsize=max(args.pool_size, args.per_host))
     
     # Print the output file path for debugging
     print(f"Output file will be saved to: {os.path.abspath(args.output_file)}")
     
-    try:
-        # List of profile URLs - validate these URLs and make sure they are accessible
-        profile_urls = [
-            "https://www.cloudskillsboost.google/public_profiles/ddfc7723-216a-444c-ab34-cba5d7807296",
-            "https://www.cloudskillsboost.google/public_profiles/104ba705-a4ed-422e-9599-e8cbcdfb0be6",
-            # Add more URLs as needed - make sure these are valid profile URLs
-        ]
-
-        print(f"Will attempt to scrape {len(profile_urls)} profiles")
-        
-        # Add a test profile with dummy data to ensure the CSV is never empty
-        test_profile = {
-            "name": "Test Profile (Ensure CSV Not Empty)",
-            "game_badges": 5,
-            "special_game_badges": 1,
-            "trivia_badges": 5,
-            "skill_badges": 15,
-            "lab_badges": 5,
-            "arcade_points": 13,  # 5 game + 5 trivia + (15//2) skill + 1 special
-            "milestone": "Milestone 1",
-            "bonus_points": 2,
-            "total_points": 15  # arcade_points + bonus
-        }
-
-        # List to store profile data, start with test profile to ensure non-empty CSV
-        profiles_data = [test_profile]
-
-        print("Scraping profiles...")
-        start_time = time.time()
-
-        for url in profile_urls:
-            print(f"Scraping profile: {url}")
-            profile_data = scrape_cloud_profile(url)
-
-            if profile_data:
-                print(f"Successfully scraped profile: {profile_data.get('name', 'Unknown')}")
-                # Calculate point values
-                arcade_points = calculate_points(profile_data.get("badge_counts", {}))
-                milestone_result = calculate_milestone(profile_data.get("badge_counts", {}))
-                milestone_name = milestone_result.get("milestone", "No Milestone")
-                bonus_points = milestone_result.get("bonus_points", 0)
-                total_points = arcade_points + bonus_points
-                
-                # Add the profile data to the list
-                profiles_data.append({
-                    "name": profile_data.get("name", "N/A"),
-                    "game_badges": profile_data.get("badge_counts", {}).get("game_badges", 0),
-                    "special_game_badges": profile_data.get("badge_counts", {}).get("special_game_badges", 0),
-                    "trivia_badges": profile_data.get("badge_counts", {}).get("trivia_badges", 0),
-                    "skill_badges": profile_data.get("badge_counts", {}).get("skill_badges", 0),
-                    "lab_badges": profile_data.get("badge_counts", {}).get("lab_badges", 0),
-                    "arcade_points": arcade_points,
-                    "milestone": milestone_name,
-                    "bonus_points": bonus_points,
-                    "total_points": total_points,
-                    "profile_url": profile_data.get("profile_url", "N/A")
-                })
-            else:
-                print(f"Failed to scrape profile: {url}")
+    if args.merge:
+        merged = merge_csv_files(args.merge, args.output_file)
+        print(f"Merged {len(args.merge)} files into {args.output_file} ({merged} rows)")
+        raise SystemExit(0)
 
-        print(f"Scraping completed in {time.time() - start_time:.2f} seconds")
-        print(f"Total profiles collected: {len(profiles_data)}")
+    if args.rescore:
+        rescore_store(args.output_file, store_file=args.store_file, roster_file=args.roster_file)
+        raise SystemExit(0)
 
-        # Create a DataFrame with the required columns
-        columns = [
-            'name', 'game_badges', 'special_game_badges', 'trivia_badges',
-            'skill_badges', 'lab_badges', 'arcade_points', 'milestone',
-            'bonus_points', 'total_points', 'profile_url'
-        ]
+    try:
+        # Stages only record samples inside a metrics cycle
+        with scrape_metrics.cycle():
+            run_scrape(
+                args.output_file,
+                profile_urls=load_roster(args.profiles_file) if args.profiles_file else None,
+                max_workers=args.workers,
+                per_host_limit=args.per_host,
+                cache_file=args.cache_file,
+                use_cache=not args.no_cache,
+                parser=args.parser_backend,
+                store_file=args.store_file,
+                roster_file=args.roster_file,
+                shard=parse_shard(args.shard) if args.shard else None,
+                rate=args.rate,
+                max_retries=args.max_retries
+            )
+        scrape_metrics.log_summary()
 
-        # Convert the list of profiles to a DataFrame
-        df = pd.DataFrame(profiles_data)
-        
-        # Sort by total points (descending)
-        df.sort_values(by=['total_points'], ascending=False, inplace=True)
-        
-        # Save the DataFrame to a CSV file
-        output_file = args.output_file
-        
-        # Create parent directory if it doesn't exist
-        os.makedirs(os.path.dirname(os.path.abspath(output_file)) or '.', exist_ok=True)
-        
-        df.to_csv(output_file, index=False)
-        print(f"Data saved to {output_file}")
-        
         # Print the first few rows of data for verification
         print("\nSaved data preview:")
-        print(df.head().to_string())
+        print(pd.read_csv(args.output_file).head().to_string())
         
         # Verify file was created with content
-        if os.path.exists(output_file):
-            file_size = os.path.getsize(output_file)
+        if os.path.exists(args.output_file):
+            file_size = os.path.getsize(args.output_file)
             print(f"Output file exists with size: {file_size} bytes")
         else:
-            print(f"Warning: Output file {output_file} was not created!")
+            print(f"Warning: Output file {args.output_file} was not created!")
     except Exception as e:
         print(f"An error occurred: {e}")
         import traceback
         traceback.print_exc()
         
-        # Create an empty DataFrame with the required columns as a fallback
-        columns = [
-            'name', 'game_badges', 'special_game_badges', 'trivia_badges',
-            'skill_badges', 'lab_badges', 'arcade_points', 'milestone',
-            'bonus_points', 'total_points', 'profile_url'
-        ]
-        df = pd.DataFrame(columns=columns)
-        
-        # Save the empty DataFrame
-        output_file = args.output_file
-        os.makedirs(os.path.dirname(os.path.abspath(output_file)) or '.', exist_ok=True)
-        df.to_csv(output_file, index=False)
-        print(f"Created empty data file at {output_file} due to no profiles being found")
+        # Save an empty DataFrame with the required columns as a fallback
+        write_csv(pd.DataFrame(columns=CSV_COLUMNS), args.output_file)
+        print(f"Created empty data file at {args.output_file} due to no profiles being found")
+
+    if args.metrics_file:
+        scrape_metrics.save_last_cycle(args.metrics_file)
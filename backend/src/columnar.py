@@ -0,0 +1,196 @@
+import io
+import json
+import math
+import mmap
+import os
+import struct
+
+import numpy as np
+import pandas as pd
+
+from publisher import atomic_write_bytes
+
+# File layout (all sections 8-byte aligned, numbers little-endian):
+#   magic (8 bytes) | header length (uint64) | JSON header | column data
+# The header lists the row count, the CSV the file was built from and, per
+# column, its kind and the offsets of its sections:
+#   int / float  one int64 / float64 array
+#   str          int64 end offsets into a UTF-8 blob, the blob, and a
+#                uint8 array flagging missing values
+MAGIC = b'GCAFCOL1'
+_LENGTH = struct.Struct('<Q')
+_ALIGN = 8
+
+
+def columnar_path_for(csv_path):
+    """Returns the columnar snapshot published alongside a leaderboard CSV."""
+    return os.path.splitext(csv_path)[0] + '.cols'
+
+
+def csv_source_key(csv_path):
+    """Identifies a CSV version by its modification time and size."""
+    stat = os.stat(csv_path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _pad(buffer):
+    buffer.write(b'\0' * (-buffer.tell() % _ALIGN))
+
+
+def _column_kind(series):
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_integer_dtype(series):
+        return 'int'
+    if pd.api.types.is_float_dtype(series):
+        return 'float'
+    return 'str'
+
+
+def encode_columnar(df, source=None):
+    """
+    Serializes a DataFrame in the columnar snapshot format.
+
+    Args:
+        df (pandas.DataFrame): Table as readers parse the CSV
+        source (list): csv_source_key() of the CSV it was built from
+
+    Returns:
+        bytes: Snapshot file contents
+    """
+    data = io.BytesIO()
+    columns = []
+    for name in df.columns:
+        series = df[name]
+        kind = _column_kind(series)
+        column = {'name': str(name), 'kind': kind}
+        if kind == 'str':
+            missing = series.isna().to_numpy()
+            encoded = [b'' if is_missing else str(value).encode('utf-8')
+                       for value, is_missing in zip(series.tolist(), missing)]
+            ends = np.cumsum([len(value) for value in encoded], dtype='<i8')
+            column['ends'] = data.tell()
+            data.write(ends.tobytes())
+            column['blob'] = data.tell()
+            column['blob_length'] = int(ends[-1]) if len(ends) else 0
+            data.write(b''.join(encoded))
+            _pad(data)
+            column['missing'] = data.tell()
+            data.write(missing.astype('u1').tobytes())
+        else:
+            column['values'] = data.tell()
+            data.write(series.to_numpy(dtype='<i8' if kind == 'int' else '<f8').tobytes())
+        _pad(data)
+        columns.append(column)
+
+    header = json.dumps({'rows': len(df), 'source': source, 'columns': columns}).encode('utf-8')
+    header += b' ' * (-(len(MAGIC) + _LENGTH.size + len(header)) % _ALIGN)
+    return MAGIC + _LENGTH.pack(len(header)) + header + data.getvalue()
+
+
+def write_columnar(df, path, source=None):
+    """
+    Writes a columnar snapshot atomically.
+
+    Args:
+        df (pandas.DataFrame): Table as readers parse the CSV
+        path (str): Destination file
+        source (list): csv_source_key() of the CSV it was built from
+    """
+    atomic_write_bytes(path, encode_columnar(df, source))
+
+
+class ColumnarTable:
+    """
+    Read-only, memory-mapped view of a columnar snapshot.
+
+    Numeric columns are numpy arrays over the mapping itself, so every
+    process reading the same file shares one copy in the page cache.
+    Replacing the file (atomic rename) does not disturb open tables; they
+    keep the old inode until they are garbage collected.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a columnar snapshot")
+        (header_length,) = _LENGTH.unpack_from(self._map, len(MAGIC))
+        start = len(MAGIC) + _LENGTH.size
+        header = json.loads(self._map[start:start + header_length])
+        self._data_offset = start + header_length
+        self.rows = header['rows']
+        self.source = header.get('source')
+        self._columns = {column['name']: column for column in header['columns']}
+        self.columns = [column['name'] for column in header['columns']]
+
+    def _array(self, dtype, offset, count):
+        return np.frombuffer(self._map, dtype=dtype, count=count, offset=self._data_offset + offset)
+
+    def array(self, name):
+        """
+        Returns a numeric column as a read-only numpy array over the mapping.
+
+        Raises:
+            KeyError: If the column is unknown
+            TypeError: If the column holds strings
+        """
+        column = self._columns[name]
+        if column['kind'] == 'str':
+            raise TypeError(f"Column {name} holds strings")
+        return self._array('<i8' if column['kind'] == 'int' else '<f8', column['values'], self.rows)
+
+    def values(self, name):
+        """
+        Returns a column as a list of Python values, with NaN for missing
+        values as pandas.read_csv reports them.
+        """
+        column = self._columns[name]
+        if column['kind'] != 'str':
+            return self.array(name).tolist()
+        ends = self._array('<i8', column['ends'], self.rows).tolist()
+        missing = self._array('u1', column['missing'], self.rows).tolist()
+        blob_start = self._data_offset + column['blob']
+        text = self._map[blob_start:blob_start + column['blob_length']].decode('utf-8')
+        if len(text) == column['blob_length']:
+            # ASCII-only blob: byte offsets are character offsets
+            pieces = [text[start:end] for start, end in zip([0] + ends[:-1], ends)]
+        else:
+            blob = self._map[blob_start:blob_start + column['blob_length']]
+            pieces = [blob[start:end].decode('utf-8') for start, end in zip([0] + ends[:-1], ends)]
+        return [math.nan if is_missing else piece for piece, is_missing in zip(pieces, missing)]
+
+    def records(self):
+        """Returns the rows as dicts, like DataFrame.to_dict(orient='records')."""
+        columns = [self.values(name) for name in self.columns]
+        return [dict(zip(self.columns, row)) for row in zip(*columns)]
+
+    def to_csv_bytes(self):
+        """Renders the table as CSV, formatted like the published export."""
+        df = pd.DataFrame({name: self.values(name) for name in self.columns}, columns=self.columns)
+        return df.to_csv(index=False).encode('utf-8')
+
+
+def load_columnar(csv_path, path=None):
+    """
+    Opens the columnar snapshot of a CSV, rebuilding it first when it is
+    missing or was built from a different version of the CSV (for example
+    after the CSV was replaced by hand or by an older scraper).
+
+    Args:
+        csv_path (str): Canonical leaderboard CSV
+        path (str): Snapshot file (default: columnar_path_for(csv_path))
+
+    Returns:
+        ColumnarTable: Memory-mapped table
+    """
+    path = path or columnar_path_for(csv_path)
+    source = csv_source_key(csv_path)
+    if os.path.exists(path):
+        try:
+            table = ColumnarTable(path)
+            if table.source == source:
+                return table
+        except (OSError, ValueError) as e:
+            print(f"Rebuilding unreadable columnar snapshot {path}: {e}")
+    write_columnar(pd.read_csv(csv_path), path, source=source)
+    return ColumnarTable(path)
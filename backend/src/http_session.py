@@ -0,0 +1,119 @@
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Pool and timeout settings, overridable from the environment
+POOL_CONNECTIONS = int(os.environ.get('SCRAPER_POOL_CONNECTIONS', 4))
+POOL_MAXSIZE = int(os.environ.get('SCRAPER_POOL_MAXSIZE', 32))
+CONNECT_TIMEOUT = float(os.environ.get('SCRAPER_CONNECT_TIMEOUT', 5))
+READ_TIMEOUT = float(os.environ.get('SCRAPER_READ_TIMEOUT', 20))
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+
+def _accept_encoding():
+    """
+    Builds the Accept-Encoding header value.
+
+    Brotli is only advertised when a decoder is installed, otherwise requests
+    would hand back undecoded bytes.
+
+    Returns:
+        str: Comma separated list of accepted content encodings
+    """
+    encodings = ['gzip', 'deflate']
+    try:
+        import brotli  # noqa: F401
+        encodings.append('br')
+    except ImportError:
+        try:
+            import brotlicffi  # noqa: F401
+            encodings.append('br')
+        except ImportError:
+            pass
+    return ', '.join(encodings)
+
+
+class TimeoutSession(requests.Session):
+    """requests.Session that applies a default timeout to every request."""
+
+    def __init__(self, timeout=None):
+        super().__init__()
+        self.timeout = timeout or (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+def create_session(pool_connections=None, pool_maxsize=None, timeout=None):
+    """
+    Creates a keep-alive session with a connection pool.
+
+    Args:
+        pool_connections (int): Number of per-host pools to keep
+        pool_maxsize (int): Maximum pooled connections per host
+        timeout (tuple): (connect, read) timeout in seconds
+
+    Returns:
+        TimeoutSession: Configured session
+    """
+    session = TimeoutSession(timeout=timeout)
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections or POOL_CONNECTIONS,
+        pool_maxsize=pool_maxsize or POOL_MAXSIZE,
+        pool_block=False
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({
+        'User-Agent': USER_AGENT,
+        'Accept-Encoding': _accept_encoding(),
+        'Connection': 'keep-alive',
+    })
+    return session
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Returns the process-wide shared session, creating it on first use.
+
+    The underlying urllib3 pools are thread-safe, so the same session is
+    shared by the scraper's worker threads and the keep-alive pinger.
+
+    Returns:
+        TimeoutSession: Shared session
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+
+def configure_session(pool_connections=None, pool_maxsize=None, timeout=None):
+    """
+    Replaces the shared session with one using the given settings.
+
+    Args:
+        pool_connections (int): Number of per-host pools to keep
+        pool_maxsize (int): Maximum pooled connections per host
+        timeout (tuple): (connect, read) timeout in seconds
+
+    Returns:
+        TimeoutSession: The new shared session
+    """
+    global _session
+    with _session_lock:
+        old_session = _session
+        _session = create_session(pool_connections, pool_maxsize, timeout)
+    if old_session is not None:
+        old_session.close()
+    return _session
@@ -0,0 +1,333 @@
+import glob
+import json
+import os
+import re
+import threading
+import time
+import uuid
+
+from publisher import atomic_write_bytes
+
+# Finished jobs kept (in memory and on disk) for status queries
+JOB_HISTORY = int(os.environ.get('JOB_HISTORY', 50))
+# Minimum seconds between progress writes of a running job
+PROGRESS_WRITE_INTERVAL = 1.0
+# Seconds between the leader's checks for requests forwarded by other workers
+FORWARD_POLL_SECONDS = float(os.environ.get('JOB_FORWARD_POLL_SECONDS', 1))
+
+JOB_ID_PATTERN = re.compile(r'^[0-9a-f]{12}$')
+FINISHED_STATUSES = ('succeeded', 'failed', 'skipped')
+
+
+class Job:
+    """
+    One requested scrape: the whole roster (profile_urls is None) or a
+    subset of profiles.
+
+    Status moves from 'queued' to 'running' to 'succeeded', 'failed' or
+    'skipped' (another process was already scraping). ``rate`` caps the
+    job's requests per second (None: the scraper's default).
+    ``request_ids`` lists forwarded requests that were merged into this
+    job; their status files mirror the job's.
+    """
+
+    def __init__(self, profile_urls=None, trigger='api', rate=None, job_id=None):
+        self.id = job_id or uuid.uuid4().hex[:12]
+        self.request_ids = []
+        self.profile_urls = None if profile_urls is None else list(dict.fromkeys(profile_urls))
+        self.trigger = trigger
+        self.rate = rate
+        self.triggers = 1
+        self.status = 'queued'
+        self.message = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.done = 0
+        self.total = None if profile_urls is None else len(self.profile_urls)
+
+    @property
+    def finished(self):
+        return self.status in FINISHED_STATUSES
+
+    def covers(self, profile_urls):
+        """Whether this job scrapes every profile of a request (None: the roster)."""
+        if self.profile_urls is None:
+            return True
+        return profile_urls is not None and set(profile_urls) <= set(self.profile_urls)
+
+    def merge(self, profile_urls, rate=None):
+        """
+        Widens a queued job to also scrape a request's profiles.
+
+        Rates are caps, so the lower of both is kept; a request without a
+        rate keeps the job's, so a manual trigger merged into a budgeted
+        refresh batch does not lift the budget.
+        """
+        self.triggers += 1
+        rates = [value for value in (self.rate, rate) if value is not None]
+        self.rate = min(rates) if rates else None
+        if profile_urls is None:
+            self.profile_urls = None
+            self.total = None
+        elif self.profile_urls is not None:
+            self.profile_urls = list(dict.fromkeys(self.profile_urls + list(profile_urls)))
+            self.total = len(self.profile_urls)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'status': self.status,
+            'message': self.message,
+            'trigger': self.trigger,
+            'rate': self.rate,
+            'triggers': self.triggers,
+            'request_ids': self.request_ids,
+            'scope': 'roster' if self.profile_urls is None else 'profiles',
+            'profile_urls': self.profile_urls,
+            'progress': {'done': self.done, 'total': self.total},
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+
+
+class JobManager:
+    """
+    Single-flight runner for scrape jobs.
+
+    At most one job runs at a time, on a background thread. A request that
+    the running job already covers joins it; any other request is merged
+    into the one queued job (a roster scrape absorbs profile subsets), so a
+    burst of triggers costs at most one extra scrape.
+
+    Job states are also written to ``jobs_dir`` (one JSON file per job), so
+    a status query answered by another worker process still finds the job.
+    Only the scrape leader runs jobs; other workers forward their requests
+    to it through ``jobs_dir/requests`` (see forward and claim_forwarded),
+    so triggers from every worker coalesce into the leader's queue.
+    """
+
+    def __init__(self, run_job, jobs_dir=None, history=JOB_HISTORY):
+        """
+        Args:
+            run_job (callable): Called with the Job to run; returns True on
+                                success, False on failure and None if the
+                                scrape was skipped
+            jobs_dir (str): Directory for job state files (optional)
+            history (int): Finished jobs to keep
+        """
+        self.run_job = run_job
+        self.jobs_dir = jobs_dir
+        self.history = history
+        self.jobs = {}
+        self.running = None
+        self.queued = None
+        self._worker = None
+        self._lock = threading.Lock()
+        # Serializes state writes, so an older state never replaces a newer one
+        self._write_lock = threading.Lock()
+        self._last_write = 0.0
+
+    @property
+    def requests_dir(self):
+        return os.path.join(self.jobs_dir, 'requests') if self.jobs_dir else None
+
+    def submit(self, profile_urls=None, trigger='api', rate=None, request_id=None):
+        """
+        Requests a scrape.
+
+        Args:
+            profile_urls (list): Profiles to scrape (default: the roster)
+            trigger (str): What requested it, reported with the job
+            rate (float): Requests per second (default: the scraper's default)
+            request_id (str): Id already handed out for a forwarded request
+
+        Returns:
+            tuple: (Job, bool) - the job that will serve the request and
+                   whether it was newly created
+        """
+        with self._lock:
+            if self.running is not None and self.running.covers(profile_urls):
+                self.running.triggers += 1
+                job, created = self.running, False
+            elif self.queued is not None:
+                self.queued.merge(profile_urls, rate)
+                job, created = self.queued, False
+            else:
+                job, created = Job(profile_urls, trigger, rate, job_id=request_id), True
+                self.queued = job
+                self.jobs[job.id] = job
+            if request_id is not None and request_id != job.id:
+                job.request_ids.append(request_id)
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="scrape-jobs", daemon=True)
+                self._worker.start()
+        self._write(job)
+        return job, created
+
+    def forward(self, profile_urls=None, trigger='api', rate=None):
+        """
+        Hands a request to the scrape leader, which submits it on its next
+        claim_forwarded(). The request is reported as queued until then.
+
+        Args:
+            profile_urls (list): Profiles to scrape (default: the roster)
+            trigger (str): What requested it, reported with the job
+            rate (float): Requests per second (default: the scraper's default)
+
+        Returns:
+            Job: Placeholder job; its id is also the id of the job status
+                 the leader publishes for the request
+        """
+        if not self.requests_dir:
+            raise RuntimeError("Forwarding requests needs a jobs directory")
+        job = Job(profile_urls, trigger, rate)
+        self._write(job)
+        request = {'id': job.id, 'profile_urls': job.profile_urls, 'trigger': trigger, 'rate': rate}
+        atomic_write_bytes(os.path.join(self.requests_dir, f"{job.id}.json"),
+                           json.dumps(request).encode('utf-8'))
+        return job
+
+    def claim_forwarded(self):
+        """
+        Submits the requests other workers forwarded, oldest first.
+
+        Returns:
+            int: Number of requests submitted
+        """
+        if not self.requests_dir or not os.path.isdir(self.requests_dir):
+            return 0
+        requests = []
+        for name in os.listdir(self.requests_dir):
+            path = os.path.join(self.requests_dir, name)
+            if not name.endswith('.json') or not JOB_ID_PATTERN.match(name[:-len('.json')]):
+                continue
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    request = json.load(f)
+                mtime = os.path.getmtime(path)
+                os.remove(path)
+            except (OSError, ValueError):
+                # Still being written, or claimed by another process
+                continue
+            requests.append((mtime, request))
+        requests.sort(key=lambda item: item[0])
+        for _, request in requests:
+            job, created = self.submit(request.get('profile_urls'), trigger=request.get('trigger', 'api'),
+                                       rate=request.get('rate'), request_id=request['id'])
+            print(f"Forwarded request {request['id']} {'queued as' if created else 'joined'} job {job.id}")
+        return len(requests)
+
+    def get(self, job_id):
+        """
+        Returns a job's state as a dict, or None if it is unknown.
+
+        Jobs of other processes are read from their state files.
+        """
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is not None:
+                return job.to_dict()
+        if not self.jobs_dir or not JOB_ID_PATTERN.match(job_id):
+            return None
+        try:
+            with open(os.path.join(self.jobs_dir, f"{job_id}.json"), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def progress(self, job, done, total):
+        """Records a running job's progress (throttled on disk)."""
+        now = time.monotonic()
+        with self._lock:
+            job.done, job.total = done, total
+            write = now - self._last_write >= PROGRESS_WRITE_INTERVAL or done == total
+            if write:
+                self._last_write = now
+        if write:
+            self._write(job)
+
+    def _run(self):
+        try:
+            while self._run_next():
+                pass
+        finally:
+            # Also on an unexpected error, so later submits start a new worker
+            with self._lock:
+                job = self.running
+                if job is not None and not job.finished:
+                    job.status = 'failed'
+                    job.message = 'Job runner crashed'
+                    job.finished_at = time.time()
+                self._worker = None
+                self.running = None
+
+    def _run_next(self):
+        """Runs the queued job, if any. Returns False when the queue is empty."""
+        with self._lock:
+            job = self.queued
+            if job is None:
+                return False
+            self.queued = None
+            self.running = job
+            job.status = 'running'
+            job.started_at = time.time()
+        self._write(job)
+
+        try:
+            result = self.run_job(job)
+            status = {True: 'succeeded', False: 'failed', None: 'skipped'}[result]
+            message = 'Another scrape was already running' if result is None else None
+        except Exception as e:
+            status, message = 'failed', str(e)
+
+        with self._lock:
+            job.status = status
+            job.message = message
+            job.finished_at = time.time()
+            self.running = None
+        # Written before trimming, so the trim sees this job as finished
+        self._write(job)
+        with self._lock:
+            self._trim()
+        return True
+
+    def _trim(self):
+        finished = sorted((job for job in self.jobs.values() if job.finished), key=lambda job: job.created_at)
+        for job in finished[:max(0, len(finished) - self.history)]:
+            del self.jobs[job.id]
+        if self.jobs_dir:
+            # Only finished jobs are trimmed: queued and running jobs (also
+            # those of forwarded requests) must stay visible. Other workers
+            # trim the same directory, so files may vanish between listing
+            # and reading/removing them.
+            paths = []
+            for path in glob.glob(os.path.join(self.jobs_dir, '*.json')):
+                try:
+                    mtime = os.path.getmtime(path)
+                    with open(path, 'r', encoding='utf-8') as f:
+                        status = json.load(f).get('status')
+                except (OSError, ValueError, AttributeError):
+                    continue
+                if status in FINISHED_STATUSES:
+                    paths.append((mtime, path))
+            paths.sort()
+            for _, path in paths[:max(0, len(paths) - self.history)]:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def _write(self, job):
+        if not self.jobs_dir:
+            return
+        try:
+            with self._write_lock:
+                with self._lock:
+                    body = json.dumps(job.to_dict()).encode('utf-8')
+                    job_ids = [job.id] + job.request_ids
+                for job_id in job_ids:
+                    atomic_write_bytes(os.path.join(self.jobs_dir, f"{job_id}.json"), body)
+        except OSError as e:
+            print(f"Could not write job state {job.id}: {e}")
@@ -0,0 +1,79 @@
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    # No advisory locks (Windows); every process acts as the only one
+    fcntl = None
+
+# Lock files in the data directory
+LEADER_LOCK_NAME = '.scheduler.lock'
+SCRAPE_LOCK_NAME = '.scrape.lock'
+# Seconds between a follower's checks for new snapshots and a free leader lock
+FOLLOW_INTERVAL_SECONDS = float(os.environ.get('SCHEDULER_FOLLOW_SECONDS', 5))
+
+
+class FileLease:
+    """
+    Exclusive lease on a lock file, shared by every process on the host.
+
+    Backed by flock(), so the kernel releases the lease when its holder
+    exits or crashes; there is no stale lock to clean up. The holder's pid
+    is written to the file for diagnostics.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+        self._lock = threading.Lock()
+
+    @property
+    def held(self):
+        """Whether this process holds the lease through this object."""
+        return self._fd is not None
+
+    def acquire(self):
+        """
+        Tries to take the lease without blocking.
+
+        Returns:
+            bool: True if the lease was taken, False if another process (or
+                  another thread using this object) holds it
+        """
+        with self._lock:
+            if self._fd is not None:
+                return False
+            if fcntl is None:
+                self._fd = -1
+                return True
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(fd)
+                return False
+            os.ftruncate(fd, 0)
+            os.write(fd, f"{os.getpid()} {time.time():.0f}\n".encode('utf-8'))
+            self._fd = fd
+            return True
+
+    def release(self):
+        """Gives the lease up if this object holds it."""
+        with self._lock:
+            if self._fd is None:
+                return
+            if self._fd >= 0:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+                os.close(self._fd)
+            self._fd = None
+
+    def owner(self):
+        """Returns the pid recorded by the last holder, or None."""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return int(f.read().split()[0])
+        except (OSError, ValueError, IndexError):
+            return None
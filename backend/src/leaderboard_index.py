@@ -0,0 +1,337 @@
+import bisect
+import math
+import threading
+from urllib.parse import urlparse
+
+# Columns the leaderboard can be sorted by; everything else is display only
+SORT_KEYS = (
+    'total_points', 'arcade_points', 'bonus_points', 'name', 'game_badges',
+    'special_game_badges', 'trivia_badges', 'skill_badges', 'lab_badges'
+)
+DEFAULT_SORT = 'total_points'
+MAX_PAGE_SIZE = 1000
+
+# Member lookup and name search limits
+MAX_NEIGHBORS = 10
+MAX_SEARCH_RESULTS = 50
+# Badge count columns reported in a member's breakdown
+BREAKDOWN_COLUMNS = (
+    'game_badges', 'special_game_badges', 'trivia_badges', 'skill_badges', 'lab_badges',
+    'arcade_points', 'bonus_points', 'total_points', 'milestone'
+)
+
+
+class QueryError(ValueError):
+    """Raised for invalid leaderboard query parameters."""
+
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def is_member_row(record):
+    """
+    Whether a published row is a real member. The scraper also publishes a
+    test profile to keep the CSV non-empty; it is the only row without a
+    profile URL.
+    """
+    url = record.get('profile_url')
+    return isinstance(url, str) and bool(url.strip())
+
+
+def member_id_from_url(profile_url):
+    """
+    Returns the member id of a public profile URL, its last path segment.
+
+    Args:
+        profile_url (str): e.g. https://www.cloudskillsboost.google/public_profiles/<id>
+
+    Returns:
+        str: Member id, or None for a missing URL
+    """
+    if not isinstance(profile_url, str) or not profile_url:
+        return None
+    path = urlparse(profile_url).path.rstrip('/')
+    return path.rsplit('/', 1)[-1] or None
+
+
+def normalize_name(name):
+    """Case- and whitespace-insensitive form of a name used by the search index."""
+    return ' '.join(str(name).casefold().split())
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class NameIndex:
+    """
+    Search index over member names.
+
+    A sorted list of (word, position) pairs answers prefix queries with a
+    binary search; a trigram index narrows substring queries of three or
+    more characters down to a few candidates before they are verified.
+    """
+
+    def __init__(self, names):
+        self.names = [normalize_name(name) if isinstance(name, str) else '' for name in names]
+        self.words = sorted(
+            (word, position)
+            for position, name in enumerate(self.names)
+            for word in set(name.split(' ') + [name]) if word
+        )
+        self.trigrams = {}
+        for position, name in enumerate(self.names):
+            for trigram in _trigrams(name):
+                self.trigrams.setdefault(trigram, []).append(position)
+
+    def prefix_matches(self, query):
+        """Positions of names that start with, or have a word starting with, the query."""
+        start = bisect.bisect_left(self.words, (query, -1))
+        matches = set()
+        for word, position in self.words[start:]:
+            if not word.startswith(query):
+                break
+            matches.add(position)
+        return matches
+
+    def substring_matches(self, query):
+        """Positions of names containing the query (which needs 3+ characters)."""
+        postings = sorted((self.trigrams.get(trigram, []) for trigram in _trigrams(query)), key=len)
+        if not postings or not postings[0]:
+            return set()
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                return candidates
+        return {position for position in candidates if query in self.names[position]}
+
+    def search(self, query):
+        """
+        Finds names matching a query.
+
+        Args:
+            query (str): Search text
+
+        Returns:
+            list: Positions, best matches first (whole-name prefix, then
+                  word prefix, then substring), ties in published order
+        """
+        query = normalize_name(query)
+        if not query:
+            return []
+        prefix = self.prefix_matches(query)
+        substring = self.substring_matches(query) if len(query) >= 3 else set()
+
+        def relevance(position):
+            if self.names[position].startswith(query):
+                return 0
+            return 1 if position in prefix else 2
+
+        return sorted(prefix | substring, key=lambda position: (relevance(position), position))
+
+
+class LeaderboardIndex:
+    """
+    Read-only, pre-ranked view of one published leaderboard.
+
+    Rows keep the published order (total points descending) and get a
+    1-based 'rank' from it. The scraper's test profile is left out, so it
+    is never ranked, counted, searched or listed as a neighbor. Orderings
+    for other sort keys and milestone filters are computed on first use
+    and cached, so paging through a snapshot never re-sorts it.
+    """
+
+    def __init__(self, records, columns):
+        self.columns = list(columns)
+        members = (record for record in records if is_member_row(record))
+        self.rows = [dict(record, rank=position) for position, record in enumerate(members, 1)]
+        self.milestones = sorted({row.get('milestone') for row in self.rows if isinstance(row.get('milestone'), str)})
+        self._orderings = {}
+        self._lock = threading.Lock()
+
+        # Hash index on the profile URL id; the name index is built on first search
+        self.by_member_id = {}
+        for position, row in enumerate(self.rows):
+            member_id = member_id_from_url(row.get('profile_url'))
+            if member_id is not None:
+                self.by_member_id.setdefault(member_id, position)
+        self._name_index = None
+
+    @property
+    def fields(self):
+        """Fields that can be selected with ``fields=``."""
+        return ['rank'] + self.columns
+
+    def ordering(self, sort=DEFAULT_SORT, descending=True, milestones=None):
+        """
+        Returns row positions for a sort order and milestone filter.
+
+        Ties keep their published order, so ranks stay stable across sorts.
+
+        Args:
+            sort (str): One of SORT_KEYS
+            descending (bool): Sort direction
+            milestones (frozenset): Only include rows with these milestones
+
+        Returns:
+            list: Positions into self.rows
+        """
+        key = (sort, descending, milestones)
+        with self._lock:
+            cached = self._orderings.get(key)
+        if cached is not None:
+            return cached
+
+        if sort == DEFAULT_SORT and descending:
+            # Published order is already total points descending
+            order = list(range(len(self.rows)))
+        else:
+            values = [row.get(sort) for row in self.rows]
+            present = [position for position, value in enumerate(values) if not _is_missing(value)]
+            missing = [position for position, value in enumerate(values) if _is_missing(value)]
+            # sorted() is stable in both directions; rows without a value go last
+            order = sorted(present, key=values.__getitem__, reverse=descending) + missing
+        if milestones:
+            order = [position for position in order if self.rows[position].get('milestone') in milestones]
+
+        with self._lock:
+            self._orderings[key] = order
+        return order
+
+    def query(self, sort=DEFAULT_SORT, descending=True, milestones=None, offset=0, limit=None, fields=None):
+        """
+        Returns one page of the leaderboard.
+
+        Args:
+            sort (str): One of SORT_KEYS
+            descending (bool): Sort direction
+            milestones (frozenset): Only include rows with these milestones
+            offset (int): Rows to skip
+            limit (int): Maximum rows to return (default: all)
+            fields (list): Fields to include (default: all, plus 'rank')
+
+        Returns:
+            tuple: (total matching rows, list of row dicts)
+        """
+        order = self.ordering(sort, descending, milestones)
+        end = len(order) if limit is None else offset + limit
+        page = [self.rows[position] for position in order[offset:end]]
+        if fields:
+            page = [{field: row.get(field) for field in fields} for row in page]
+        return len(order), page
+
+    def parse_query(self, args):
+        """
+        Validates leaderboard query parameters.
+
+        Supported parameters:
+            limit, offset    - page window (limit at most MAX_PAGE_SIZE)
+            sort             - a SORT_KEYS column, '-' prefix for descending
+                               (default: -total_points)
+            milestone        - comma separated milestone names to include
+            fields           - comma separated fields to return
+
+        Args:
+            args (Mapping): Request query arguments
+
+        Returns:
+            dict: Keyword arguments for query()
+
+        Raises:
+            QueryError: If a parameter is invalid
+        """
+        sort = args.get('sort') or f"-{DEFAULT_SORT}"
+        descending = sort.startswith('-')
+        sort = sort.lstrip('-+')
+        if sort not in SORT_KEYS:
+            raise QueryError(f"Invalid sort '{sort}', expected one of {', '.join(SORT_KEYS)}")
+
+        try:
+            offset = int(args.get('offset', 0))
+            limit = int(args['limit']) if args.get('limit') not in (None, '') else None
+        except ValueError:
+            raise QueryError("limit and offset must be integers")
+        if offset < 0:
+            raise QueryError("offset must not be negative")
+        if limit is not None and not 1 <= limit <= MAX_PAGE_SIZE:
+            raise QueryError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+        milestones = None
+        if args.get('milestone'):
+            milestones = frozenset(name.strip() for name in args['milestone'].split(',') if name.strip())
+
+        fields = None
+        if args.get('fields'):
+            fields = [field.strip() for field in args['fields'].split(',') if field.strip()]
+            unknown = [field for field in fields if field not in self.fields]
+            if unknown:
+                raise QueryError(f"Unknown fields: {', '.join(unknown)}")
+
+        return {
+            'sort': sort,
+            'descending': descending,
+            'milestones': milestones,
+            'offset': offset,
+            'limit': limit,
+            'fields': fields,
+        }
+
+    @property
+    def name_index(self):
+        """NameIndex over the row names, built on first use."""
+        if self._name_index is None:
+            with self._lock:
+                if self._name_index is None:
+                    self._name_index = NameIndex(row.get('name') for row in self.rows)
+        return self._name_index
+
+    def _summary(self, row):
+        return {
+            'rank': row['rank'],
+            'member_id': member_id_from_url(row.get('profile_url')),
+            'name': row.get('name'),
+            'total_points': row.get('total_points'),
+            'milestone': row.get('milestone'),
+        }
+
+    def member(self, member_id, neighbors=2):
+        """
+        Looks up one member's standing.
+
+        Args:
+            member_id (str): Profile URL id (see member_id_from_url)
+            neighbors (int): Members to include above and below
+
+        Returns:
+            dict: rank, total, the member's row, badge breakdown and the
+                  neighbors above/below, or None if the member is unknown
+        """
+        position = self.by_member_id.get(member_id)
+        if position is None:
+            return None
+        row = self.rows[position]
+        return {
+            'member_id': member_id,
+            'rank': row['rank'],
+            'total': len(self.rows),
+            'member': row,
+            'breakdown': {column: row.get(column) for column in BREAKDOWN_COLUMNS},
+            'above': [self._summary(other) for other in self.rows[max(0, position - neighbors):position]],
+            'below': [self._summary(other) for other in self.rows[position + 1:position + 1 + neighbors]],
+        }
+
+    def search(self, query, limit=10):
+        """
+        Searches members by name.
+
+        Args:
+            query (str): Name, name prefix or part of a name
+            limit (int): Maximum results
+
+        Returns:
+            list: Member summaries (rank, member_id, name, total_points,
+                  milestone), best matches first
+        """
+        return [self._summary(self.rows[position]) for position in self.name_index.search(query)[:limit]]
@@ -0,0 +1,381 @@
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from publisher import atomic_write_bytes
+
+# Quantiles reported for every stage
+QUANTILES = (0.5, 0.9, 0.99)
+
+# Stages recorded during a scrape cycle and their units
+STAGES = {
+    'fetch': 'seconds',        # HTTP request per attempt (upstream latency only)
+    'fetch_wait': 'seconds',   # Rate limiter pacing, slot waits and retry backoff per profile
+    'fetch_bytes': 'bytes',    # Response body size per profile
+    'parse': 'seconds',        # HTML parse per profile
+    'classify': 'seconds',     # Badge classification per profile
+    'score': 'seconds',        # Batch scoring per cycle
+    'store': 'seconds',        # Profile store upsert and prune per cycle
+    'export': 'seconds',       # CSV export per cycle
+    'publish': 'seconds',      # Mirrors and API snapshot per cycle
+}
+
+# Last completed cycle saved next to the published CSV, so processes that
+# did not scrape (followers, the parent of an isolated scrape) can report it
+METRICS_FILE_NAME = 'scrape_metrics.json'
+
+
+def quantile(sorted_values, q):
+    """
+    Nearest-rank quantile of pre-sorted values.
+
+    Args:
+        sorted_values (list): Values in ascending order
+        q (float): Quantile in [0, 1]
+
+    Returns:
+        float: The quantile, or NaN for no values
+    """
+    if not sorted_values:
+        return float('nan')
+    rank = max(1, math.ceil(q * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class CycleMetrics:
+    """Samples and counters collected during one scrape cycle."""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.finished_at = None
+        self.success = None
+        self.samples = {}
+        self.counters = {}
+
+    @property
+    def duration(self):
+        end = self.finished_at or time.time()
+        return end - self.started_at
+
+    def to_dict(self):
+        return {
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'success': self.success,
+            'samples': self.samples,
+            'counters': self.counters,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        cycle = cls()
+        cycle.started_at = data['started_at']
+        cycle.finished_at = data.get('finished_at')
+        cycle.success = data.get('success')
+        cycle.samples = {stage: list(values) for stage, values in data.get('samples', {}).items()}
+        cycle.counters = dict(data.get('counters', {}))
+        return cycle
+
+    def summary(self):
+        """
+        Aggregates the samples of every stage.
+
+        Returns:
+            dict: Stage name to {'count', 'sum', 'max', quantile: value}
+        """
+        result = {}
+        for stage, values in self.samples.items():
+            values = sorted(values)
+            stats = {'count': len(values), 'sum': sum(values), 'max': values[-1] if values else 0}
+            for q in QUANTILES:
+                stats[q] = quantile(values, q)
+            result[stage] = stats
+        return result
+
+
+class ScrapeMetrics:
+    """
+    Process-wide scrape instrumentation.
+
+    Stages call observe()/timer() from any thread; samples go to the cycle
+    in progress, which is opened by cycle() (nested cycle() calls join the
+    outer cycle). Samples and counters recorded while no cycle is open are
+    dropped. The last completed cycle is kept for reporting, together with
+    running totals across this process's cycles.
+
+    Metrics live in the process that scraped. That process saves its last
+    cycle (save_last_cycle); a scrape run in a child process hands its cycle
+    to the parent's (absorb_cycle), and processes that only serve the data
+    report the newest saved cycle (load_last_cycle).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._current = None
+        self._depth = 0
+        self.last_cycle = None
+        self.cycles_total = 0
+        self.cycles_failed = 0
+        self.totals = {}
+        self._loaded_source = None
+
+    @contextmanager
+    def cycle(self):
+        """
+        Groups the samples recorded inside the block into one cycle.
+
+        Yields:
+            CycleMetrics: The cycle in progress; set ``success`` to False to
+                          count it as failed
+        """
+        with self._lock:
+            if self._depth == 0:
+                self._current = CycleMetrics()
+            self._depth += 1
+            current = self._current
+        try:
+            yield current
+        except BaseException:
+            current.success = False
+            raise
+        finally:
+            with self._lock:
+                self._depth -= 1
+                if self._depth == 0:
+                    current.finished_at = time.time()
+                    if current.success is None:
+                        current.success = True
+                    self.cycles_total += 1
+                    if not current.success:
+                        self.cycles_failed += 1
+                    self.last_cycle = current
+                    self._current = None
+
+    def in_cycle(self):
+        """Returns True while a cycle() block is open."""
+        with self._lock:
+            return self._depth > 0
+
+    def observe(self, stage, value):
+        """
+        Records one sample of a stage.
+
+        Args:
+            stage (str): Stage name (see STAGES)
+            value (float): Seconds, or bytes for size stages
+        """
+        with self._lock:
+            if self._current is not None:
+                self._current.samples.setdefault(stage, []).append(value)
+
+    @contextmanager
+    def timer(self, stage):
+        """Records the wall time of the block as a sample of ``stage``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def increment(self, counter, amount=1):
+        """
+        Adds to a counter of the current cycle and to its running total.
+
+        Args:
+            counter (str): Counter name, e.g. 'profiles_ok'
+            amount (float): Amount to add
+        """
+        with self._lock:
+            if self._current is None:
+                return
+            counters = self._current.counters
+            counters[counter] = counters.get(counter, 0) + amount
+            self.totals[counter] = self.totals.get(counter, 0) + amount
+
+    def save_last_cycle(self, path):
+        """
+        Writes the last completed cycle to a JSON file (atomically).
+
+        Args:
+            path (str): Destination file
+        """
+        with self._lock:
+            last_cycle = self.last_cycle
+            if last_cycle is None:
+                return
+            body = json.dumps(last_cycle.to_dict()).encode('utf-8')
+        try:
+            atomic_write_bytes(path, body)
+        except OSError as e:
+            print(f"Could not save scrape metrics to {path}: {e}")
+
+    def _read_cycle(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return CycleMetrics.from_dict(json.load(f))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            print(f"Ignoring unreadable scrape metrics {path}: {e}")
+            return None
+
+    def load_last_cycle(self, path):
+        """
+        Reports a cycle saved by another process (see save_last_cycle) as
+        the last cycle if it finished after this process's own last cycle.
+        The file is only read again after it changed.
+
+        Args:
+            path (str): File written by save_last_cycle
+
+        Returns:
+            bool: True if the saved cycle is now the last cycle
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        source = (stat.st_mtime_ns, stat.st_size)
+        if source == self._loaded_source:
+            return False
+        cycle = self._read_cycle(path)
+        if cycle is None or cycle.finished_at is None:
+            return False
+        with self._lock:
+            self._loaded_source = source
+            if self.last_cycle is not None and self.last_cycle.finished_at >= cycle.finished_at:
+                return False
+            self.last_cycle = cycle
+        return True
+
+    def absorb_cycle(self, path):
+        """
+        Adds the samples and counters of a cycle saved by another process
+        (e.g. a scrape run in a child process) to the cycle in progress.
+
+        Args:
+            path (str): File written by save_last_cycle
+
+        Returns:
+            bool: True if a saved cycle was added
+        """
+        cycle = self._read_cycle(path)
+        if cycle is None:
+            return False
+        with self._lock:
+            if self._current is None:
+                return False
+            for stage, values in cycle.samples.items():
+                self._current.samples.setdefault(stage, []).extend(values)
+            for counter, amount in cycle.counters.items():
+                self._current.counters[counter] = self._current.counters.get(counter, 0) + amount
+                self.totals[counter] = self.totals.get(counter, 0) + amount
+        return True
+
+    def render_prometheus(self):
+        """
+        Renders the metrics in the Prometheus text exposition format.
+
+        Stage summaries describe the last completed cycle (possibly one saved
+        by another process, see load_last_cycle); counters with a _total
+        suffix accumulate over the life of this process.
+
+        Returns:
+            str: Metrics text
+        """
+        with self._lock:
+            last_cycle = self.last_cycle
+            cycles_total = self.cycles_total
+            cycles_failed = self.cycles_failed
+            totals = dict(self.totals)
+            in_progress = self._depth > 0
+
+        lines = [
+            "# HELP scraper_cycles_total Completed scrape cycles.",
+            "# TYPE scraper_cycles_total counter",
+            f"scraper_cycles_total {cycles_total}",
+            "# HELP scraper_cycles_failed_total Scrape cycles that failed.",
+            "# TYPE scraper_cycles_failed_total counter",
+            f"scraper_cycles_failed_total {cycles_failed}",
+            "# HELP scraper_cycle_in_progress Whether a scrape cycle is running.",
+            "# TYPE scraper_cycle_in_progress gauge",
+            f"scraper_cycle_in_progress {int(in_progress)}",
+        ]
+
+        for counter in sorted(totals):
+            name = f"scraper_{counter}_total"
+            lines += [
+                f"# TYPE {name} counter",
+                f"{name} {_format(totals[counter])}",
+            ]
+
+        if last_cycle is None:
+            return "\n".join(lines) + "\n"
+
+        lines += [
+            "# HELP scraper_last_cycle_duration_seconds Wall time of the last completed cycle.",
+            "# TYPE scraper_last_cycle_duration_seconds gauge",
+            f"scraper_last_cycle_duration_seconds {_format(last_cycle.duration)}",
+            "# HELP scraper_last_cycle_timestamp_seconds Unix time the last cycle finished.",
+            "# TYPE scraper_last_cycle_timestamp_seconds gauge",
+            f"scraper_last_cycle_timestamp_seconds {_format(last_cycle.finished_at)}",
+            "# HELP scraper_last_cycle_success Whether the last completed cycle succeeded.",
+            "# TYPE scraper_last_cycle_success gauge",
+            f"scraper_last_cycle_success {int(bool(last_cycle.success))}",
+        ]
+
+        summary = last_cycle.summary()
+        for unit in ('seconds', 'bytes'):
+            name = f"scraper_stage_{unit}"
+            stages = [stage for stage in summary if STAGES.get(stage, 'seconds') == unit]
+            if not stages:
+                continue
+            lines += [
+                f"# HELP {name} Per-stage samples of the last completed scrape cycle.",
+                f"# TYPE {name} summary",
+            ]
+            for stage in sorted(stages):
+                stats = summary[stage]
+                for q in QUANTILES:
+                    lines.append(f'{name}{{stage="{stage}",quantile="{q}"}} {_format(stats[q])}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {_format(stats["sum"])}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {stats["count"]}')
+
+        for counter in sorted(last_cycle.counters):
+            name = f"scraper_last_cycle_{counter}"
+            lines += [
+                f"# TYPE {name} gauge",
+                f"{name} {_format(last_cycle.counters[counter])}",
+            ]
+
+        return "\n".join(lines) + "\n"
+
+    def log_summary(self, log=print):
+        """Writes a one-line-per-stage summary of the last completed cycle."""
+        last_cycle = self.last_cycle
+        if last_cycle is None:
+            return
+        log(f"Cycle took {last_cycle.duration:.2f}s, counters: {last_cycle.counters}")
+        for stage, stats in sorted(last_cycle.summary().items()):
+            if STAGES.get(stage, 'seconds') == 'bytes':
+                log(f"  {stage}: n={stats['count']} total={stats['sum']:.0f}B "
+                    f"p50={stats[0.5]:.0f}B p99={stats[0.99]:.0f}B")
+            else:
+                log(f"  {stage}: n={stats['count']} total={stats['sum']:.2f}s "
+                    f"p50={stats[0.5] * 1000:.1f}ms p99={stats[0.99] * 1000:.1f}ms max={stats['max'] * 1000:.1f}ms")
+
+
+def _format(value):
+    """Formats a sample value for the exposition format."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return "NaN"
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+# Shared instance used by the scraper, scheduler and API
+scrape_metrics = ScrapeMetrics()
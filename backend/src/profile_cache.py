@@ -0,0 +1,302 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# Markers bounding the part of a public profile page that carries the
+# profile name, stats and badge list
+HERO_MARKER = 'public-profile__hero'
+BADGE_MARKER = 'profile-badge'
+CAPTION_MARKER = 'ql-caption'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profile_cache (
+    profile_url TEXT PRIMARY KEY,
+    entry TEXT
+);
+CREATE TABLE IF NOT EXISTS profile_cache_meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER
+);
+"""
+
+
+def badge_section_digest(html):
+    """
+    Hashes the hero and badge section of a profile page.
+
+    The page also carries per-request noise (CSRF tokens, analytics ids), so
+    only the region starting at the profile hero and ending after the last
+    badge caption is hashed. If the markers are missing the whole document is
+    hashed, which simply disables the short-circuit for that page.
+
+    Args:
+        html (str): Raw HTML of the profile page
+
+    Returns:
+        str: Hex SHA-256 digest of the badge section
+    """
+    start = html.find(HERO_MARKER)
+    if start == -1:
+        start = html.find(BADGE_MARKER)
+
+    end = -1
+    if start != -1:
+        last_caption = html.rfind(CAPTION_MARKER)
+        if last_caption > start:
+            end = html.find('</div>', last_caption)
+            if end != -1:
+                end += len('</div>')
+        if end == -1:
+            last_badge = html.rfind(BADGE_MARKER)
+            end = last_badge + len(BADGE_MARKER) if last_badge >= start else -1
+
+    section = html[start:end] if start != -1 and end != -1 else html
+    return hashlib.sha256(section.encode('utf-8')).hexdigest()
+
+
+class ProfileCache:
+    """
+    Per-profile validators and last known results, persisted in SQLite.
+
+    Each entry is keyed by profile URL and holds the ETag/Last-Modified
+    returned by the server, the badge section digest, the parsed profile
+    data and the CSV row computed from it. Entries are served from memory;
+    save() only writes the entries that changed since the last save, so a
+    cycle's disk writes follow the profiles that changed rather than the
+    size of the cohort. The table can share the profile store's database.
+
+    Every save bumps a version number in the database, so a cache whose
+    entries another process (e.g. an isolated scrape) saved since can be
+    reloaded (see reload_if_changed).
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._entries = {}
+        self._dirty = set()
+        self._version = None
+        self._lock = threading.Lock()
+        if path:
+            self.load()
+
+    @staticmethod
+    def _get_version(conn):
+        row = conn.execute("SELECT value FROM profile_cache_meta WHERE key = 'version'").fetchone()
+        return row[0] if row else 0
+
+    @contextmanager
+    def _connect(self):
+        """Opens a connection that commits on success and is always closed."""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def load(self):
+        """Loads entries from disk, starting empty if the database is unreadable."""
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with self._connect() as conn:
+                conn.executescript(SCHEMA)
+                version = self._get_version(conn)
+                entries = {}
+                for url, entry in conn.execute("SELECT profile_url, entry FROM profile_cache"):
+                    try:
+                        entries[url] = json.loads(entry)
+                    except ValueError:
+                        continue
+            with self._lock:
+                self._entries = entries
+                self._dirty.clear()
+                self._version = version
+        except (OSError, sqlite3.Error) as e:
+            print(f"Ignoring unreadable profile cache {self.path}: {e}")
+            # Keep working in memory only
+            self.path = None
+
+    def reload_if_changed(self):
+        """
+        Reloads the entries if another process saved the cache since this
+        one last loaded or saved it.
+
+        Returns:
+            bool: True if the entries were reloaded
+        """
+        if not self.path:
+            return False
+        try:
+            with self._connect() as conn:
+                conn.executescript(SCHEMA)
+                version = self._get_version(conn)
+        except sqlite3.Error as e:
+            print(f"Could not check profile cache {self.path}: {e}")
+            return False
+        if version == self._version:
+            return False
+        print(f"Profile cache {self.path} was saved by another process, reloading it")
+        self.load()
+        return True
+
+    def import_json(self, json_path):
+        """
+        Imports a profile cache written by older versions (one JSON file)
+        and removes the file once its entries are saved.
+
+        Args:
+            json_path (str): Legacy cache file
+
+        Returns:
+            int: Number of entries imported
+        """
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable legacy profile cache {json_path}: {e}")
+            return 0
+        if not isinstance(entries, dict):
+            return 0
+        with self._lock:
+            imported = [url for url, entry in entries.items()
+                        if url not in self._entries and isinstance(entry, dict)]
+            for url in imported:
+                self._entries[url] = entries[url]
+                self._dirty.add(url)
+        self.save()
+        if self.path and not self._dirty:
+            os.remove(json_path)
+        print(f"Imported {len(imported)} entries from legacy profile cache {json_path}")
+        return len(imported)
+
+    def save(self):
+        """
+        Writes the entries changed since the last save.
+
+        Returns:
+            int: Number of entries written
+        """
+        if not self.path:
+            return 0
+        with self._lock:
+            dirty = [(url, json.dumps(self._entries[url], ensure_ascii=False))
+                     for url in self._dirty if url in self._entries]
+            self._dirty.clear()
+        if not dirty:
+            return 0
+        try:
+            with self._connect() as conn:
+                conn.executemany(
+                    "INSERT INTO profile_cache (profile_url, entry) VALUES (?, ?) "
+                    "ON CONFLICT(profile_url) DO UPDATE SET entry = excluded.entry",
+                    dirty
+                )
+                version = self._get_version(conn) + 1
+                conn.execute(
+                    "INSERT INTO profile_cache_meta (key, value) VALUES ('version', ?) "
+                    "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                    (version,)
+                )
+            self._version = version
+        except sqlite3.Error as e:
+            print(f"Error saving profile cache {self.path}: {e}")
+            with self._lock:
+                # Retry with the next save
+                self._dirty.update(url for url, _ in dirty)
+            return 0
+        return len(dirty)
+
+    def _set(self, url, entry):
+        # Called with the lock held; unchanged entries are not rewritten
+        if self._entries.get(url) != entry:
+            self._entries[url] = entry
+            self._dirty.add(url)
+
+    def get(self, url):
+        """
+        Returns the cached entry for a profile.
+
+        Args:
+            url (str): Profile URL
+
+        Returns:
+            dict: Cached entry, or None if the profile was never scraped
+        """
+        with self._lock:
+            return self._entries.get(url)
+
+    def conditional_headers(self, url):
+        """
+        Builds conditional request headers from stored validators.
+
+        Args:
+            url (str): Profile URL
+
+        Returns:
+            dict: If-None-Match / If-Modified-Since headers (may be empty)
+        """
+        entry = self.get(url)
+        headers = {}
+        if entry and entry.get('profile_data') is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def update(self, url, etag=None, last_modified=None, digest=None, profile_data=None):
+        """
+        Stores validators and, when given, a freshly parsed profile.
+
+        A new profile_data drops the cached row so it gets recomputed.
+
+        Args:
+            url (str): Profile URL
+            etag (str): ETag response header
+            last_modified (str): Last-Modified response header
+            digest (str): Badge section digest
+            profile_data (dict): Parsed profile data
+        """
+        with self._lock:
+            entry = dict(self._entries.get(url) or {})
+            entry['etag'] = etag
+            entry['last_modified'] = last_modified
+            if digest is not None:
+                entry['digest'] = digest
+            if profile_data is not None:
+                entry['profile_data'] = profile_data
+                entry.pop('row', None)
+            self._set(url, entry)
+
+    def get_row(self, url):
+        """
+        Returns the CSV row last computed for a profile.
+
+        Args:
+            url (str): Profile URL
+
+        Returns:
+            dict: Row dict, or None if not computed yet
+        """
+        entry = self.get(url)
+        return entry.get('row') if entry else None
+
+    def set_row(self, url, row):
+        """
+        Stores the CSV row computed for a profile.
+
+        Args:
+            url (str): Profile URL
+            row (dict): Row dict
+        """
+        with self._lock:
+            if url in self._entries:
+                self._set(url, dict(self._entries[url], row=row))
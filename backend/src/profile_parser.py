@@ -0,0 +1,135 @@
+import os
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+# Available parser backends:
+#   html.parser - full document tree with Python's built-in parser
+#   lxml        - full document tree with the lxml C parser
+#   targeted    - only the profile name, hero section and badge containers
+#                 are materialized (lxml when installed, html.parser otherwise)
+PARSER_BACKENDS = ('html.parser', 'lxml', 'targeted')
+DEFAULT_PARSER = os.environ.get('SCRAPER_PARSER', 'targeted')
+
+try:
+    import lxml  # noqa: F401
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+_warned_missing_lxml = False
+
+
+def _tree_builder():
+    """Returns the fastest installed BeautifulSoup tree builder."""
+    global _warned_missing_lxml
+    if LXML_AVAILABLE:
+        return 'lxml'
+    if not _warned_missing_lxml:
+        print("lxml is not installed, falling back to html.parser")
+        _warned_missing_lxml = True
+    return 'html.parser'
+
+
+def _has_class(attrs, class_name):
+    classes = attrs.get('class') or ''
+    if isinstance(classes, str):
+        classes = classes.split()
+    return class_name in classes
+
+
+def _is_profile_element(name, attrs):
+    """SoupStrainer filter keeping only the elements scrape_cloud_profile reads."""
+    if name == 'h1':
+        return _has_class(attrs, 'ql-display-small')
+    if name == 'div':
+        return _has_class(attrs, 'public-profile__hero') or _has_class(attrs, 'profile-badge')
+    return False
+
+
+PROFILE_STRAINER = SoupStrainer(_is_profile_element)
+
+
+def make_soup(html, backend=None):
+    """
+    Parses profile HTML with the requested backend.
+
+    Args:
+        html (str): Raw HTML of the public profile page
+        backend (str): One of PARSER_BACKENDS (default: DEFAULT_PARSER)
+
+    Returns:
+        BeautifulSoup: Parsed document (partial for the targeted backend)
+    """
+    backend = backend or DEFAULT_PARSER
+    if backend == 'html.parser':
+        return BeautifulSoup(html, 'html.parser')
+    if backend == 'lxml':
+        return BeautifulSoup(html, _tree_builder())
+    if backend == 'targeted':
+        return BeautifulSoup(html, _tree_builder(), parse_only=PROFILE_STRAINER)
+    raise ValueError(f"Unknown parser backend '{backend}', expected one of {', '.join(PARSER_BACKENDS)}")
+
+
+def extract_profile(soup):
+    """
+    Extracts the profile name, hero stats and raw badge entries.
+
+    Uses find/find_all rather than CSS selectors; they match the same
+    elements as the scraper's original selectors without going through
+    soupsieve on every badge.
+
+    Args:
+        soup (BeautifulSoup): Document from make_soup
+
+    Returns:
+        tuple: (name or None, stats dict or None, list of badge dicts with
+               'name' and optional 'date'/'image', or None when the page
+               has no badge containers)
+    """
+    name_elem = soup.find('h1', class_='ql-display-small')
+    name = name_elem.text.strip() if name_elem else None
+
+    stats = None
+    profile_details = soup.find('div', class_='public-profile__hero')
+    if profile_details:
+        # Extract completion stats
+        stats = {}
+        stat_elements = profile_details.find_all('div', class_='ql-subhead-1')
+        label_elements = profile_details.find_all('div', class_='ql-headline-6')
+
+        for i in range(min(len(stat_elements), len(label_elements))):
+            label = label_elements[i].text.strip()
+            value = stat_elements[i].text.strip()
+            stats[label] = value
+
+    badge_containers = soup.find_all('div', class_='profile-badge')
+    if not badge_containers:
+        return name, stats, None
+
+    badges = []
+    for badge_container in badge_containers:
+        badge_info = {}
+
+        # Extract badge name - looking for the span with class ql-title-medium
+        name_elem = badge_container.find('span', class_='ql-title-medium')
+        if not name_elem:
+            # Try alternative selectors
+            name_elem = badge_container.find('div', class_='ql-title')
+            if not name_elem:
+                continue
+
+        badge_info['name'] = name_elem.text.strip()
+
+        # Badge date
+        date_elem = badge_container.find('div', class_='ql-caption')
+        if date_elem:
+            badge_info['date'] = date_elem.text.strip()
+
+        # Badge image
+        img_elem = badge_container.find('img')
+        if img_elem and img_elem.has_attr('src'):
+            badge_info['image'] = img_elem['src']
+
+        badges.append(badge_info)
+
+    return name, stats, badges
@@ -0,0 +1,276 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+# Leaderboard columns stored per profile, in CSV order (profile_url is the key)
+ROW_COLUMNS = [
+    'name', 'game_badges', 'special_game_badges', 'trivia_badges',
+    'skill_badges', 'lab_badges', 'arcade_points', 'milestone',
+    'bonus_points', 'total_points'
+]
+# Badge count columns; their sum drives a profile's badge velocity
+BADGE_COLUMNS = ['game_badges', 'special_game_badges', 'trivia_badges', 'skill_badges', 'lab_badges']
+# Weight of the latest observation in the badge velocity moving average
+VELOCITY_SMOOTHING = 0.5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    profile_url TEXT PRIMARY KEY,
+    name TEXT,
+    game_badges INTEGER,
+    special_game_badges INTEGER,
+    trivia_badges INTEGER,
+    skill_badges INTEGER,
+    lab_badges INTEGER,
+    arcade_points INTEGER,
+    milestone TEXT,
+    bonus_points INTEGER,
+    total_points INTEGER,
+    last_scraped REAL,
+    last_changed REAL,
+    velocity REAL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class ProfileStore:
+    """
+    Persistent per-profile leaderboard rows, keyed by profile URL, in SQLite.
+
+    Each scrape cycle upserts its rows; only rows whose values changed are
+    rewritten (unchanged ones just get their last_scraped timestamp bumped).
+    Every change bumps a store generation, and the CSV export only needs to
+    be regenerated when the generation moved past the last exported one.
+
+    Scraped changes also update last_changed and the profile's badge
+    velocity (badges per day, exponentially smoothed), which the refresh
+    planner uses to decide how often the profile is scraped.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            # Stores created before velocity tracking
+            columns = {row['name'] for row in conn.execute("PRAGMA table_info(profiles)")}
+            if 'velocity' not in columns:
+                conn.execute("ALTER TABLE profiles ADD COLUMN velocity REAL DEFAULT 0")
+
+    @contextmanager
+    def _connect(self):
+        """Opens a connection that commits on success and is always closed."""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _get_meta(conn, key, default=None):
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row['value'] if row else default
+
+    @staticmethod
+    def _set_meta(conn, key, value):
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, str(value))
+        )
+
+    def _bump_generation(self, conn):
+        generation = int(self._get_meta(conn, 'generation', 0)) + 1
+        self._set_meta(conn, 'generation', generation)
+        return generation
+
+    def generation(self):
+        """Returns the store generation, bumped whenever a row changes."""
+        with self._connect() as conn:
+            return int(self._get_meta(conn, 'generation', 0))
+
+    def upsert_rows(self, rows, scraped_at=None, touch=True):
+        """
+        Inserts or updates leaderboard rows.
+
+        Args:
+            rows (list): Row dicts with a 'profile_url' key and ROW_COLUMNS
+            scraped_at (float): Scrape timestamp (default: now)
+            touch (bool): Whether the rows were just scraped. Rows that were
+                          only recomputed (e.g. rescored) keep their stored
+                          last_scraped time.
+
+        Returns:
+            int: Number of rows inserted or changed
+        """
+        scraped_at = scraped_at or time.time()
+        rows = [row for row in rows if row.get('profile_url')]
+        if not rows:
+            return 0
+
+        with self._lock, self._connect() as conn:
+            existing = {}
+            activity = {}
+            urls = [row['profile_url'] for row in rows]
+            # Stay well below SQLite's bound parameter limit
+            for i in range(0, len(urls), 500):
+                chunk = urls[i:i + 500]
+                placeholders = ','.join('?' * len(chunk))
+                for stored in conn.execute(
+                        f"SELECT profile_url, {', '.join(ROW_COLUMNS)}, last_changed, velocity FROM profiles "
+                        f"WHERE profile_url IN ({placeholders})", chunk):
+                    existing[stored['profile_url']] = tuple(stored[column] for column in ROW_COLUMNS)
+                    activity[stored['profile_url']] = (stored['last_changed'], stored['velocity'])
+
+            changed = []
+            unchanged = []
+            for row in rows:
+                url = row['profile_url']
+                values = tuple(row.get(column) for column in ROW_COLUMNS)
+                if existing.get(url) == values:
+                    unchanged.append((scraped_at, url))
+                else:
+                    velocity = self._velocity(existing.get(url), values, activity.get(url), scraped_at)
+                    changed.append((url,) + values + (scraped_at, scraped_at, velocity))
+
+            if changed:
+                columns = ['profile_url'] + ROW_COLUMNS + ['last_scraped', 'last_changed', 'velocity']
+                # Recomputed rows (touch=False) did not change on the site, so
+                # their scrape and activity fields stay as they are
+                activity_columns = ('last_scraped', 'last_changed', 'velocity')
+                updated_columns = [column for column in columns[1:] if touch or column not in activity_columns]
+                updates = ', '.join(f"{column} = excluded.{column}" for column in updated_columns)
+                conn.executemany(
+                    f"INSERT INTO profiles ({', '.join(columns)}) "
+                    f"VALUES ({','.join('?' * len(columns))}) "
+                    f"ON CONFLICT(profile_url) DO UPDATE SET {updates}",
+                    changed
+                )
+                self._bump_generation(conn)
+            if unchanged and touch:
+                conn.executemany("UPDATE profiles SET last_scraped = ? WHERE profile_url = ?", unchanged)
+
+        return len(changed)
+
+    @staticmethod
+    def _velocity(old_values, new_values, activity, changed_at):
+        """Smoothed badges per day after a change (0 for new profiles)."""
+        if old_values is None or activity is None or activity[0] is None:
+            return 0.0
+        last_changed, velocity = activity
+        badge_indexes = [ROW_COLUMNS.index(column) for column in BADGE_COLUMNS]
+        gained = sum(new_values[i] or 0 for i in badge_indexes) - sum(old_values[i] or 0 for i in badge_indexes)
+        # At least an hour, so two scrapes in quick succession do not spike it
+        elapsed_days = max(changed_at - last_changed, 3600) / 86400
+        rate = max(gained, 0) / elapsed_days
+        return VELOCITY_SMOOTHING * rate + (1 - VELOCITY_SMOOTHING) * (velocity or 0.0)
+
+    def fetch_activity(self):
+        """
+        Returns the scrape and change history of every stored profile.
+
+        Returns:
+            dict: profile_url to a dict with last_scraped, last_changed and
+                  velocity (badges per day)
+        """
+        with self._connect() as conn:
+            cursor = conn.execute("SELECT profile_url, last_scraped, last_changed, velocity FROM profiles")
+            return {
+                row['profile_url']: {
+                    'last_scraped': row['last_scraped'],
+                    'last_changed': row['last_changed'],
+                    'velocity': row['velocity'] or 0.0,
+                }
+                for row in cursor
+            }
+
+    def prune(self, keep_urls, scope=None):
+        """
+        Deletes profiles that are no longer on the roster.
+
+        Args:
+            keep_urls (iterable): Profile URLs to keep
+            scope (callable): Optional predicate limiting pruning to the
+                              stored URLs it accepts (e.g. one roster shard)
+
+        Returns:
+            int: Number of rows deleted
+        """
+        keep_urls = set(keep_urls)
+        with self._lock, self._connect() as conn:
+            stored_urls = [row['profile_url'] for row in conn.execute("SELECT profile_url FROM profiles")]
+            removed = [(url,) for url in stored_urls
+                       if url not in keep_urls and (scope is None or scope(url))]
+            if removed:
+                conn.executemany("DELETE FROM profiles WHERE profile_url = ?", removed)
+                self._bump_generation(conn)
+        return len(removed)
+
+    def fetch_rows(self):
+        """
+        Returns all stored rows.
+
+        Returns:
+            list: Row dicts with ROW_COLUMNS, profile_url and last_scraped
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f"SELECT {', '.join(ROW_COLUMNS)}, profile_url, last_scraped FROM profiles "
+                "ORDER BY total_points DESC, name"
+            )
+            return [dict(row) for row in cursor]
+
+    def get_row(self, url):
+        """
+        Returns the stored row for a profile.
+
+        Args:
+            url (str): Profile URL
+
+        Returns:
+            dict: Row dict, or None if the profile is not stored
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(ROW_COLUMNS)}, profile_url, last_scraped FROM profiles "
+                "WHERE profile_url = ?", (url,)
+            ).fetchone()
+            return dict(row) if row else None
+
+    def needs_export(self, output_file):
+        """
+        Checks whether the CSV export is missing or behind the store.
+
+        Args:
+            output_file (str): Export CSV path
+
+        Returns:
+            bool: True if the export must be regenerated
+        """
+        if not os.path.exists(output_file):
+            return True
+        with self._connect() as conn:
+            generation = self._get_meta(conn, 'generation', '0')
+            exported = self._get_meta(conn, 'exported_generation')
+            return exported != generation
+
+    def mark_exported(self, generation):
+        """
+        Records that the export reflects a store generation.
+
+        Args:
+            generation (int): Generation the export was built from
+        """
+        with self._lock, self._connect() as conn:
+            self._set_meta(conn, 'exported_generation', generation)
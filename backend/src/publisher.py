@@ -0,0 +1,112 @@
+import os
+import shutil
+import tempfile
+
+
+def _temp_path_for(path):
+    """Creates an empty temp file next to path so os.replace stays on one filesystem."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    os.close(fd)
+    return tmp_path
+
+
+def atomic_write(path, write_func):
+    """
+    Writes a file atomically: write_func fills a temp file in the same
+    directory, which is then renamed over path. Readers see either the old
+    or the new file, never a partially written one.
+
+    Args:
+        path (str): Destination file
+        write_func (callable): Called with the temp file path to write to
+    """
+    tmp_path = _temp_path_for(path)
+    try:
+        write_func(tmp_path)
+        with open(tmp_path, 'rb') as f:
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def atomic_write_bytes(path, data):
+    """
+    Writes bytes to a file atomically.
+
+    Args:
+        path (str): Destination file
+        data (bytes): File contents
+    """
+    def write(tmp_path):
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+    atomic_write(path, write)
+
+
+def link_mirror(canonical_path, mirror_path):
+    """
+    Points a mirror location at the canonical file.
+
+    The mirror becomes a relative symlink, swapped in atomically, so later
+    publishes to the canonical file are visible through it without copying.
+    Where symlinks are unavailable the file is copied atomically instead.
+
+    Args:
+        canonical_path (str): The published file
+        mirror_path (str): Additional location that must serve the same data
+
+    Returns:
+        str: 'linked', 'unchanged' or 'copied'
+    """
+    if os.path.abspath(canonical_path) == os.path.abspath(mirror_path):
+        return 'unchanged'
+
+    mirror_dir = os.path.dirname(os.path.abspath(mirror_path))
+    os.makedirs(mirror_dir, exist_ok=True)
+    target = os.path.relpath(os.path.abspath(canonical_path), mirror_dir)
+
+    if os.path.islink(mirror_path) and os.readlink(mirror_path) == target:
+        return 'unchanged'
+
+    tmp_link = os.path.join(mirror_dir, f".{os.path.basename(mirror_path)}.{os.getpid()}.link")
+    try:
+        if os.path.lexists(tmp_link):
+            os.remove(tmp_link)
+        os.symlink(target, tmp_link)
+        os.replace(tmp_link, mirror_path)
+        return 'linked'
+    except (OSError, NotImplementedError):
+        if os.path.lexists(tmp_link):
+            os.remove(tmp_link)
+
+    atomic_write(mirror_path, lambda tmp_path: shutil.copyfile(canonical_path, tmp_path))
+    return 'copied'
+
+
+def link_mirrors(canonical_path, mirror_paths, logger=None):
+    """
+    Points every mirror location at the canonical file.
+
+    Args:
+        canonical_path (str): The published file
+        mirror_paths (list): Additional locations that must serve the same data
+        logger (logging.Logger): Optional logger for per-mirror results
+
+    Returns:
+        dict: Mirror path to link_mirror result (or the error message)
+    """
+    results = {}
+    for mirror_path in mirror_paths:
+        try:
+            results[mirror_path] = link_mirror(canonical_path, mirror_path)
+        except OSError as e:
+            results[mirror_path] = f"error: {e}"
+        if logger:
+            logger.info(f"Mirror {mirror_path}: {results[mirror_path]}")
+    return results
@@ -0,0 +1,292 @@
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+
+from metrics import scrape_metrics
+
+# Pacing and retry settings, overridable from the environment
+DEFAULT_RATE = float(os.environ.get('SCRAPER_RATE', 8))          # requests per second per host
+DEFAULT_BURST = int(os.environ.get('SCRAPER_BURST', 8))          # largest token bucket capacity
+DEFAULT_MAX_RETRIES = int(os.environ.get('SCRAPER_MAX_RETRIES', 3))
+BACKOFF_BASE = float(os.environ.get('SCRAPER_BACKOFF_BASE', 0.5))
+BACKOFF_MAX = float(os.environ.get('SCRAPER_BACKOFF_MAX', 30))
+# Retries allowed per cycle, as a fraction of the profiles scraped
+RETRY_BUDGET_RATIO = float(os.environ.get('SCRAPER_RETRY_BUDGET', 0.2))
+MIN_RETRY_BUDGET = 10
+# Longest Retry-After we are willing to honour before giving up on a request
+MAX_RETRY_AFTER = 120
+
+# Status codes that signal throttling or a transient server problem
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+THROTTLE_STATUSES = frozenset({429, 503})
+
+
+def parse_retry_after(value):
+    """
+    Parses a Retry-After header.
+
+    Args:
+        value (str): Header value, either delta-seconds or an HTTP date
+
+    Returns:
+        float: Seconds to wait, or None if the header is missing or invalid
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_MAX):
+    """
+    Exponential backoff with full jitter.
+
+    Args:
+        attempt (int): Retry number, starting at 0
+        base (float): Delay ceiling of the first retry in seconds
+        cap (float): Maximum delay in seconds
+
+    Returns:
+        float: Seconds to sleep before the retry
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def burst_for_rate(rate, max_burst=DEFAULT_BURST):
+    """
+    Token bucket capacity for a rate: one second's worth of requests, at
+    least one and at most max_burst. A low, budgeted rate is then paced
+    from its first request instead of starting with a burst.
+
+    Args:
+        rate (float): Requests per second
+        max_burst (int): Largest capacity
+
+    Returns:
+        int: Bucket capacity
+    """
+    return max(1, min(max_burst, int(rate)))
+
+
+class TokenBucket:
+    """
+    Token bucket pacing requests to ``rate`` per second with bursts of up to
+    ``capacity`` (default: see burst_for_rate). A Retry-After from the
+    server pauses the whole bucket.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, capacity=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = max(rate, 0.001)
+        self.capacity = max(1, burst_for_rate(self.rate) if capacity is None else capacity)
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = float(self.capacity)
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Blocks until a token is available and takes it."""
+        while True:
+            with self._lock:
+                now = self.clock()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    self._refill(now)
+                    # Tolerate rounding: a refill may land just short of a token
+                    if self._tokens >= 1 - 1e-9:
+                        self._tokens = max(0.0, self._tokens - 1)
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            self.sleep(wait)
+
+    def pause(self, seconds):
+        """Stops handing out tokens for ``seconds`` and drains the bucket."""
+        with self._lock:
+            now = self.clock()
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._tokens = 0.0
+            self._updated = max(now, self._paused_until)
+
+
+class AdaptiveConcurrency:
+    """
+    Concurrency limit adjusted with AIMD: every success raises the limit by
+    1/limit (about one slot per round of requests), and throttling halves it.
+    Decreases are spaced out so one burst of 429s only counts once.
+    """
+
+    def __init__(self, max_limit, min_limit=1, initial=None, decrease_interval=1.0, clock=time.monotonic):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.limit = float(initial or self.max_limit)
+        self.decrease_interval = decrease_interval
+        self.clock = clock
+        self._in_flight = 0
+        self._last_decrease = None
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def slot(self):
+        """Holds one concurrency slot for the duration of the block."""
+        with self._cond:
+            while self._in_flight >= int(self.limit):
+                self._cond.wait()
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+                self._cond.notify_all()
+
+    def on_success(self):
+        with self._cond:
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+    def on_throttle(self):
+        with self._cond:
+            now = self.clock()
+            if self._last_decrease is None or now - self._last_decrease >= self.decrease_interval:
+                self.limit = max(self.min_limit, self.limit / 2)
+                self._last_decrease = now
+
+
+class RetryBudget:
+    """Caps the number of retries spent in one scrape cycle."""
+
+    def __init__(self, retries):
+        self.remaining = max(0, retries)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_cycle(cls, profile_count, ratio=RETRY_BUDGET_RATIO):
+        return cls(max(MIN_RETRY_BUDGET, int(profile_count * ratio)))
+
+    def try_spend(self):
+        """
+        Returns:
+            bool: True if a retry was available and has been taken
+        """
+        with self._lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            return True
+
+
+class HostLimiter:
+    """
+    Paces and retries requests to one host.
+
+    Combines a token bucket (sustained rate), an adaptive concurrency limit
+    (AIMD on 429/5xx) and a retry budget shared with the other hosts of the
+    cycle. Retryable failures are retried with jittered exponential backoff,
+    or after the server's Retry-After when it sends one. ``clock`` and
+    ``sleep`` default to the time module.
+    """
+
+    def __init__(self, max_concurrency, rate=DEFAULT_RATE, burst=None,
+                 max_retries=DEFAULT_MAX_RETRIES, budget=None, clock=time.monotonic, sleep=time.sleep):
+        self.bucket = TokenBucket(rate, burst, clock=clock, sleep=sleep)
+        self.concurrency = AdaptiveConcurrency(max_concurrency, clock=clock)
+        self.max_retries = max(0, max_retries)
+        self.budget = budget
+        self.sleep = sleep
+
+    def _can_retry(self, attempt):
+        if attempt >= self.max_retries:
+            return False
+        return self.budget is None or self.budget.try_spend()
+
+    def get(self, session, url, **kwargs):
+        """
+        Sends a GET request, retrying throttled and transient failures.
+
+        Each request is recorded as a 'fetch' sample (upstream latency);
+        everything else spent here (pacing, concurrency slots, backoff) is
+        recorded once per call as 'fetch_wait'.
+
+        Args:
+            session (requests.Session): Session to send the request with
+            url (str): URL to fetch
+            **kwargs: Passed to session.get
+
+        Returns:
+            requests.Response: The final response; it may still carry an
+                               error status once retries are exhausted
+
+        Raises:
+            requests.exceptions.RequestException: Connection errors that
+                                                  could not be retried
+        """
+        start = time.perf_counter()
+        requesting = 0.0
+        attempt = 0
+        try:
+            while True:
+                with self.concurrency.slot():
+                    self.bucket.acquire()
+                    request_start = time.perf_counter()
+                    try:
+                        response = session.get(url, **kwargs)
+                    except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                        self.concurrency.on_throttle()
+                        if not self._can_retry(attempt):
+                            raise
+                        delay = backoff_delay(attempt)
+                        print(f"Request to {url} failed ({e}), retrying in {delay:.1f}s")
+                        response = None
+                    finally:
+                        elapsed = time.perf_counter() - request_start
+                        requesting += elapsed
+                        scrape_metrics.observe('fetch', elapsed)
+
+                if response is not None:
+                    if response.status_code not in RETRYABLE_STATUSES:
+                        self.concurrency.on_success()
+                        return response
+
+                    self.concurrency.on_throttle()
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    if retry_after is not None and retry_after > MAX_RETRY_AFTER:
+                        print(f"Server asked to wait {retry_after:.0f}s for {url}, giving up")
+                        return response
+                    if not self._can_retry(attempt):
+                        return response
+                    if retry_after is not None:
+                        # The server told us when the host is available again
+                        if response.status_code in THROTTLE_STATUSES:
+                            self.bucket.pause(retry_after)
+                        delay = retry_after
+                    else:
+                        delay = backoff_delay(attempt)
+                    print(f"Got HTTP {response.status_code} for {url}, retrying in {delay:.1f}s")
+                    response.close()
+
+                scrape_metrics.increment('fetch_retries')
+                self.sleep(delay)
+                attempt += 1
+        finally:
+            scrape_metrics.observe('fetch_wait', time.perf_counter() - start - requesting)
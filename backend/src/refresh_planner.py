@@ -0,0 +1,120 @@
+import os
+import time
+
+# Refresh intervals by activity tier, in seconds
+ACTIVE_INTERVAL = float(os.environ.get('REFRESH_ACTIVE_MINUTES', 5)) * 60
+WARM_INTERVAL = float(os.environ.get('REFRESH_WARM_MINUTES', 20)) * 60
+DORMANT_INTERVAL = float(os.environ.get('REFRESH_DORMANT_MINUTES', 60)) * 60
+# A profile is active if it changed within ACTIVE_WINDOW or earns at least
+# ACTIVE_VELOCITY badges per day, warm if it changed within WARM_WINDOW
+ACTIVE_WINDOW = 24 * 3600
+WARM_WINDOW = 7 * 24 * 3600
+ACTIVE_VELOCITY = 1.0
+# Badge velocity halves for every this many days without a change
+VELOCITY_HALF_LIFE_DAYS = 3.0
+# Profile requests per minute spent on scheduled refreshes
+DEFAULT_BUDGET_PER_MINUTE = int(os.environ.get('SCRAPE_BUDGET_PER_MINUTE', 60))
+
+TIERS = ('new', 'active', 'warm', 'dormant')
+TIER_INTERVALS = {'new': 0, 'active': ACTIVE_INTERVAL, 'warm': WARM_INTERVAL, 'dormant': DORMANT_INTERVAL}
+
+
+def effective_velocity(activity, now):
+    """Stored badge velocity decayed by the time since the last change."""
+    if not activity or not activity.get('last_changed'):
+        return 0.0
+    idle_days = max(0.0, now - activity['last_changed']) / 86400
+    return (activity.get('velocity') or 0.0) * 0.5 ** (idle_days / VELOCITY_HALF_LIFE_DAYS)
+
+
+def activity_tier(activity, now):
+    """
+    Classifies a profile by how recently and how fast it changes.
+
+    Args:
+        activity (dict): last_scraped, last_changed and velocity from
+                         ProfileStore.fetch_activity, or None if never stored
+        now (float): Current time
+
+    Returns:
+        str: One of TIERS
+    """
+    if not activity or not activity.get('last_scraped'):
+        return 'new'
+    last_changed = activity.get('last_changed') or 0
+    if now - last_changed <= ACTIVE_WINDOW or effective_velocity(activity, now) >= ACTIVE_VELOCITY:
+        return 'active'
+    if now - last_changed <= WARM_WINDOW:
+        return 'warm'
+    return 'dormant'
+
+
+class RefreshPlanner:
+    """
+    Decides which profiles to scrape next under a fixed request budget.
+
+    Every profile gets a refresh interval from its activity tier. On each
+    tick the profiles past their interval are ranked by how overdue they
+    are (time since last scraped or attempted, divided by the interval;
+    never-scraped profiles first) and the top ones, up to the tick's share
+    of the budget, are returned. Profiles that fail to scrape wait a full
+    interval before they are planned again, so they cannot crowd out the
+    rest of the roster.
+    """
+
+    def __init__(self, budget_per_minute=DEFAULT_BUDGET_PER_MINUTE):
+        self.budget_per_minute = max(1, budget_per_minute)
+        self.attempts = {}
+
+    @property
+    def rate(self):
+        """Requests per second that spread the budget evenly over a minute."""
+        return self.budget_per_minute / 60.0
+
+    def batch_size(self, tick_seconds):
+        """Profiles that fit in the budget for one tick."""
+        return max(1, int(self.budget_per_minute * tick_seconds / 60))
+
+    def plan(self, roster_urls, activity, limit, now=None):
+        """
+        Picks the profiles due for a refresh.
+
+        Args:
+            roster_urls (list): Profile URLs on the roster
+            activity (dict): profile_url to ProfileStore.fetch_activity entries
+            limit (int): Maximum profiles to return
+            now (float): Current time (default: now)
+
+        Returns:
+            list: Profile URLs, most overdue first
+        """
+        now = now or time.time()
+        due = []
+        for position, url in enumerate(roster_urls):
+            state = activity.get(url)
+            tier = activity_tier(state, now)
+            last = max((state or {}).get('last_scraped') or 0, self.attempts.get(url, 0))
+            if tier == 'new':
+                if now - last >= ACTIVE_INTERVAL:
+                    due.append((float('inf'), position, url))
+                continue
+            overdue = (now - last) / TIER_INTERVALS[tier]
+            if overdue >= 1:
+                due.append((overdue, position, url))
+
+        due.sort(key=lambda item: (-item[0], item[1]))
+        planned = [url for _, _, url in due[:limit]]
+
+        roster = set(roster_urls)
+        self.attempts = {url: attempted for url, attempted in self.attempts.items() if url in roster}
+        for url in planned:
+            self.attempts[url] = now
+        return planned
+
+    def tier_counts(self, roster_urls, activity, now=None):
+        """Number of roster profiles in each tier, for logging."""
+        now = now or time.time()
+        counts = dict.fromkeys(TIERS, 0)
+        for url in roster_urls:
+            counts[activity_tier(activity.get(url), now)] += 1
+        return counts
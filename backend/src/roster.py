@@ -0,0 +1,154 @@
+import csv
+import hashlib
+import json
+import os
+
+# Default roster location, overridable from the environment
+DEFAULT_ROSTER_PATH = os.environ.get(
+    'ROSTER_FILE',
+    os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'profiles', 'roster.csv'))
+)
+
+
+def _iter_csv(f):
+    reader = csv.reader(f)
+    header = next(reader, None)
+    if header is None:
+        return
+    columns = [column.strip().lower() for column in header]
+    if 'profile_url' in columns:
+        index = columns.index('profile_url')
+    elif 'url' in columns:
+        index = columns.index('url')
+    else:
+        # Headerless file: the first line is already a URL
+        index = 0
+        yield header[0]
+    for record in reader:
+        if len(record) > index:
+            yield record[index]
+
+
+def _iter_jsonl(f):
+    for line_number, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            print(f"Skipping invalid roster line {line_number}: {line[:80]}")
+            continue
+        if isinstance(record, str):
+            yield record
+        elif isinstance(record, dict):
+            yield record.get('profile_url') or record.get('url') or ''
+
+
+def _iter_text(f):
+    for line in f:
+        yield line.split('#', 1)[0]
+
+
+def iter_roster(path=None):
+    """
+    Streams profile URLs from a roster file, one at a time.
+
+    Supported formats, chosen by extension:
+        .csv   - a 'profile_url' (or 'url') column, or URLs in the first column
+        .jsonl - one JSON object per line with 'profile_url' (or 'url'),
+                 or one JSON string per line
+        other  - one URL per line, '#' starts a comment
+
+    Blank entries and duplicates are skipped.
+
+    Args:
+        path (str): Roster file (default: DEFAULT_ROSTER_PATH)
+
+    Yields:
+        str: Profile URL
+    """
+    path = path or DEFAULT_ROSTER_PATH
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        parse = _iter_csv
+    elif extension in ('.jsonl', '.ndjson'):
+        parse = _iter_jsonl
+    else:
+        parse = _iter_text
+
+    seen = set()
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for url in parse(f):
+            url = url.strip()
+            if url and url not in seen:
+                seen.add(url)
+                yield url
+
+
+def parse_shard(spec):
+    """
+    Parses a shard specification of the form 'i/N' (0 <= i < N).
+
+    Args:
+        spec (str): Shard specification, e.g. '0/4'
+
+    Returns:
+        tuple: (index, count)
+    """
+    try:
+        index, count = (int(part) for part in spec.split('/'))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{spec}', expected 'i/N'")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Invalid shard '{spec}', expected 0 <= i < N")
+    return index, count
+
+
+def shard_of(url, count):
+    """
+    Returns the shard a profile URL belongs to.
+
+    The assignment hashes the URL, so it does not depend on roster order and
+    a profile stays in the same shard as other members are added or removed.
+
+    Args:
+        url (str): Profile URL
+        count (int): Number of shards
+
+    Returns:
+        int: Shard index in [0, count)
+    """
+    digest = hashlib.sha1(url.encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % count
+
+
+def in_shard(url, shard):
+    """
+    Checks whether a profile URL belongs to a shard.
+
+    Args:
+        url (str): Profile URL
+        shard (tuple): (index, count), or None for the whole roster
+
+    Returns:
+        bool: True if the URL is in the shard
+    """
+    if shard is None:
+        return True
+    index, count = shard
+    return shard_of(url, count) == index
+
+
+def load_roster(path=None, shard=None):
+    """
+    Loads the profile URLs of a roster shard.
+
+    Args:
+        path (str): Roster file (default: DEFAULT_ROSTER_PATH)
+        shard (tuple): (index, count) from parse_shard, or None for all
+
+    Returns:
+        list: Profile URLs in roster order
+    """
+    return [url for url in iter_roster(path) if in_shard(url, shard)]
@@ -1,9 +1,15 @@
 import os
 import subprocess
 import logging
+import tempfile
 from datetime import datetime
 import time
 
+from publisher import link_mirrors
+from leader import FileLease, SCRAPE_LOCK_NAME
+from metrics import scrape_metrics, METRICS_FILE_NAME
+from cloud_profile_scraper import run_scrape
+
 # Set up logging
 log_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "logs"))
 if not os.path.exists(log_dir):
@@ -18,10 +24,107 @@ logging.basicConfig(
     ]
 )
 
-def run_scraper():
-    """Run the cloud profile scraper script once"""
+# Run the scraper in a separate Python process instead of in-process.
+# In-process runs reuse warm imports, the HTTP connection pool and the
+# profile cache; isolated runs trade that for a crash-proof boundary.
+ISOLATED_SCRAPER = os.environ.get("SCRAPER_ISOLATED", "").lower() in ("1", "true", "yes")
+
+# Standard data directory; the app reports the metrics saved here
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "data", "profiles"))
+
+def run_scraper_in_process(output_file, profile_urls=None, progress=None, rate=None):
+    """Run the scrape in the current process. Returns True on success."""
+    try:
+        options = {'rate': rate} if rate else {}
+        changed = run_scrape(output_file, profile_urls=profile_urls, progress=progress, **options)
+        logging.info(f"In-process scrape changed {changed} stored rows")
+        return True
+    except Exception as e:
+        logging.error(f"In-process scraper failed: {e}")
+        import traceback
+        logging.error(traceback.format_exc())
+        return False
+
+def run_scraper_isolated(scraper_script, output_file, profile_urls=None, rate=None):
+    """
+    Run the scraper script in a child Python process. A profile subset is
+    handed over in a temporary file (--profiles). The child's metrics cycle
+    comes back in another one (--metrics-file) and is added to the cycle in
+    progress. Returns True on success.
+    """
+    python_cmd = "python3" if os.name != "nt" else "python"
+    command = [python_cmd, scraper_script, "--output", output_file]
+    if rate:
+        command += ["--rate", str(rate)]
+    
+    profiles_file = None
+    if profile_urls is not None:
+        fd, profiles_file = tempfile.mkstemp(prefix="profiles-", suffix=".txt",
+                                             dir=os.path.dirname(output_file))
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write("".join(f"{url}\n" for url in profile_urls))
+        command += ["--profiles", profiles_file]
+    fd, metrics_file = tempfile.mkstemp(prefix="metrics-", suffix=".json", dir=os.path.dirname(output_file))
+    os.close(fd)
+    command += ["--metrics-file", metrics_file]
+    
     try:
-        logging.info("Starting cloud profile scraper...")
+        result = subprocess.run(
+            command,
+            capture_output=True,
+            text=True,
+            check=False
+        )
+        if os.path.getsize(metrics_file) > 0:
+            scrape_metrics.absorb_cycle(metrics_file)
+    finally:
+        if profiles_file:
+            os.remove(profiles_file)
+        os.remove(metrics_file)
+    
+    if result.returncode == 0:
+        logging.debug(f"Output: {result.stdout}")
+        return True
+    
+    logging.error(f"Scraper failed with return code {result.returncode}")
+    logging.error(f"Error: {result.stderr}")
+    # Log the actual stdout too for debugging
+    logging.error(f"Output: {result.stdout}")
+    return False
+
+def run_scraper(isolated=None, profile_urls=None, progress=None, rate=None):
+    """
+    Run the cloud profile scraper once and publish its output
+    
+    Args:
+        isolated (bool): Run in a child process (default: ISOLATED_SCRAPER)
+        profile_urls (list): URLs to scrape (default: full roster)
+        progress (callable): Called as progress(done, total) after each
+                             profile (in-process runs only)
+        rate (float): Requests per second (default: the scraper's rate limit)
+    
+    Returns:
+        bool: True if the scrape succeeded
+    """
+    if isolated is None:
+        isolated = ISOLATED_SCRAPER
+    # Callers that publish further (app.custom_run_scraper) open the cycle
+    # themselves and log its summary once publishing is done
+    nested = scrape_metrics.in_cycle()
+    with scrape_metrics.cycle() as cycle:
+        success = _run_scraper(isolated, profile_urls, progress, rate)
+        cycle.success = success
+    if not nested:
+        scrape_metrics.log_summary(logging.info)
+        # Reported by the API processes at /api/metrics
+        scrape_metrics.save_last_cycle(os.path.join(DATA_DIR, METRICS_FILE_NAME))
+    return success
+
+def _run_scraper(isolated, profile_urls, progress=None, rate=None):
+    """Body of run_scraper, recorded as one metrics cycle"""
+    success = False
+    try:
+        logging.info(f"Starting cloud profile scraper ({'isolated process' if isolated else 'in-process'})...")
         start_time = time.time()
         
         # Get the script directory
@@ -35,7 +138,7 @@ def run_scraper():
         logging.info(f"Project root directory: {project_root}")
         
         # Save to data directory - this is the standard location
-        data_dir = os.path.abspath(os.path.join(project_root, "data", "profiles"))
+        data_dir = DATA_DIR
         
         # Create data directory if it doesn't exist
         if not os.path.exists(data_dir):
@@ -47,21 +150,16 @@ def run_scraper():
         root_output_file = os.path.join(project_root, "profiles_data.csv")
         
         # Log all file paths for debugging
-        logging.info(f"Script directory: {script_dir}")
-        logging.info(f"Scraper script: {scraper_script}")
         logging.info(f"Output file: {output_file}")
         logging.info(f"Root output file: {root_output_file}")
         
-        # Run the scraper script
-        python_cmd = "python3" if os.name != "nt" else "python"
-        result = subprocess.run(
-            [python_cmd, scraper_script, "--output", output_file],
-            capture_output=True,
-            text=True,
-            check=False
-        )
+        # Run the scraper
+        if isolated:
+            success = run_scraper_isolated(scraper_script, output_file, profile_urls=profile_urls, rate=rate)
+        else:
+            success = run_scraper_in_process(output_file, profile_urls=profile_urls, progress=progress, rate=rate)
         
-        if result.returncode == 0:
+        if success:
             logging.info(f"Scraper completed successfully. Data saved to {output_file}")
             
             # Check if the output file exists and has content
@@ -74,42 +172,15 @@ def run_scraper():
             else:
                 logging.error(f"Output file {output_file} was not created")
             
-            # Copy to the project root for backward compatibility
-            try:
-                if os.path.exists(output_file) and os.path.getsize(output_file) > 0:
-                    with open(output_file, 'r') as src, open(root_output_file, 'w') as dst:
-                        content = src.read()
-                        dst.write(content)
-                    logging.info(f"Data copied to {root_output_file} ({len(content)} bytes)")
-                else:
-                    logging.warning(f"Not copying to root because source file is missing or empty")
-            except Exception as e:
-                logging.error(f"Error copying data to root: {e}")
-                
-            # Also copy to public directory for direct serving
-            public_dir = os.path.abspath(os.path.join(project_root, "public"))
-            if not os.path.exists(public_dir):
-                os.makedirs(public_dir)
-                
-            public_output_file = os.path.join(public_dir, "data.csv")
-            try:
-                # Copy the file to public directory
-                if os.path.exists(output_file) and os.path.getsize(output_file) > 0:
-                    with open(output_file, 'r') as src, open(public_output_file, 'w') as dst:
-                        content = src.read()
-                        dst.write(content)
-                    logging.info(f"Data copied to {public_output_file} ({len(content)} bytes)")
-                else:
-                    logging.warning(f"Not copying to public because source file is missing or empty")
-            except Exception as e:
-                logging.error(f"Error copying data to public dir: {e}")
-            
-            logging.debug(f"Output: {result.stdout}")
-        else:
-            logging.error(f"Scraper failed with return code {result.returncode}")
-            logging.error(f"Error: {result.stderr}")
-            # Log the actual stdout too for debugging
-            logging.error(f"Output: {result.stdout}")
+            # Point the root and public copies at the freshly published file.
+            # The scraper renames its output into place, so mirrors never
+            # expose a partially written CSV.
+            public_output_file = os.path.join(project_root, "public", "data.csv")
+            if os.path.exists(output_file) and os.path.getsize(output_file) > 0:
+                with scrape_metrics.timer('publish'):
+                    link_mirrors(output_file, [root_output_file, public_output_file], logger=logging)
+            else:
+                logging.warning("Not publishing mirrors because the output file is missing or empty")
         
         # Calculate and log execution time
         end_time = time.time()
@@ -121,14 +192,29 @@ def run_scraper():
         logging.error(f"Error running scraper: {e}")
         import traceback
         logging.error(traceback.format_exc())
+    
+    return success
 
 def main():
     logging.info("Running the cloud profile scraper")
     
-    # Run once without scheduling
-    run_scraper()
+    # The API's scrape leader writes the same CSV, store and snapshot, so
+    # take the same scrape lease it does and never scrape alongside it
+    scrape_lease = FileLease(os.path.join(DATA_DIR, SCRAPE_LOCK_NAME))
+    if not scrape_lease.acquire():
+        logging.warning(f"A scrape is already running (pid {scrape_lease.owner()}), not starting another")
+        return False
+    try:
+        # Run once without scheduling
+        success = run_scraper()
+    finally:
+        scrape_lease.release()
     
-    logging.info("Scraper completed successfully")
+    if success:
+        logging.info("Scraper completed successfully")
+    else:
+        logging.error("Scraper run failed")
+    return success
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    raise SystemExit(0 if main() else 1)
\ No newline at end of file
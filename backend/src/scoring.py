@@ -0,0 +1,188 @@
+import numpy as np
+import pandas as pd
+
+# Badge count columns read by the scoring rules
+COUNT_COLUMNS = ['game_badges', 'trivia_badges', 'skill_badges', 'lab_badges', 'special_game_badges']
+
+# Arcade points per badge type; skill badges score one point per pair
+POINTS_PER_BADGE = {
+    'game_badges': 1,
+    'trivia_badges': 1,
+    'special_game_badges': 2,
+}
+SKILL_BADGES_PER_POINT = 2
+
+# Milestone tiers, lowest first
+MILESTONES = [
+    {
+        "name": "Milestone 1",
+        "requirements": {
+            "game_badges": 4,
+            "trivia_badges": 4,
+            "skill_badges": 10,
+            "lab_badges": 4
+        },
+        "points": {
+            "game_badges": 4,
+            "trivia_badges": 4,
+            "skill_badges": 5,
+            "bonus": 2
+        }
+    },
+    {
+        "name": "Milestone 2",
+        "requirements": {
+            "game_badges": 6,
+            "trivia_badges": 6,
+            "skill_badges": 20,
+            "lab_badges": 8
+        },
+        "points": {
+            "game_badges": 6,
+            "trivia_badges": 6,
+            "skill_badges": 10,
+            "bonus": 8
+        }
+    },
+    {
+        "name": "Milestone 3",
+        "requirements": {
+            "game_badges": 8,
+            "trivia_badges": 7,
+            "skill_badges": 30,
+            "lab_badges": 12
+        },
+        "points": {
+            "game_badges": 8,
+            "trivia_badges": 7,
+            "skill_badges": 15,
+            "bonus": 15
+        }
+    },
+    {
+        "name": "Ultimate Milestone",
+        "requirements": {
+            "game_badges": 10,
+            "trivia_badges": 8,
+            "skill_badges": 44,
+            "lab_badges": 16
+        },
+        "points": {
+            "game_badges": 10,
+            "trivia_badges": 8,
+            "skill_badges": 22,
+            "bonus": 25
+        }
+    }
+]
+
+NO_MILESTONE = "No Milestone Achieved"
+
+# Milestone tables as arrays, built once. Requirement columns follow
+# REQUIREMENT_COLUMNS; the extra last entry of the name/bonus tables is the
+# "no milestone" tier, so a tier index of -1 selects it.
+REQUIREMENT_COLUMNS = ['game_badges', 'trivia_badges', 'skill_badges', 'lab_badges']
+MILESTONE_REQUIREMENTS = np.array(
+    [[milestone["requirements"][column] for column in REQUIREMENT_COLUMNS] for milestone in MILESTONES],
+    dtype=np.int64
+)
+MILESTONE_NAMES = np.array([milestone["name"] for milestone in MILESTONES] + [NO_MILESTONE], dtype=object)
+MILESTONE_BONUS = np.array([milestone["points"]["bonus"] for milestone in MILESTONES] + [0], dtype=np.int64)
+
+
+def badge_count_matrix(badge_counts):
+    """
+    Builds an (n, len(COUNT_COLUMNS)) integer matrix of badge counts.
+
+    Args:
+        badge_counts: DataFrame, dict of columns or list of dicts with
+                      COUNT_COLUMNS (missing values count as 0)
+
+    Returns:
+        numpy.ndarray: Badge counts in COUNT_COLUMNS order
+    """
+    if not isinstance(badge_counts, pd.DataFrame):
+        badge_counts = pd.DataFrame(badge_counts)
+    return (badge_counts.reindex(columns=COUNT_COLUMNS)
+            .apply(pd.to_numeric, errors='coerce')
+            .fillna(0)
+            .to_numpy(dtype=np.int64))
+
+
+def arcade_points(counts):
+    """
+    Computes arcade points for a badge count matrix.
+
+    Args:
+        counts (numpy.ndarray): Matrix from badge_count_matrix
+
+    Returns:
+        numpy.ndarray: Arcade points per member
+    """
+    game, trivia, skill, _, special = counts.T
+    return (game * POINTS_PER_BADGE['game_badges']
+            + trivia * POINTS_PER_BADGE['trivia_badges']
+            + skill // SKILL_BADGES_PER_POINT
+            + special * POINTS_PER_BADGE['special_game_badges'])
+
+
+def milestone_tiers(counts):
+    """
+    Finds the highest milestone every member meets.
+
+    Args:
+        counts (numpy.ndarray): Matrix from badge_count_matrix
+
+    Returns:
+        numpy.ndarray: Index into MILESTONES per member, -1 for none
+    """
+    requirement_counts = counts[:, :len(REQUIREMENT_COLUMNS)]
+    # met[i, t] is True when member i meets every requirement of tier t
+    met = (requirement_counts[:, None, :] >= MILESTONE_REQUIREMENTS[None, :, :]).all(axis=2)
+    highest = len(MILESTONES) - 1 - np.argmax(met[:, ::-1], axis=1)
+    return np.where(met.any(axis=1), highest, -1)
+
+
+def score_cohort(badge_counts):
+    """
+    Scores a whole cohort at once.
+
+    Produces the arcade points, milestone, bonus and total of every member
+    with vectorized array operations instead of a loop over profiles.
+
+    Args:
+        badge_counts: DataFrame, dict of columns or list of dicts with
+                      COUNT_COLUMNS, one entry per member
+
+    Returns:
+        pandas.DataFrame: 'arcade_points', 'milestone', 'bonus_points' and
+                          'total_points' columns, aligned with the input
+    """
+    index = badge_counts.index if isinstance(badge_counts, pd.DataFrame) else None
+    counts = badge_count_matrix(badge_counts)
+    points = arcade_points(counts)
+    tiers = milestone_tiers(counts)
+    bonus = MILESTONE_BONUS[tiers]
+    return pd.DataFrame({
+        'arcade_points': points,
+        'milestone': MILESTONE_NAMES[tiers],
+        'bonus_points': bonus,
+        'total_points': points + bonus
+    }, index=index)
+
+
+def score_rows(rows):
+    """
+    Recomputes the score columns of leaderboard rows.
+
+    Args:
+        rows (list): Row dicts with COUNT_COLUMNS
+
+    Returns:
+        list: Copies of the rows with 'arcade_points', 'milestone',
+              'bonus_points' and 'total_points' replaced
+    """
+    if not rows:
+        return []
+    scores = score_cohort(rows).to_dict(orient='records')
+    return [dict(row, **score) for row, score in zip(rows, scores)]
@@ -0,0 +1,175 @@
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# What happens when a task fires while its previous run is still going:
+#   skip      drop this run
+#   queue     run again once per missed firing, back to back
+#   coalesce  run again once, however many firings were missed
+OVERLAP_POLICIES = ('skip', 'queue', 'coalesce')
+DEFAULT_WORKERS = 4
+
+
+class ScheduledTask:
+    """A function run every ``interval`` seconds, with its run statistics."""
+
+    def __init__(self, name, func, interval, overlap):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.overlap = overlap
+        self.next_run = None
+        self.running = False
+        self.pending = 0
+        self.runs = 0
+        self.skipped = 0
+        self.failures = 0
+        self.last_duration = None
+        # Seconds between the planned and the actual time of the last firing
+        self.last_lag = None
+
+
+class TimerScheduler:
+    """
+    Runs periodic tasks on a worker pool.
+
+    Next fire times live in a heap; the timer thread sleeps until the
+    earliest one (or until a task is added) instead of polling, so tasks
+    fire on time. Fire times advance by whole intervals from the previous
+    fire time, not from when a run finished, so they do not drift; firings
+    missed while the process was stalled are dropped rather than replayed.
+    Runs happen on the pool, so a slow task never delays the others, and
+    each task's overlap policy (see OVERLAP_POLICIES) decides what happens
+    when it fires while still running.
+    """
+
+    def __init__(self, max_workers=DEFAULT_WORKERS, logger=None):
+        self.logger = logger
+        self.tasks = []
+        self._heap = []
+        self._order = itertools.count()
+        self._condition = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scheduler")
+        self._stopped = False
+
+    def every(self, interval, func, name=None, overlap='skip', run_now=False):
+        """
+        Schedules a function.
+
+        Args:
+            interval (float): Seconds between runs
+            func (callable): Called without arguments
+            name (str): Task name for logs (default: the function name)
+            overlap (str): One of OVERLAP_POLICIES
+            run_now (bool): Fire once immediately instead of after one interval
+
+        Returns:
+            ScheduledTask: The scheduled task
+        """
+        if overlap not in OVERLAP_POLICIES:
+            raise ValueError(f"Unknown overlap policy '{overlap}', expected one of {', '.join(OVERLAP_POLICIES)}")
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        task = ScheduledTask(name or func.__name__, func, interval, overlap)
+        with self._condition:
+            task.next_run = time.monotonic() + (0 if run_now else interval)
+            self.tasks.append(task)
+            heapq.heappush(self._heap, (task.next_run, next(self._order), task))
+            self._condition.notify()
+        return task
+
+    def run(self):
+        """Fires tasks until stop() is called; blocks the calling thread."""
+        while True:
+            with self._condition:
+                while not self._stopped:
+                    now = time.monotonic()
+                    if self._heap and self._heap[0][0] <= now:
+                        break
+                    self._condition.wait(self._heap[0][0] - now if self._heap else None)
+                if self._stopped:
+                    return
+                _, _, task = heapq.heappop(self._heap)
+                task.last_lag = now - task.next_run
+                # Advance by whole intervals from the planned time
+                missed = int((now - task.next_run) // task.interval)
+                task.next_run += (missed + 1) * task.interval
+                heapq.heappush(self._heap, (task.next_run, next(self._order), task))
+                self._fire(task)
+
+    def start(self):
+        """Runs the timer loop on a daemon thread."""
+        thread = threading.Thread(target=self.run, name="timer-scheduler", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self, wait=False):
+        """Stops firing tasks; with wait=True also waits for running ones."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        self._executor.shutdown(wait=wait)
+
+    def render_prometheus(self):
+        """
+        Renders per-task run statistics in the Prometheus text format.
+
+        Returns:
+            str: Metrics text
+        """
+        with self._condition:
+            tasks = [(task.name, task.runs, task.skipped, task.failures, task.running,
+                      task.last_duration, task.last_lag) for task in self.tasks]
+        metrics = [
+            ('scheduler_task_runs_total', 'counter', 'Completed runs of a scheduled task.', 1),
+            ('scheduler_task_skipped_total', 'counter', 'Firings skipped because the task was still running.', 2),
+            ('scheduler_task_failures_total', 'counter', 'Runs that raised an exception.', 3),
+            ('scheduler_task_running', 'gauge', 'Whether the task is running.', 4),
+            ('scheduler_task_last_duration_seconds', 'gauge', 'Wall time of the last run.', 5),
+            ('scheduler_task_last_lag_seconds', 'gauge', 'How late the last firing was.', 6),
+        ]
+        lines = []
+        for name, kind, description, field in metrics:
+            lines += [f"# HELP {name} {description}", f"# TYPE {name} {kind}"]
+            for task in tasks:
+                if task[field] is not None:
+                    lines.append(f'{name}{{task="{task[0]}"}} {float(task[field]):g}')
+        return "\n".join(lines) + "\n"
+
+    def _fire(self, task):
+        # Called with the condition held
+        if task.running:
+            if task.overlap == 'skip':
+                task.skipped += 1
+                self._log(f"Task {task.name} is still running, skipping this run")
+            elif task.overlap == 'queue':
+                task.pending += 1
+            else:
+                task.pending = 1
+            return
+        task.running = True
+        self._executor.submit(self._run_task, task)
+
+    def _run_task(self, task):
+        while True:
+            start = time.monotonic()
+            try:
+                task.func()
+            except Exception as e:
+                task.failures += 1
+                if self.logger:
+                    self.logger.error(f"Task {task.name} failed: {e}")
+            with self._condition:
+                task.runs += 1
+                task.last_duration = time.monotonic() - start
+                if task.pending and not self._stopped:
+                    task.pending -= 1
+                    continue
+                task.running = False
+                return
+
+    def _log(self, message):
+        if self.logger:
+            self.logger.info(message)
@@ -0,0 +1,143 @@
+import json
+import os
+import threading
+import time
+
+# Concurrent stream connections per process. Each open stream holds a
+# server thread, so keep this below the worker's thread count.
+MAX_STREAM_CLIENTS = int(os.environ.get('STREAM_MAX_CLIENTS', 24))
+# Seconds between heartbeat comments on an idle stream; keeps proxies from
+# closing it and lets the server notice clients that went away
+HEARTBEAT_SECONDS = float(os.environ.get('STREAM_HEARTBEAT_SECONDS', 15))
+# Streams are closed after this long so threads are recycled; EventSource
+# reconnects on its own and resumes from Last-Event-ID
+MAX_STREAM_SECONDS = float(os.environ.get('STREAM_MAX_SECONDS', 600))
+# Reconnect delay suggested to clients, in milliseconds
+RETRY_MILLISECONDS = int(os.environ.get('STREAM_RETRY_MS', 5000))
+
+
+def format_event(data, event=None, event_id=None):
+    """
+    Serializes a Server-Sent Event.
+
+    Args:
+        data (dict): JSON payload
+        event (str): Event type (default: 'message')
+        event_id: Event id, sent back by reconnecting clients as Last-Event-ID
+
+    Returns:
+        bytes: Event in the text/event-stream format
+    """
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return ('\n'.join(lines) + '\n\n').encode('utf-8')
+
+
+class UpdateBroker:
+    """
+    Fans one "new data published" notification out to every open stream.
+
+    The broker only keeps the latest update, tagged with a sequence number.
+    Streams block on a shared condition until the sequence moves past the
+    one they last sent, so a publish costs one wake-up per connection and
+    an idle connection costs nothing but a heartbeat.
+    """
+
+    def __init__(self, max_clients=MAX_STREAM_CLIENTS):
+        self.max_clients = max_clients
+        self.clients = 0
+        self.sequence = 0
+        self.update = None
+        self._condition = threading.Condition()
+
+    def publish(self, event_id, data):
+        """
+        Announces a new update to every waiting stream.
+
+        Args:
+            event_id: Id of the update (the leaderboard generation)
+            data (dict): Event payload
+        """
+        with self._condition:
+            self.sequence += 1
+            self.update = (event_id, data)
+            self._condition.notify_all()
+
+    def latest(self):
+        """Returns (sequence, update) for the most recent update."""
+        with self._condition:
+            return self.sequence, self.update
+
+    def connect(self):
+        """
+        Reserves a connection slot.
+
+        Returns:
+            bool: False if max_clients streams are already open
+        """
+        with self._condition:
+            if self.clients >= self.max_clients:
+                return False
+            self.clients += 1
+            return True
+
+    def disconnect(self):
+        """Releases a slot reserved with connect()."""
+        with self._condition:
+            self.clients = max(0, self.clients - 1)
+
+    def wait(self, sequence, timeout):
+        """
+        Waits for an update newer than ``sequence``.
+
+        Args:
+            sequence (int): Sequence of the last update the caller has seen
+            timeout (float): Seconds to wait
+
+        Returns:
+            tuple: (sequence, update) of the newest update, or None on timeout
+        """
+        with self._condition:
+            if self._condition.wait_for(lambda: self.sequence != sequence, timeout):
+                return self.sequence, self.update
+            return None
+
+    def stream(self, last_event_id=None, heartbeat=HEARTBEAT_SECONDS, max_duration=MAX_STREAM_SECONDS):
+        """
+        Generates the body of one event stream.
+
+        The current update is sent first unless the client already has it
+        (its Last-Event-ID matches), then each new update as it is
+        published, with heartbeat comments in between. The caller
+        reserves a slot with connect() and releases it with disconnect()
+        once the response is closed (also when the client goes away).
+
+        Args:
+            last_event_id (str): Last-Event-ID sent by a reconnecting client
+            heartbeat (float): Seconds between heartbeats
+            max_duration (float): Seconds before the stream is closed
+
+        Yields:
+            bytes: Event stream chunks
+        """
+        yield f"retry: {RETRY_MILLISECONDS}\n\n".encode('utf-8')
+        sequence, update = self.latest()
+        if update is not None and str(update[0]) != last_event_id:
+            yield format_event(update[1], event='leaderboard', event_id=update[0])
+
+        deadline = time.monotonic() + max_duration
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            result = self.wait(sequence, min(heartbeat, remaining))
+            if result is None:
+                # Comment line; a dead connection fails on this write
+                yield b": heartbeat\n\n"
+                continue
+            sequence, update = result
+            yield format_event(update[1], event='leaderboard', event_id=update[0])
@@ -0,0 +1,18 @@
+import os
+import sys
+import time
+
+# Modules in src/ are imported by their module name, as app.py does; the
+# app itself lives in the backend directory
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'src'))
+
+
+def wait_for(predicate, timeout=5.0):
+    """Polls until predicate() is true, failing the test after ``timeout`` seconds."""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.005)
@@ -0,0 +1,68 @@
+import json
+import math
+
+import pytest
+
+import app as app_module
+from cloud_profile_scraper import TEST_PROFILE, export_store, rows_to_dataframe, write_csv
+from profile_store import ProfileStore
+from scoring import score_rows
+
+URL = "https://example.com/public_profiles/{}"
+
+
+def member(i, game_badges=1):
+    return {
+        'name': f"Member {i}", 'game_badges': game_badges, 'special_game_badges': 0, 'trivia_badges': 0,
+        'skill_badges': 0, 'lab_badges': 0, 'profile_url': URL.format(i),
+    }
+
+
+def strict_json(body):
+    def reject(constant):
+        raise ValueError(f"invalid JSON constant {constant}")
+    return json.loads(body, parse_constant=reject)
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    # Private data paths; no mirrors and no background scheduler
+    data_path = str(tmp_path / 'profiles_data.csv')
+    monkeypatch.setattr(app_module, 'PROFILES_DATA_PATH', data_path)
+    monkeypatch.setattr(app_module, 'MIRROR_DATA_PATHS', [])
+    monkeypatch.setattr(app_module, 'start_scheduler', lambda: None)
+    monkeypatch.setattr(app_module, '_snapshot', None)
+    write_csv(rows_to_dataframe([dict(TEST_PROFILE)] + score_rows([member(i) for i in range(3)])), data_path)
+    store = ProfileStore(str(tmp_path / 'profiles.db'))
+    store.upsert_rows(score_rows([member(0, game_badges=5), member(1), member(2)]))
+    export_store(store, data_path)
+    app_module.reload_snapshot()
+    return app_module.app.test_client()
+
+
+def test_leaderboard_is_valid_json_without_the_test_profile(client):
+    response = client.get('/api/leaderboard')
+    assert response.status_code == 200
+    rows = strict_json(response.data)
+    assert [row['profile_url'] for row in rows] == [URL.format(i) for i in range(3)]
+    assert response.headers['X-Leaderboard-Generation'] == '1'
+
+
+def test_changes_fallback_matches_the_leaderboard(client):
+    rows = strict_json(client.get('/api/leaderboard').data)
+    changes = strict_json(client.get('/api/leaderboard/changes?since=99').data)
+    assert changes['full'] is True
+    assert changes['rows'] == rows
+
+
+def test_changes_leave_out_the_test_profile(client):
+    changes = strict_json(client.get('/api/leaderboard/changes?since=0').data)
+    assert changes['full'] is False
+    assert [row['profile_url'] for row in changes['upserts']] == [URL.format(0)]
+    assert changes['removals'] == []
+
+
+def test_pages_have_no_nan(client):
+    page = strict_json(client.get('/api/leaderboard?limit=10&sort=name').data)
+    assert page['total'] == 3
+    assert all(not (isinstance(value, float) and math.isnan(value)) for row in page['rows'] for value in row.values())
@@ -0,0 +1,91 @@
+import json
+import os
+
+import pytest
+
+import badge_classifier
+from badge_classifier import BadgeClassifier, get_classifier, reload_rules_if_changed
+
+
+@pytest.fixture(autouse=True)
+def fresh_classifier(monkeypatch):
+    # Every test starts without a shared classifier
+    monkeypatch.setattr(badge_classifier, '_classifier', None)
+
+
+def write_rules(path, rules, mtime=None):
+    path.write_text(json.dumps(rules), encoding='utf-8')
+    if mtime is not None:
+        os.utime(path, ns=(mtime, mtime))
+    return str(path)
+
+
+@pytest.mark.parametrize('name, badge_type', [
+    ("Google Cloud Trivia July Week 3", 'trivia_badges'),
+    ("Level 2: Cloud Infrastructure", 'game_badges'),
+    ("The Arcade Base Camp July", 'game_badges'),
+    ("Arcade TechCare", 'special_game_badges'),
+    ("Google Docs", 'lab_badges'),
+    ("Build a Secure Google Cloud Network", 'skill_badges'),
+])
+def test_default_rules(name, badge_type):
+    assert BadgeClassifier().classify(name) == badge_type
+
+
+def test_rules_apply_in_order():
+    classifier = BadgeClassifier({
+        'lab_free_courses': ["Level Up Week 1", "Arcade TechCare"],
+        'special_game_badges': ["Level Up", "Arcade TechCare"],
+    })
+    # The week marker wins over every list, game prefixes over the special
+    # games, and special games over the lab-free courses
+    assert classifier.classify("Level Up Week 1") == 'trivia_badges'
+    assert classifier.classify("Level Up") == 'game_badges'
+    assert classifier.classify("Arcade TechCare") == 'special_game_badges'
+
+
+def test_missing_rule_keys_fall_back_to_the_defaults():
+    classifier = BadgeClassifier({'lab_free_courses': ["Intro Course"]})
+    assert classifier.classify("Intro Course") == 'lab_badges'
+    assert classifier.classify("Google Docs") == 'skill_badges'
+    assert classifier.classify("Level 1: Basics") == 'game_badges'
+
+
+def test_classify_many_keeps_the_input_order():
+    names = ["Google Docs", "Level 1: Basics", "Google Docs", "Some Skill"]
+    assert BadgeClassifier().classify_many(names) == ['lab_badges', 'game_badges', 'lab_badges', 'skill_badges']
+
+
+def test_digest_identifies_the_rule_set():
+    assert BadgeClassifier().digest == BadgeClassifier({'game_badge_prefixes': ["Level "]}).digest
+    assert BadgeClassifier().digest != BadgeClassifier({'game_badge_prefixes': ["Stage "]}).digest
+
+
+def test_unreadable_rules_file_falls_back_to_the_defaults(tmp_path):
+    path = tmp_path / 'badge_rules.json'
+    path.write_text('[not, json', encoding='utf-8')
+    assert BadgeClassifier.from_file(str(path)).digest == BadgeClassifier().digest
+    assert BadgeClassifier.from_file(str(tmp_path / 'missing.json')).digest == BadgeClassifier().digest
+
+
+def test_edited_rules_file_is_reloaded(tmp_path, monkeypatch):
+    path = write_rules(tmp_path / 'badge_rules.json', {'special_game_badges': ["Old Special"]}, mtime=10**18)
+    monkeypatch.setattr(badge_classifier, 'DEFAULT_RULES_PATH', path)
+    assert get_classifier().classify("New Special") == 'skill_badges'
+    assert not reload_rules_if_changed(path)
+
+    write_rules(tmp_path / 'badge_rules.json', {'special_game_badges': ["New Special"]}, mtime=2 * 10**18)
+    assert reload_rules_if_changed(path)
+    # The memoized result of the old rules is gone with the old classifier
+    assert get_classifier().classify("New Special") == 'special_game_badges'
+    assert not reload_rules_if_changed(path)
+
+
+def test_removed_rules_file_reloads_the_defaults(tmp_path, monkeypatch):
+    path = write_rules(tmp_path / 'badge_rules.json', {'special_game_badges': ["Old Special"]})
+    monkeypatch.setattr(badge_classifier, 'DEFAULT_RULES_PATH', path)
+    assert get_classifier().classify("Old Special") == 'special_game_badges'
+
+    os.remove(path)
+    assert reload_rules_if_changed(path)
+    assert get_classifier().classify("Old Special") == 'skill_badges'
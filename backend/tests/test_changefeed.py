@@ -0,0 +1,98 @@
+import math
+
+from changefeed import ChangeFeed, clean_row, diff_rows, row_key
+
+
+def row(url, points, name=None):
+    return {'name': name or url, 'total_points': points, 'profile_url': url}
+
+
+def test_row_key_falls_back_to_name():
+    assert row_key(row('https://example.com/a', 1)) == 'https://example.com/a'
+    assert row_key({'name': 'Test', 'profile_url': math.nan}) == 'name:Test'
+
+
+def test_diff_rows_reports_upserts_and_removals():
+    old = [row('a', 1), row('b', 2), row('c', 3)]
+    new = [row('a', 1), row('b', 5), row('d', 4)]
+    upserts, removals = diff_rows(old, new)
+    assert upserts == [row('b', 5), row('d', 4)]
+    assert removals == ['c']
+
+
+def test_diff_rows_treats_nan_as_missing():
+    old = [{'name': 'x', 'profile_url': 'a', 'milestone': math.nan}]
+    new = [{'name': 'x', 'profile_url': 'a', 'milestone': math.nan}]
+    assert diff_rows(old, new) == ([], [])
+    assert clean_row(old[0])['milestone'] is None
+
+
+def test_changes_since_merges_later_changes(tmp_path):
+    feed = ChangeFeed(str(tmp_path / 'changes.json'))
+    feed.record([row('a', 1), row('b', 1)], [])
+    feed.record([row('a', 2)], ['b'])
+    feed.record([row('b', 7)], [])
+
+    upserts, removals = feed.changes_since(1)
+    assert sorted(upserts, key=row_key) == [row('a', 2), row('b', 7)]
+    assert removals == []
+
+    upserts, removals = feed.changes_since(0)
+    assert sorted(upserts, key=row_key) == [row('a', 2), row('b', 7)]
+
+    assert feed.changes_since(3) == ([], [])
+
+
+def test_changes_since_reports_removals_once(tmp_path):
+    feed = ChangeFeed(str(tmp_path / 'changes.json'))
+    feed.record([row('a', 1)], [])
+    feed.record([row('a', 2)], [])
+    feed.record([], ['a'])
+    assert feed.changes_since(1) == ([], ['a'])
+
+
+def test_changes_since_falls_back_when_not_covered(tmp_path):
+    feed = ChangeFeed(str(tmp_path / 'changes.json'), capacity=2)
+    for points in range(4):
+        feed.record([row('a', points)], [])
+    assert feed.generation == 4
+    # Generations 3 and 4 are kept, so clients at 2 or later can catch up
+    assert feed.changes_since(2) == ([row('a', 3)], [])
+    assert feed.changes_since(1) is None
+    # A generation from the future (e.g. after the feed file was reset)
+    assert feed.changes_since(9) is None
+
+
+def test_feed_survives_reload(tmp_path):
+    path = str(tmp_path / 'changes.json')
+    feed = ChangeFeed(path)
+    feed.record([row('a', 1)], [])
+    feed.record([row('a', 2)], [])
+
+    reloaded = ChangeFeed(path)
+    assert reloaded.generation == 2
+    assert reloaded.changes_since(1) == ([row('a', 2)], [])
+    assert reloaded.record([], ['a']) == 3
+
+
+def test_unreadable_feed_starts_empty(tmp_path):
+    path = tmp_path / 'changes.json'
+    path.write_text('{not json')
+    feed = ChangeFeed(str(path))
+    assert feed.generation == 0
+    assert feed.changes_since(0) == ([], [])
+    assert feed.changes_since(5) is None
+
+
+def test_feed_picks_up_publishes_of_other_processes(tmp_path):
+    path = str(tmp_path / 'changes.json')
+    parent = ChangeFeed(path)
+    assert parent.record([row('a', 1)], []) == 1
+
+    # An isolated scrape publishes with its own feed object
+    child = ChangeFeed(path)
+    assert child.record([row('a', 2)], []) == 2
+    assert child.record([row('b', 1)], []) == 3
+
+    assert parent.record([row('a', 5)], []) == 4
+    assert ChangeFeed(path).changes_since(1) == ([row('a', 5), row('b', 1)], [])
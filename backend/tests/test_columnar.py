@@ -0,0 +1,92 @@
+import math
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from columnar import ColumnarTable, csv_source_key, load_columnar, write_columnar
+from cloud_profile_scraper import CSV_COLUMNS, TEST_PROFILE, rows_to_dataframe, write_csv
+
+
+def same(a, b):
+    if isinstance(a, float) and isinstance(b, float) and math.isnan(a) and math.isnan(b):
+        return True
+    return a == b
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    rows = [dict(TEST_PROFILE)]
+    for i in range(50):
+        rows.append({
+            'name': ['Ann', 'Zoë Ünïcode', '李雷', 'Bob, "Quoted"'][i % 4] + f" {i}",
+            'game_badges': i % 7, 'special_game_badges': i % 2, 'trivia_badges': i % 5,
+            'skill_badges': i, 'lab_badges': i % 3, 'arcade_points': i * 2,
+            'milestone': 'Milestone 1' if i % 3 else None,
+            'bonus_points': i % 4, 'total_points': i * 2 + i % 4,
+            'profile_url': f"https://example.com/public_profiles/{i}",
+        })
+    path = str(tmp_path / 'profiles_data.csv')
+    write_csv(rows_to_dataframe(rows), path)
+    return path
+
+
+def test_round_trip_matches_csv(csv_path):
+    expected = pd.read_csv(csv_path)
+    table = load_columnar(csv_path)
+
+    assert table.rows == len(expected)
+    assert table.columns == CSV_COLUMNS
+    for column in expected.columns:
+        values = table.values(column)
+        assert all(same(a, b) for a, b in zip(values, expected[column].tolist())), column
+
+    records = table.records()
+    for got, want in zip(records, expected.to_dict(orient='records')):
+        assert got.keys() == want.keys()
+        assert all(same(got[key], want[key]) for key in want)
+
+
+def test_numeric_columns_are_mapped_arrays(csv_path):
+    table = load_columnar(csv_path)
+    points = table.array('total_points')
+    assert points.dtype == np.int64
+    assert not points.flags.writeable
+    np.testing.assert_array_equal(points, pd.read_csv(csv_path)['total_points'].to_numpy())
+    with pytest.raises(TypeError):
+        table.array('name')
+
+
+def test_rendered_csv_matches_export(csv_path):
+    table = load_columnar(csv_path)
+    with open(csv_path, 'rb') as f:
+        assert table.to_csv_bytes() == f.read()
+
+
+def test_stale_snapshot_is_rebuilt(csv_path, tmp_path):
+    cols_path = str(tmp_path / 'profiles_data.cols')
+    load_columnar(csv_path)
+    assert ColumnarTable(cols_path).source == csv_source_key(csv_path)
+
+    df = pd.read_csv(csv_path).head(3)
+    write_csv(df, csv_path)
+    # Make sure the source key changes even on coarse mtime filesystems
+    os.utime(csv_path, ns=(0, 12345))
+
+    table = load_columnar(csv_path)
+    assert table.rows == 3
+    assert table.source == csv_source_key(csv_path)
+
+
+def test_corrupt_snapshot_is_rebuilt(csv_path, tmp_path):
+    (tmp_path / 'profiles_data.cols').write_bytes(b'not a snapshot')
+    assert load_columnar(csv_path).rows == len(pd.read_csv(csv_path))
+
+
+def test_empty_table(tmp_path):
+    path = str(tmp_path / 'empty.cols')
+    write_columnar(pd.DataFrame(columns=CSV_COLUMNS), path)
+    table = ColumnarTable(path)
+    assert table.rows == 0
+    assert table.records() == []
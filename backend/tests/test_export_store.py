@@ -0,0 +1,67 @@
+import pandas as pd
+import pytest
+
+from changefeed import ChangeFeed, changes_path_for
+from cloud_profile_scraper import TEST_PROFILE, export_store, rows_to_dataframe, write_csv
+from columnar import load_columnar
+from profile_store import ProfileStore
+from scoring import score_rows
+
+URL = "https://example.com/public_profiles/{}"
+
+
+def member(i, game_badges=1):
+    return {
+        'name': f"Member {i}", 'game_badges': game_badges, 'special_game_badges': 0, 'trivia_badges': 0,
+        'skill_badges': 0, 'lab_badges': 0, 'profile_url': URL.format(i),
+    }
+
+
+@pytest.fixture
+def output_file(tmp_path):
+    # A leaderboard published before the profile store was emptied
+    path = str(tmp_path / 'profiles_data.csv')
+    write_csv(rows_to_dataframe([dict(TEST_PROFILE)] + score_rows([member(i) for i in range(5)])), path)
+    return path
+
+
+def published(output_file):
+    rows = pd.read_csv(output_file).to_dict(orient='records')
+    return {row['profile_url']: row for row in rows if isinstance(row['profile_url'], str)}
+
+
+def test_cold_store_keeps_unscraped_roster_members(output_file, tmp_path):
+    store = ProfileStore(str(tmp_path / 'profiles.db'))
+    # The first refresh batch scraped two members; member 4 left the roster
+    store.upsert_rows(score_rows([member(0, game_badges=3), member(1)]))
+    roster = [URL.format(i) for i in range(4)]
+
+    assert export_store(store, output_file, roster_urls=roster)
+
+    rows = published(output_file)
+    assert sorted(rows) == sorted(roster)
+    assert rows[URL.format(0)]['game_badges'] == 3
+    assert rows[URL.format(3)]['game_badges'] == 1
+    # The API snapshot and the change feed match the CSV
+    assert load_columnar(output_file).rows == len(rows) + 1
+    upserts, removals = ChangeFeed(changes_path_for(output_file)).changes_since(0)
+    assert [row['profile_url'] for row in upserts] == [URL.format(0)]
+    assert removals == [URL.format(4)]
+
+
+def test_members_are_carried_until_scraped(output_file, tmp_path):
+    store = ProfileStore(str(tmp_path / 'profiles.db'))
+    roster = [URL.format(i) for i in range(5)]
+    for i in range(5):
+        store.upsert_rows(score_rows([member(i, game_badges=2)]))
+        export_store(store, output_file, roster_urls=roster)
+        rows = published(output_file)
+        assert sorted(rows) == sorted(roster)
+        assert [rows[url]['game_badges'] for url in roster] == [2] * (i + 1) + [1] * (4 - i)
+
+
+def test_without_a_roster_only_stored_rows_are_published(output_file, tmp_path):
+    store = ProfileStore(str(tmp_path / 'profiles.db'))
+    store.upsert_rows(score_rows([member(0)]))
+    export_store(store, output_file)
+    assert sorted(published(output_file)) == [URL.format(0)]
@@ -0,0 +1,203 @@
+import json
+import os
+import threading
+
+import pytest
+
+from conftest import wait_for
+from jobs import Job, JobManager
+
+
+class BlockingRunner:
+    """run_job stand-in that blocks each job until released."""
+
+    def __init__(self, result=True):
+        self.result = result
+        self.started = []
+        self.release = threading.Event()
+
+    def __call__(self, job):
+        self.started.append(job)
+        self.release.wait(5)
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+@pytest.fixture
+def runner():
+    runner = BlockingRunner()
+    yield runner
+    runner.release.set()
+
+
+def test_job_merge_widens_scope_and_keeps_the_lower_rate():
+    job = Job(['a'], rate=2.0)
+    job.merge(['b', 'a'], rate=1.0)
+    assert job.profile_urls == ['a', 'b']
+    assert job.rate == 1.0
+    job.merge(['a'], rate=3.0)
+    assert job.rate == 1.0
+    assert job.covers(['b']) and not job.covers(['c']) and not job.covers(None)
+    job.merge(None)
+    assert job.profile_urls is None and job.covers(['c'])
+    assert job.triggers == 4
+
+
+def test_manual_trigger_keeps_the_refresh_budget(runner):
+    manager = JobManager(runner)
+    manager.submit(['a'])
+    wait_for(lambda: runner.started)
+
+    batch, _ = manager.submit(['b', 'c'], trigger='schedule', rate=1.0)
+    manual, created = manager.submit(['d'])
+    assert manual is batch and not created
+    assert batch.rate == 1.0
+    roster, _ = manager.submit(None)
+    assert roster is batch and batch.profile_urls is None and batch.rate == 1.0
+
+
+def test_rate_stays_default_when_no_request_sets_one():
+    job = Job(['a'])
+    job.merge(['b'])
+    assert job.rate is None
+
+
+def test_requests_covered_by_the_running_job_join_it(runner):
+    manager = JobManager(runner)
+    job, created = manager.submit()
+    assert created
+    wait_for(lambda: runner.started)
+
+    joined, created = manager.submit(['a'])
+    assert joined is job and not created
+    assert job.triggers == 2
+
+
+def test_other_requests_coalesce_into_one_queued_job(runner):
+    manager = JobManager(runner)
+    running, _ = manager.submit(['a'])
+    wait_for(lambda: runner.started)
+
+    queued, created = manager.submit(['b'])
+    assert created and queued is not running
+    again, created = manager.submit(['c'])
+    assert again is queued and not created
+    roster, created = manager.submit(None)
+    assert roster is queued and not created
+    assert queued.profile_urls is None
+
+    runner.release.set()
+    wait_for(lambda: queued.finished)
+    assert [job.id for job in runner.started] == [running.id, queued.id]
+    assert running.status == queued.status == 'succeeded'
+
+
+@pytest.mark.parametrize('result, status', [(False, 'failed'), (None, 'skipped'),
+                                            (RuntimeError('boom'), 'failed')])
+def test_job_outcomes(result, status):
+    runner = BlockingRunner(result)
+    runner.release.set()
+    manager = JobManager(runner)
+    job, _ = manager.submit()
+    wait_for(lambda: job.finished)
+    assert job.status == status
+    if isinstance(result, Exception):
+        assert job.message == 'boom'
+
+
+@pytest.mark.filterwarnings('ignore::pytest.PytestUnhandledThreadExceptionWarning')
+def test_worker_recovers_from_unexpected_errors(tmp_path):
+    runner = BlockingRunner()
+    runner.release.set()
+    manager = JobManager(runner, jobs_dir=str(tmp_path))
+
+    def broken_trim():
+        raise OSError("job file vanished")
+
+    manager._trim = broken_trim
+    job, _ = manager.submit()
+    wait_for(lambda: manager._worker is None)
+    assert manager.running is None
+
+    del manager._trim
+    second, created = manager.submit()
+    assert created
+    wait_for(lambda: second.finished)
+    assert second.status == 'succeeded'
+
+
+def test_trim_tolerates_files_removed_by_other_workers(tmp_path, monkeypatch):
+    manager = JobManager(lambda job: True, jobs_dir=str(tmp_path), history=1)
+    for name in ('aaaaaaaaaaaa', 'bbbbbbbbbbbb', 'cccccccccccc'):
+        (tmp_path / f"{name}.json").write_text('{"status": "succeeded"}')
+
+    real_getmtime = os.path.getmtime
+
+    def racing_getmtime(path):
+        if path.endswith('bbbbbbbbbbbb.json'):
+            os.remove(path)
+        return real_getmtime(path)
+
+    monkeypatch.setattr(os.path, 'getmtime', racing_getmtime)
+    manager._trim()
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_trim_keeps_pending_jobs(tmp_path):
+    runner = BlockingRunner()
+    runner.release.set()
+    follower = JobManager(runner, jobs_dir=str(tmp_path))
+    pending = follower.forward(['a'])
+    os.utime(tmp_path / f"{pending.id}.json", (0, 0))
+
+    manager = JobManager(runner, jobs_dir=str(tmp_path), history=1)
+    for _ in range(3):
+        job, _ = manager.submit()
+        wait_for(lambda: manager._worker is None)
+
+    # The oldest file, but its request has not been claimed yet
+    assert follower.get(pending.id)['status'] == 'queued'
+    assert manager.get(job.id)['status'] == 'succeeded'
+    assert len(os.listdir(tmp_path)) == 3  # pending, last job, requests/
+
+
+def test_status_is_shared_through_the_jobs_dir(tmp_path):
+    runner = BlockingRunner()
+    runner.release.set()
+    manager = JobManager(runner, jobs_dir=str(tmp_path))
+    job, _ = manager.submit(['a'])
+    wait_for(lambda: manager._worker is None)
+
+    other_worker = JobManager(runner, jobs_dir=str(tmp_path))
+    state = other_worker.get(job.id)
+    assert state['status'] == 'succeeded'
+    assert state['profile_urls'] == ['a']
+    assert other_worker.get('../../etc/passwd') is None
+    assert other_worker.get('0123456789ab') is None
+
+
+def test_forwarded_requests_coalesce_on_the_leader(tmp_path, runner):
+    leader = JobManager(runner, jobs_dir=str(tmp_path))
+    follower = JobManager(lambda job: None, jobs_dir=str(tmp_path))
+
+    first = follower.forward(['a'])
+    assert follower.get(first.id)['status'] == 'queued'
+    assert leader.claim_forwarded() == 1
+    wait_for(lambda: runner.started)
+    assert runner.started[0].id == first.id
+
+    second = follower.forward(['b'])
+    third = follower.forward(None, rate=2.0)
+    assert leader.claim_forwarded() == 2
+    assert leader.claim_forwarded() == 0
+
+    # The third request was merged into the job created for the second
+    state = follower.get(third.id)
+    assert state['id'] == second.id
+    assert third.id in state['request_ids']
+    assert state['scope'] == 'roster'
+
+    runner.release.set()
+    wait_for(lambda: json.loads((tmp_path / f"{third.id}.json").read_text())['status'] == 'succeeded')
+    assert follower.get(first.id)['status'] == 'succeeded'
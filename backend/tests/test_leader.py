@@ -0,0 +1,98 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from leader import FileLease, fcntl
+
+pytestmark = pytest.mark.skipif(fcntl is None, reason="needs flock()")
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+def hold_in_child(path, then):
+    """Starts a process that takes the lease, reports it, then runs ``then``."""
+    code = textwrap.dedent(f"""
+        import os, sys, time
+        sys.path.insert(0, {SRC_DIR!r})
+        from leader import FileLease
+        lease = FileLease({path!r})
+        print(lease.acquire(), flush=True)
+        {then}
+    """)
+    child = subprocess.Popen([sys.executable, '-c', code], stdout=subprocess.PIPE, stdin=subprocess.PIPE, text=True)
+    assert child.stdout.readline().strip() == 'True'
+    return child
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'locks' / '.scrape.lock')
+
+
+def test_acquire_and_release(path):
+    lease = FileLease(path)
+    assert lease.acquire() and lease.held
+    assert lease.owner() == os.getpid()
+    # Not re-entrant, also not from another thread of this process
+    assert not lease.acquire()
+    lease.release()
+    assert not lease.held
+    assert lease.acquire()
+    lease.release()
+    lease.release()
+
+
+def test_leases_on_one_file_exclude_each_other(path):
+    first, second = FileLease(path), FileLease(path)
+    assert first.acquire()
+    assert not second.acquire() and not second.held
+    first.release()
+    assert second.acquire()
+    second.release()
+
+
+def test_contention_with_another_process(path):
+    child = hold_in_child(path, "sys.stdin.readline()")
+    try:
+        lease = FileLease(path)
+        assert not lease.acquire()
+        assert lease.owner() == child.pid
+    finally:
+        child.communicate('\n')
+    assert lease.acquire()
+    lease.release()
+
+
+@pytest.mark.parametrize('then', ["os._exit(0)", "os.kill(os.getpid(), 9)"], ids=['exit', 'crash'])
+def test_lease_is_released_when_the_holder_exits(path, then):
+    child = hold_in_child(path, then)
+    child.wait(10)
+    child.stdout.close()
+    child.stdin.close()
+    lease = FileLease(path)
+    assert lease.acquire()
+    lease.release()
+
+
+def test_standalone_scheduler_takes_the_scrape_lease(tmp_path, monkeypatch):
+    import scheduler
+    from leader import SCRAPE_LOCK_NAME
+
+    monkeypatch.setattr(scheduler, 'DATA_DIR', str(tmp_path))
+    runs = []
+    monkeypatch.setattr(scheduler, 'run_scraper', lambda: runs.append(FileLease(lock).acquire()) or True)
+    lock = str(tmp_path / SCRAPE_LOCK_NAME)
+
+    # Held (e.g. by the API's scrape leader): no scrape
+    leader = FileLease(lock)
+    assert leader.acquire()
+    assert scheduler.main() is False and runs == []
+    leader.release()
+
+    # Free: scrapes while holding it, then gives it up
+    assert scheduler.main() is True and runs == [False]
+    assert leader.acquire()
+    leader.release()
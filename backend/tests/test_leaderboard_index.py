@@ -0,0 +1,174 @@
+import math
+
+import pytest
+
+from leaderboard_index import MAX_PAGE_SIZE, LeaderboardIndex, NameIndex, QueryError, member_id_from_url
+
+COLUMNS = ['name', 'profile_url', 'total_points', 'skill_badges', 'milestone']
+PROFILES = 'https://www.cloudskillsboost.google/public_profiles/'
+
+
+def member(name, points, skills, milestone, member_id=None):
+    return {
+        'name': name,
+        'profile_url': PROFILES + (member_id or name.lower().replace(' ', '-')),
+        'total_points': points,
+        'skill_badges': skills,
+        'milestone': milestone,
+    }
+
+
+# Published order: total points descending
+RECORDS = [
+    member('Asha Rao', 40, 3, 'Milestone 2'),
+    dict(member('Test Profile', 35, 9, 'None'), profile_url=None),
+    member('Ben Ode', 30, math.nan, 'Milestone 1'),
+    member('Cara Lim', 30, 5, 'Milestone 2'),
+    member('Dev Shah', 10, 1, 'None'),
+]
+
+
+@pytest.fixture
+def index():
+    return LeaderboardIndex(RECORDS, COLUMNS)
+
+
+def names(page):
+    return [row['name'] for row in page]
+
+
+def test_test_profile_is_not_ranked_or_counted(index):
+    total, page = index.query()
+    assert total == 4
+    assert names(page) == ['Asha Rao', 'Ben Ode', 'Cara Lim', 'Dev Shah']
+    assert [row['rank'] for row in page] == [1, 2, 3, 4]
+
+
+def test_ascending_sort_keeps_ties_in_published_order(index):
+    _, page = index.query(sort='total_points', descending=False)
+    assert names(page) == ['Dev Shah', 'Ben Ode', 'Cara Lim', 'Asha Rao']
+    # Ranks come from the published order, whatever the sort
+    assert [row['rank'] for row in page] == [4, 2, 3, 1]
+
+
+@pytest.mark.parametrize('descending', [True, False])
+def test_rows_without_a_value_sort_last(index, descending):
+    _, page = index.query(sort='skill_badges', descending=descending)
+    assert names(page)[-1] == 'Ben Ode'
+
+
+def test_milestone_filter_counts_only_matching_rows(index):
+    total, page = index.query(milestones=frozenset({'Milestone 2', 'None'}))
+    assert total == 3
+    assert names(page) == ['Asha Rao', 'Cara Lim', 'Dev Shah']
+    assert index.milestones == ['Milestone 1', 'Milestone 2', 'None']
+
+
+@pytest.mark.parametrize('offset, limit, expected', [
+    (0, 2, ['Asha Rao', 'Ben Ode']),
+    (2, 2, ['Cara Lim', 'Dev Shah']),
+    (3, 10, ['Dev Shah']),
+    (4, 2, []),
+    (100, None, []),
+])
+def test_pages(index, offset, limit, expected):
+    total, page = index.query(offset=offset, limit=limit)
+    assert total == 4
+    assert names(page) == expected
+
+
+def test_field_selection(index):
+    _, page = index.query(limit=1, fields=['rank', 'name'])
+    assert page == [{'rank': 1, 'name': 'Asha Rao'}]
+
+
+def test_orderings_are_cached(index):
+    assert index.ordering('name', False) is index.ordering('name', False)
+
+
+def test_parse_query_defaults(index):
+    assert index.parse_query({}) == {
+        'sort': 'total_points', 'descending': True, 'milestones': None,
+        'offset': 0, 'limit': None, 'fields': None,
+    }
+
+
+def test_parse_query(index):
+    query = index.parse_query({'sort': 'name', 'offset': '5', 'limit': '20',
+                               'milestone': 'Milestone 1, None,', 'fields': 'rank, name'})
+    assert query == {
+        'sort': 'name', 'descending': False, 'milestones': frozenset({'Milestone 1', 'None'}),
+        'offset': 5, 'limit': 20, 'fields': ['rank', 'name'],
+    }
+
+
+@pytest.mark.parametrize('args', [
+    {'sort': 'profile_url'},
+    {'limit': 'ten'},
+    {'limit': '0'},
+    {'limit': str(MAX_PAGE_SIZE + 1)},
+    {'offset': '-1'},
+    {'fields': 'name,password'},
+])
+def test_parse_query_rejects_invalid_parameters(index, args):
+    with pytest.raises(QueryError):
+        index.parse_query(args)
+
+
+@pytest.mark.parametrize('url, member_id', [
+    (PROFILES + 'abc-123', 'abc-123'),
+    (PROFILES + 'abc-123/', 'abc-123'),
+    (PROFILES + 'abc-123?utm_source=x', 'abc-123'),
+    (None, None),
+    ('', None),
+])
+def test_member_id_from_url(url, member_id):
+    assert member_id_from_url(url) == member_id
+
+
+def test_member_lookup_with_neighbors(index):
+    standing = index.member('ben-ode', neighbors=1)
+    assert standing['rank'] == 2 and standing['total'] == 4
+    assert standing['breakdown']['total_points'] == 30
+    assert [row['name'] for row in standing['above']] == ['Asha Rao']
+    assert [row['name'] for row in standing['below']] == ['Cara Lim']
+    assert standing['below'][0] == {'rank': 3, 'member_id': 'cara-lim', 'name': 'Cara Lim',
+                                    'total_points': 30, 'milestone': 'Milestone 2'}
+
+
+def test_member_lookup_at_the_edges(index):
+    assert index.member('asha-rao')['above'] == []
+    assert [row['name'] for row in index.member('dev-shah', neighbors=5)['above']] == ['Asha Rao', 'Ben Ode', 'Cara Lim']
+    assert index.member('dev-shah')['below'] == []
+    assert index.member('nobody') is None
+
+
+def test_duplicate_member_ids_resolve_to_the_best_rank():
+    index = LeaderboardIndex([member('First', 20, 1, 'None', 'same'), member('Second', 10, 1, 'None', 'same')], COLUMNS)
+    assert index.member('same')['member']['name'] == 'First'
+
+
+def test_search_ranks_name_prefix_then_word_prefix_then_substring():
+    names = ['Sam Rivers', 'Anna Samson', 'Rosamund Pike', 'Samira Khan', 'Bob Smith']
+    # Ties keep the published order
+    assert NameIndex(names).search('sam') == [0, 3, 1, 2]
+
+
+def test_search_is_case_and_whitespace_insensitive():
+    index = NameIndex(['Mary  Ann Lee', 'mary ann', None])
+    assert index.search('  MARY ann ') == [0, 1]
+    assert index.search('ann l') == [0]
+    assert index.search('') == []
+
+
+def test_short_queries_only_match_prefixes():
+    index = NameIndex(['Al Green', 'Sal Mineo'])
+    assert index.search('al') == [0]
+    assert index.search('xyz') == []
+
+
+def test_search_skips_the_test_profile_and_applies_the_limit(index):
+    assert index.search('test profile') == []
+    # 'Dev Shah' has a word starting with the query, 'Asha Rao' only contains it
+    assert [result['name'] for result in index.search('sha')] == ['Dev Shah', 'Asha Rao']
+    assert [result['name'] for result in index.search('sha', limit=1)] == ['Dev Shah']
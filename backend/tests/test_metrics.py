@@ -0,0 +1,137 @@
+import math
+import os
+
+import pytest
+
+from metrics import CycleMetrics, ScrapeMetrics, quantile
+
+
+@pytest.mark.parametrize('q, expected', [(0, 1), (0.5, 5), (0.9, 9), (0.99, 10), (1, 10)])
+def test_quantile_uses_the_nearest_rank(q, expected):
+    assert quantile(list(range(1, 11)), q) == expected
+
+
+def test_quantile_of_nothing_is_nan():
+    assert math.isnan(quantile([], 0.5))
+
+
+def test_nested_cycles_join_the_outer_one():
+    metrics = ScrapeMetrics()
+    with metrics.cycle() as outer:
+        metrics.observe('fetch', 0.1)
+        with metrics.cycle() as inner:
+            assert inner is outer
+            metrics.observe('fetch', 0.3)
+            metrics.increment('profiles_parsed', 2)
+        assert metrics.last_cycle is None and metrics.in_cycle()
+    assert not metrics.in_cycle()
+    assert metrics.last_cycle is outer and outer.success
+    assert outer.samples == {'fetch': [0.1, 0.3]}
+    assert metrics.cycles_total == 1 and metrics.totals == {'profiles_parsed': 2}
+
+
+def test_failed_cycles_are_counted():
+    metrics = ScrapeMetrics()
+    with metrics.cycle() as cycle:
+        cycle.success = False
+    with pytest.raises(RuntimeError):
+        with metrics.cycle():
+            raise RuntimeError("boom")
+    assert metrics.cycles_total == 2 and metrics.cycles_failed == 2
+    assert metrics.last_cycle.success is False
+
+
+def test_samples_outside_a_cycle_are_dropped():
+    metrics = ScrapeMetrics()
+    metrics.observe('fetch', 5.0)
+    metrics.increment('profiles_failed')
+    with metrics.cycle() as cycle:
+        metrics.observe('fetch', 0.2)
+    assert cycle.samples == {'fetch': [0.2]}
+    assert cycle.counters == {} and metrics.totals == {}
+
+
+def test_summary_aggregates_every_stage():
+    cycle = CycleMetrics()
+    cycle.samples = {'parse': [0.3, 0.1, 0.2]}
+    stats = cycle.summary()['parse']
+    assert stats['count'] == 3 and stats['max'] == 0.3 and stats[0.5] == 0.2
+    assert stats['sum'] == pytest.approx(0.6)
+
+
+def test_render_prometheus():
+    metrics = ScrapeMetrics()
+    assert 'scraper_cycles_total 0' in metrics.render_prometheus()
+    assert 'scraper_last_cycle_success' not in metrics.render_prometheus()
+
+    with metrics.cycle():
+        metrics.observe('fetch', 0.25)
+        metrics.observe('fetch_bytes', 2048)
+        metrics.increment('profiles_parsed')
+    text = metrics.render_prometheus()
+    lines = text.splitlines()
+    assert text.endswith('\n')
+    assert 'scraper_cycles_total 1' in lines
+    assert 'scraper_cycle_in_progress 0' in lines
+    assert 'scraper_profiles_parsed_total 1' in lines
+    assert 'scraper_last_cycle_success 1' in lines
+    assert 'scraper_stage_seconds{stage="fetch",quantile="0.5"} 0.25' in lines
+    assert 'scraper_stage_seconds_count{stage="fetch"} 1' in lines
+    assert 'scraper_stage_bytes_sum{stage="fetch_bytes"} 2048' in lines
+    assert 'scraper_last_cycle_profiles_parsed 1' in lines
+    # Every sample belongs to a declared metric
+    declared = {line.split()[2] for line in lines if line.startswith('# TYPE')}
+    for line in lines:
+        if not line.startswith('#'):
+            name = line.split('{')[0].split()[0]
+            assert name in declared or name.rsplit('_', 1)[0] in declared, line
+
+
+def test_followers_report_the_saved_cycle(tmp_path):
+    path = str(tmp_path / 'scrape_metrics.json')
+    leader, follower = ScrapeMetrics(), ScrapeMetrics()
+    assert not follower.load_last_cycle(path)
+
+    with leader.cycle():
+        leader.observe('fetch', 0.5)
+        leader.increment('profiles_parsed', 3)
+    leader.save_last_cycle(path)
+
+    assert follower.load_last_cycle(path)
+    assert 'scraper_last_cycle_profiles_parsed 3' in follower.render_prometheus()
+    assert 'scraper_stage_seconds_count{stage="fetch"} 1' in follower.render_prometheus()
+    # Unchanged file: not read again
+    assert not follower.load_last_cycle(path)
+
+    # The follower's own, newer cycle wins over an older saved one
+    with follower.cycle():
+        follower.observe('fetch', 0.1)
+    os.utime(path, ns=(0, 0))
+    assert not follower.load_last_cycle(path)
+    assert follower.last_cycle.samples == {'fetch': [0.1]}
+
+
+def test_child_cycle_is_absorbed_into_the_open_cycle(tmp_path):
+    path = str(tmp_path / 'child.json')
+    child = ScrapeMetrics()
+    with child.cycle():
+        child.observe('fetch', 0.4)
+        child.increment('profiles_parsed', 2)
+    child.save_last_cycle(path)
+
+    parent = ScrapeMetrics()
+    assert not parent.absorb_cycle(path)
+    with parent.cycle() as cycle:
+        assert parent.absorb_cycle(path)
+        parent.observe('publish', 0.01)
+    assert cycle.samples == {'fetch': [0.4], 'publish': [0.01]}
+    assert cycle.counters == {'profiles_parsed': 2} and parent.totals == {'profiles_parsed': 2}
+
+
+def test_unreadable_saved_cycles_are_ignored(tmp_path):
+    path = tmp_path / 'scrape_metrics.json'
+    path.write_text('not json')
+    metrics = ScrapeMetrics()
+    assert not metrics.load_last_cycle(str(path))
+    with metrics.cycle():
+        assert not metrics.absorb_cycle(str(path))
@@ -0,0 +1,49 @@
+from profile_cache import ProfileCache, badge_section_digest
+
+URL = "https://example.com/public_profiles/a"
+
+
+def test_save_writes_only_changed_entries(tmp_path):
+    cache = ProfileCache(str(tmp_path / 'cache.db'))
+    cache.update(URL, etag='"v1"', profile_data={'name': 'Ann'})
+    cache.set_row(URL, {'total_points': 3})
+    assert cache.save() == 1
+    assert cache.save() == 0
+    cache.update(URL, etag='"v1"')
+    assert cache.save() == 0
+
+    reloaded = ProfileCache(str(tmp_path / 'cache.db'))
+    assert reloaded.get_row(URL) == {'total_points': 3}
+    assert reloaded.conditional_headers(URL) == {'If-None-Match': '"v1"'}
+
+
+def test_new_profile_data_drops_the_row(tmp_path):
+    cache = ProfileCache(str(tmp_path / 'cache.db'))
+    cache.update(URL, profile_data={'name': 'Ann'})
+    cache.set_row(URL, {'total_points': 3})
+    cache.update(URL, profile_data={'name': 'Ann', 'badges': 1})
+    assert cache.get_row(URL) is None
+
+
+def test_saves_of_other_processes_are_reloaded(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    parent = ProfileCache(path)
+    parent.update(URL, etag='"v1"', profile_data={'name': 'Ann'})
+    parent.save()
+    assert not parent.reload_if_changed()
+
+    # An isolated scrape refreshed the profile with its own cache object
+    child = ProfileCache(path)
+    child.update(URL, etag='"v2"', profile_data={'name': 'Ann B.'})
+    child.save()
+
+    assert parent.reload_if_changed()
+    assert parent.get(URL)['etag'] == '"v2"'
+    assert not parent.reload_if_changed()
+
+
+def test_digest_ignores_noise_outside_the_badge_section():
+    page = '<script>{token}</script><div class="public-profile__hero">Ann</div>' \
+           '<div class="profile-badge"><span class="ql-caption">Badge</span></div><footer>{token}</footer>'
+    assert badge_section_digest(page.format(token='a')) == badge_section_digest(page.format(token='b'))
+    assert badge_section_digest(page.format(token='a')) != badge_section_digest(page.replace('Ann', 'Bob'))
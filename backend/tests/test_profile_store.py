@@ -0,0 +1,92 @@
+import pytest
+
+from profile_store import ProfileStore, ROW_COLUMNS
+
+
+def make_row(url, name='Member', points=10, **counts):
+    row = {column: 0 for column in ROW_COLUMNS}
+    row.update(name=name, milestone='Milestone 1', total_points=points, profile_url=url)
+    row.update(counts)
+    return row
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ProfileStore(str(tmp_path / 'profiles.db'))
+
+
+def test_upsert_counts_only_changed_rows(store):
+    rows = [make_row('https://example.com/a', 'Ann'), make_row('https://example.com/b', 'Bob')]
+    assert store.upsert_rows(rows, scraped_at=1000) == 2
+    assert store.upsert_rows(rows, scraped_at=2000) == 0
+    assert store.upsert_rows([make_row('https://example.com/a', 'Ann', points=12)], scraped_at=3000) == 1
+    assert store.get_row('https://example.com/a')['total_points'] == 12
+
+
+def test_rows_without_url_are_ignored(store):
+    assert store.upsert_rows([make_row(None)]) == 0
+    assert store.fetch_rows() == []
+
+
+def test_generation_moves_only_on_changes(store):
+    assert store.generation() == 0
+    store.upsert_rows([make_row('https://example.com/a')], scraped_at=1000)
+    assert store.generation() == 1
+    store.upsert_rows([make_row('https://example.com/a')], scraped_at=2000)
+    assert store.generation() == 1
+    store.prune(['https://example.com/other'])
+    assert store.generation() == 2
+    assert store.prune(['https://example.com/other']) == 0
+    assert store.generation() == 2
+
+
+def test_unchanged_scrape_bumps_last_scraped_only(store):
+    store.upsert_rows([make_row('https://example.com/a')], scraped_at=1000)
+    store.upsert_rows([make_row('https://example.com/a')], scraped_at=2000)
+    activity = store.fetch_activity()['https://example.com/a']
+    assert activity['last_scraped'] == 2000
+    assert activity['last_changed'] == 1000
+
+
+def test_rescored_rows_keep_their_activity(store):
+    store.upsert_rows([make_row('https://example.com/a')], scraped_at=1000)
+    store.upsert_rows([make_row('https://example.com/a', points=20)], scraped_at=5000, touch=False)
+    activity = store.fetch_activity()['https://example.com/a']
+    assert (activity['last_scraped'], activity['last_changed']) == (1000, 1000)
+    assert store.get_row('https://example.com/a')['total_points'] == 20
+
+
+def test_velocity_tracks_badges_per_day(store):
+    url = 'https://example.com/a'
+    store.upsert_rows([make_row(url, game_badges=1)], scraped_at=1000)
+    store.upsert_rows([make_row(url, game_badges=3)], scraped_at=1000 + 86400)
+    # Two badges in one day, smoothed against the initial 0
+    assert store.fetch_activity()[url]['velocity'] == pytest.approx(1.0)
+
+
+def test_needs_export_follows_generation(store, tmp_path):
+    output = tmp_path / 'profiles_data.csv'
+    assert store.needs_export(str(output))
+    output.write_text('name\n')
+    store.upsert_rows([make_row('https://example.com/a')])
+    assert store.needs_export(str(output))
+    store.mark_exported(store.generation())
+    assert not store.needs_export(str(output))
+    store.upsert_rows([make_row('https://example.com/a', points=99)])
+    assert store.needs_export(str(output))
+
+
+def test_prune_respects_scope(store):
+    store.upsert_rows([make_row('https://example.com/a'), make_row('https://example.com/b')])
+    removed = store.prune([], scope=lambda url: url.endswith('/a'))
+    assert removed == 1
+    assert [row['profile_url'] for row in store.fetch_rows()] == ['https://example.com/b']
+
+
+def test_fetch_rows_orders_by_points(store):
+    store.upsert_rows([
+        make_row('https://example.com/a', 'Ann', points=5),
+        make_row('https://example.com/b', 'Bob', points=30),
+        make_row('https://example.com/c', 'Cat', points=30),
+    ])
+    assert [row['name'] for row in store.fetch_rows()] == ['Bob', 'Cat', 'Ann']
@@ -0,0 +1,178 @@
+import random
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import requests
+
+from rate_limiter import (
+    MAX_RETRY_AFTER, MIN_RETRY_BUDGET, AdaptiveConcurrency, HostLimiter, RetryBudget, TokenBucket,
+    backoff_delay, burst_for_rate, parse_retry_after
+)
+
+
+class FakeClock:
+    """Monotonic clock that only moves when something sleeps."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeResponse:
+    def __init__(self, status_code, retry_after=None):
+        self.status_code = status_code
+        self.headers = {'Retry-After': retry_after} if retry_after is not None else {}
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSession:
+    """Replays scripted responses (or exceptions), one per request."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.requests = 0
+
+    def get(self, url, **kwargs):
+        self.requests += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return FakeResponse(*outcome) if isinstance(outcome, tuple) else FakeResponse(outcome)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def limiter(clock, max_retries=3, budget=None, rate=100):
+    return HostLimiter(4, rate=rate, max_retries=max_retries, budget=budget, clock=clock, sleep=clock.sleep)
+
+
+@pytest.mark.parametrize('rate, burst', [(0.5, 1), (1, 1), (3.7, 3), (8, 8), (100, 8)])
+def test_burst_is_one_second_of_the_rate(rate, burst):
+    assert burst_for_rate(rate) == burst
+    assert TokenBucket(rate).capacity == burst
+
+
+def test_bucket_allows_a_burst_then_paces(clock):
+    bucket = TokenBucket(rate=2, capacity=2, clock=clock, sleep=clock.sleep)
+    for _ in range(5):
+        bucket.acquire()
+    assert clock.now == pytest.approx(1.5)
+
+
+def test_budgeted_rate_is_spread_over_the_minute(clock):
+    # A refresh batch of 60 profiles at the default budget of 60 per minute
+    bucket = TokenBucket(rate=1, clock=clock, sleep=clock.sleep)
+    starts = []
+    for _ in range(60):
+        bucket.acquire()
+        starts.append(clock.now)
+    assert starts[:3] == pytest.approx([0, 1, 2])
+    assert starts[-1] == pytest.approx(59)
+
+
+def test_pause_drains_the_bucket(clock):
+    bucket = TokenBucket(rate=10, capacity=5, clock=clock, sleep=clock.sleep)
+    bucket.pause(3)
+    bucket.acquire()
+    assert clock.now == pytest.approx(3.1)
+
+
+def test_concurrency_is_halved_on_throttling_and_grows_back(clock):
+    concurrency = AdaptiveConcurrency(8, clock=clock)
+    concurrency.on_throttle()
+    assert concurrency.limit == 4
+    # One burst of 429s counts once
+    concurrency.on_throttle()
+    assert concurrency.limit == 4
+    clock.now += 1
+    concurrency.on_throttle()
+    clock.now += 1
+    concurrency.on_throttle()
+    clock.now += 1
+    concurrency.on_throttle()
+    assert concurrency.limit == 1
+    for _ in range(100):
+        concurrency.on_success()
+    assert concurrency.limit == 8
+
+
+def test_retry_budget(clock):
+    assert RetryBudget.for_cycle(10).remaining == MIN_RETRY_BUDGET
+    assert RetryBudget.for_cycle(1000).remaining == 200
+    budget = RetryBudget(1)
+    assert budget.try_spend() and not budget.try_spend()
+
+
+def test_parse_retry_after():
+    assert parse_retry_after('5') == 5.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('soon') is None
+    later = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert 25 <= parse_retry_after(later) <= 30
+    earlier = format_datetime(datetime.now(timezone.utc) - timedelta(seconds=30), usegmt=True)
+    assert parse_retry_after(earlier) == 0
+
+
+def test_backoff_is_jittered_and_capped():
+    random.seed(1)
+    for attempt in range(10):
+        assert 0 <= backoff_delay(attempt, base=0.5, cap=4) <= min(4, 0.5 * 2 ** attempt)
+
+
+def test_success_is_returned_at_once(clock):
+    session = FakeSession(200)
+    assert limiter(clock).get(session, 'https://example.com/a').status_code == 200
+    assert session.requests == 1 and clock.sleeps == []
+
+
+def test_retry_after_pauses_the_host(clock):
+    host = limiter(clock)
+    session = FakeSession((429, '2'), 200)
+    assert host.get(session, 'https://example.com/a').status_code == 200
+    assert session.requests == 2
+    assert clock.now >= 2
+    # Halved by the 429, then raised by 1/limit on the retry's success
+    assert host.concurrency.limit == 2.5
+
+
+def test_transient_errors_back_off_until_retries_run_out(clock):
+    session = FakeSession(500, 502, 503, 504)
+    response = limiter(clock, max_retries=3).get(session, 'https://example.com/a')
+    assert response.status_code == 504
+    assert session.requests == 4 and len(clock.sleeps) == 3
+
+
+def test_long_retry_after_gives_up(clock):
+    session = FakeSession((429, str(MAX_RETRY_AFTER + 1)), 200)
+    assert limiter(clock).get(session, 'https://example.com/a').status_code == 429
+    assert session.requests == 1
+
+
+def test_shared_retry_budget_limits_retries(clock):
+    budget = RetryBudget(1)
+    host = limiter(clock, budget=budget)
+    assert host.get(FakeSession(500, 200), 'https://example.com/a').status_code == 200
+    session = FakeSession(500, 200)
+    assert host.get(session, 'https://example.com/b').status_code == 500
+    assert session.requests == 1
+
+
+def test_connection_errors_are_retried_then_raised(clock):
+    error = requests.exceptions.ConnectionError("reset")
+    assert limiter(clock).get(FakeSession(error, 200), 'https://example.com/a').status_code == 200
+    with pytest.raises(requests.exceptions.ConnectionError):
+        limiter(clock, max_retries=1).get(FakeSession(error, error), 'https://example.com/a')
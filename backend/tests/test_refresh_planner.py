@@ -0,0 +1,92 @@
+import pytest
+
+from refresh_planner import (
+    ACTIVE_INTERVAL, ACTIVE_WINDOW, DORMANT_INTERVAL, VELOCITY_HALF_LIFE_DAYS, WARM_INTERVAL,
+    WARM_WINDOW, RefreshPlanner, activity_tier, effective_velocity
+)
+
+NOW = 1_700_000_000.0
+DAY = 86400
+
+
+def activity(scraped_ago, changed_ago, velocity=0.0):
+    return {'last_scraped': NOW - scraped_ago, 'last_changed': NOW - changed_ago, 'velocity': velocity}
+
+
+@pytest.mark.parametrize('state, tier', [
+    (None, 'new'),
+    ({'last_scraped': None, 'last_changed': None, 'velocity': 0.0}, 'new'),
+    (activity(60, 3600), 'active'),
+    (activity(60, ACTIVE_WINDOW), 'active'),
+    (activity(60, 2 * DAY, velocity=5.0), 'active'),
+    (activity(60, 2 * DAY, velocity=0.5), 'warm'),
+    (activity(60, WARM_WINDOW), 'warm'),
+    (activity(60, WARM_WINDOW + 1), 'dormant'),
+    # A fast member who went quiet decays to dormant
+    (activity(60, 30 * DAY, velocity=5.0), 'dormant'),
+])
+def test_activity_tier(state, tier):
+    assert activity_tier(state, NOW) == tier
+
+
+def test_velocity_halves_every_half_life():
+    state = activity(0, VELOCITY_HALF_LIFE_DAYS * DAY, velocity=4.0)
+    assert effective_velocity(state, NOW) == pytest.approx(2.0)
+    assert effective_velocity(None, NOW) == 0.0
+
+
+@pytest.mark.parametrize('budget, tick, size', [(60, 60, 60), (60, 10, 10), (120, 15, 30), (5, 1, 1), (0, 60, 1)])
+def test_batch_size_spends_the_tick_share_of_the_budget(budget, tick, size):
+    assert RefreshPlanner(budget).batch_size(tick) == size
+
+
+def test_rate_spreads_the_budget_over_a_minute():
+    assert RefreshPlanner(120).rate == 2.0
+
+
+def test_plan_picks_due_profiles_new_first_then_most_overdue():
+    roster = ['active-due', 'warm-due', 'new', 'dormant-due', 'active-fresh', 'dormant-fresh']
+    states = {
+        'active-due': activity(2 * ACTIVE_INTERVAL, 3600),
+        'warm-due': activity(3 * WARM_INTERVAL, 3 * DAY),
+        'dormant-due': activity(1.5 * DORMANT_INTERVAL, 30 * DAY),
+        'active-fresh': activity(ACTIVE_INTERVAL / 2, 3600),
+        'dormant-fresh': activity(DORMANT_INTERVAL / 2, 30 * DAY),
+    }
+    planner = RefreshPlanner()
+    assert planner.plan(roster, states, limit=10, now=NOW) == ['new', 'warm-due', 'active-due', 'dormant-due']
+
+
+def test_plan_respects_the_limit():
+    roster = [f"p{i}" for i in range(10)]
+    states = {url: activity((i + 1) * DORMANT_INTERVAL, 30 * DAY) for i, url in enumerate(roster)}
+    planner = RefreshPlanner()
+    assert planner.plan(roster, states, limit=3, now=NOW) == ['p9', 'p8', 'p7']
+
+
+def test_planned_profiles_wait_an_interval_before_the_next_plan():
+    roster = ['a', 'b']
+    states = {'b': activity(2 * DORMANT_INTERVAL, 30 * DAY)}
+    planner = RefreshPlanner()
+    assert planner.plan(roster, states, limit=10, now=NOW) == ['a', 'b']
+    # Neither was scraped (e.g. the fetch failed), but both were attempted
+    assert planner.plan(roster, states, limit=10, now=NOW + 60) == []
+    assert planner.plan(roster, states, limit=10, now=NOW + ACTIVE_INTERVAL) == ['a']
+    assert planner.plan(roster, states, limit=10, now=NOW + DORMANT_INTERVAL) == ['a', 'b']
+
+
+def test_attempts_are_forgotten_for_profiles_off_the_roster():
+    planner = RefreshPlanner()
+    planner.plan(['a', 'b'], {}, limit=10, now=NOW)
+    planner.plan(['a'], {}, limit=10, now=NOW + 60)
+    assert set(planner.attempts) == {'a'}
+
+
+def test_tier_counts():
+    roster = ['new', 'active', 'warm', 'dormant']
+    states = {
+        'active': activity(60, 3600),
+        'warm': activity(60, 3 * DAY),
+        'dormant': activity(60, 30 * DAY),
+    }
+    assert RefreshPlanner().tier_counts(roster, states, now=NOW) == {'new': 1, 'active': 1, 'warm': 1, 'dormant': 1}
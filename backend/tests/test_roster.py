@@ -0,0 +1,70 @@
+import pytest
+
+from roster import in_shard, iter_roster, load_roster, parse_shard, shard_of
+
+URLS = [f"https://www.cloudskillsboost.google/public_profiles/{n:04d}" for n in range(400)]
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+def test_csv_roster_reads_the_url_column_and_skips_duplicates(tmp_path):
+    path = write(tmp_path, 'roster.csv', "name,profile_url\nA,https://a\nB, https://b \nA again,https://a\nC,\n")
+    assert list(iter_roster(path)) == ['https://a', 'https://b']
+
+
+def test_headerless_csv_roster_starts_at_the_first_line(tmp_path):
+    path = write(tmp_path, 'roster.csv', "https://a\nhttps://b\n")
+    assert list(iter_roster(path)) == ['https://a', 'https://b']
+
+
+def test_jsonl_roster_accepts_objects_and_strings(tmp_path):
+    path = write(tmp_path, 'roster.jsonl',
+                 '{"profile_url": "https://a"}\n"https://b"\nnot json\n\n{"url": "https://c"}\n')
+    assert list(iter_roster(path)) == ['https://a', 'https://b', 'https://c']
+
+
+def test_text_roster_strips_comments(tmp_path):
+    path = write(tmp_path, 'roster.txt', "# members\nhttps://a  # lead\n\nhttps://b\n")
+    assert list(iter_roster(path)) == ['https://a', 'https://b']
+
+
+@pytest.mark.parametrize('spec, shard', [('0/1', (0, 1)), ('3/4', (3, 4))])
+def test_parse_shard(spec, shard):
+    assert parse_shard(spec) == shard
+
+
+@pytest.mark.parametrize('spec', ['4/4', '-1/4', '0/0', '1', 'a/b'])
+def test_parse_shard_rejects_invalid_specs(spec):
+    with pytest.raises(ValueError):
+        parse_shard(spec)
+
+
+def test_shards_partition_the_roster(tmp_path):
+    path = write(tmp_path, 'roster.txt', '\n'.join(URLS))
+    shards = [load_roster(path, (index, 4)) for index in range(4)]
+    assert sorted(url for shard in shards for url in shard) == sorted(URLS)
+    # Hashing spreads the members over every shard
+    assert all(len(shard) > 50 for shard in shards)
+    assert load_roster(path) == URLS
+
+
+def test_shard_assignment_does_not_depend_on_roster_order_or_size(tmp_path):
+    full = write(tmp_path, 'full.txt', '\n'.join(URLS))
+    # Reversed, with members removed and others added
+    changed = write(tmp_path, 'changed.txt', '\n'.join(URLS[::-1][100:] + ['https://new/1', 'https://new/2']))
+    before = set(load_roster(full, (1, 4)))
+    after = set(load_roster(changed, (1, 4)))
+    kept = set(URLS[:300])
+    assert before & kept == after & kept
+
+
+def test_shard_of_is_stable():
+    # Pinned so a change to the hash (which would reshuffle every worker's
+    # members) is noticed
+    assert [shard_of(url, 4) for url in URLS[:8]] == [3, 1, 0, 0, 1, 1, 0, 3]
+    assert all(in_shard(url, None) for url in URLS[:8])
+    assert all(in_shard(url, (shard_of(url, 7), 7)) for url in URLS[:8])
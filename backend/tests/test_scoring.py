@@ -0,0 +1,87 @@
+import itertools
+import random
+
+import pandas as pd
+import pytest
+
+from scoring import COUNT_COLUMNS, MILESTONES, NO_MILESTONE, REQUIREMENT_COLUMNS, score_cohort, score_rows
+
+
+def per_row_score(badge_counts):
+    # Reference: how the scraper scored each profile before batch scoring
+    def count(column):
+        return badge_counts.get(column, 0)
+
+    arcade_points = (count('game_badges') + count('trivia_badges')
+                     + count('skill_badges') // 2 + count('special_game_badges') * 2)
+    milestone, bonus_points = NO_MILESTONE, 0
+    for tier in reversed(MILESTONES):
+        if all(count(column) >= required for column, required in tier['requirements'].items()):
+            milestone, bonus_points = tier['name'], tier['points']['bonus']
+            break
+    return {
+        'arcade_points': arcade_points,
+        'milestone': milestone,
+        'bonus_points': bonus_points,
+        'total_points': arcade_points + bonus_points,
+    }
+
+
+def boundary_counts():
+    """Counts at, just below and just above every milestone requirement."""
+    rows = [dict.fromkeys(COUNT_COLUMNS, 0)]
+    for milestone in MILESTONES:
+        requirements = milestone['requirements']
+        rows.append(dict(requirements, special_game_badges=1))
+        for column in REQUIREMENT_COLUMNS:
+            for delta in (-1, 1):
+                rows.append(dict(requirements, special_game_badges=3, **{column: requirements[column] + delta}))
+    return rows
+
+
+def random_counts(size, seed=0):
+    rng = random.Random(seed)
+    return [{column: rng.randint(0, 50) for column in COUNT_COLUMNS} for _ in range(size)]
+
+
+@pytest.mark.parametrize('rows', [boundary_counts(), random_counts(2000)], ids=['boundaries', 'random'])
+def test_score_rows_matches_the_per_row_path(rows):
+    scored = score_rows(rows)
+    assert len(scored) == len(rows)
+    for row, result in zip(rows, scored):
+        expected = per_row_score(row)
+        actual = {column: result[column] for column in expected}
+        assert actual == expected, row
+        assert {column: result[column] for column in COUNT_COLUMNS} == row
+
+
+def test_every_milestone_is_reachable():
+    milestones = {row['milestone'] for row in score_rows(boundary_counts())}
+    assert milestones == {milestone['name'] for milestone in MILESTONES} | {NO_MILESTONE}
+
+
+def test_small_grid_matches_the_per_row_path():
+    grid = [
+        dict(zip(COUNT_COLUMNS, values))
+        for values in itertools.product((0, 4, 10), (0, 4, 8), (0, 9, 10, 44), (0, 4, 16), (0, 2))
+    ]
+    for row, result in zip(grid, score_rows(grid)):
+        assert result['total_points'] == per_row_score(row)['total_points'], row
+
+
+def test_missing_and_non_numeric_counts_score_as_zero():
+    rows = [{'game_badges': 4}, {'game_badges': 'n/a', 'trivia_badges': None, 'skill_badges': 3}]
+    scored = score_rows(rows)
+    assert scored[0]['arcade_points'] == 4 and scored[0]['milestone'] == NO_MILESTONE
+    assert scored[1]['arcade_points'] == 1 and scored[1]['total_points'] == 1
+
+
+def test_score_cohort_keeps_the_dataframe_index():
+    frame = pd.DataFrame(random_counts(5), index=[10, 11, 12, 13, 14])
+    scores = score_cohort(frame)
+    assert list(scores.index) == [10, 11, 12, 13, 14]
+    assert list(scores.columns) == ['arcade_points', 'milestone', 'bonus_points', 'total_points']
+
+
+def test_no_rows():
+    assert score_rows([]) == []
@@ -0,0 +1,120 @@
+import threading
+import time
+
+import pytest
+
+from conftest import wait_for
+from timer_scheduler import TimerScheduler
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = TimerScheduler(max_workers=2)
+    yield scheduler
+    scheduler.stop()
+
+
+class SlowTask:
+    """Task whose first run blocks until released."""
+
+    def __init__(self):
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+
+
+def fire(scheduler, task, times):
+    # Fires the task as the timer loop would, without waiting for its interval
+    for _ in range(times):
+        with scheduler._condition:
+            scheduler._fire(task)
+
+
+@pytest.mark.parametrize('overlap, expected_runs, expected_skipped', [
+    ('skip', 1, 3),
+    ('queue', 4, 0),
+    ('coalesce', 2, 0),
+])
+def test_overlap_policies(scheduler, overlap, expected_runs, expected_skipped):
+    slow = SlowTask()
+    task = scheduler.every(3600, slow, name='slow', overlap=overlap)
+    fire(scheduler, task, 1)
+    assert slow.started.wait(5)
+
+    # Three firings while the first run is still going
+    fire(scheduler, task, 3)
+    slow.release.set()
+    wait_for(lambda: not task.running)
+
+    assert task.runs == slow.calls == expected_runs
+    assert task.skipped == expected_skipped
+    assert task.pending == 0
+
+
+def test_tasks_fire_on_their_interval(scheduler):
+    calls = []
+    scheduler.every(0.05, lambda: calls.append(time.monotonic()), name='tick', run_now=True)
+    scheduler.start()
+    wait_for(lambda: len(calls) >= 4)
+    scheduler.stop()
+
+    # run_now fires at once; later firings follow whole intervals
+    gaps = [later - earlier for earlier, later in zip(calls, calls[1:])]
+    assert all(gap > 0.02 for gap in gaps)
+    count = len(calls)
+    time.sleep(0.15)
+    assert len(calls) == count
+
+
+def test_a_slow_task_does_not_delay_the_others(scheduler):
+    slow = SlowTask()
+    ticks = []
+    scheduler.every(0.05, slow, name='slow', run_now=True)
+    scheduler.every(0.05, lambda: ticks.append(1), name='tick')
+    scheduler.start()
+    assert slow.started.wait(5)
+    wait_for(lambda: len(ticks) >= 3)
+    slow_task = scheduler.tasks[0]
+    assert slow_task.runs == 0 and slow_task.skipped >= 2
+    slow.release.set()
+
+
+def test_failures_are_counted_and_do_not_stop_the_task(scheduler):
+    def broken():
+        raise RuntimeError("boom")
+
+    task = scheduler.every(3600, broken)
+    fire(scheduler, task, 1)
+    wait_for(lambda: task.runs == 1 and not task.running)
+    fire(scheduler, task, 1)
+    wait_for(lambda: task.runs == 2 and not task.running)
+    assert task.failures == 2
+
+
+def test_invalid_tasks_are_rejected(scheduler):
+    with pytest.raises(ValueError):
+        scheduler.every(1, lambda: None, overlap='parallel')
+    with pytest.raises(ValueError):
+        scheduler.every(0, lambda: None)
+    assert scheduler.tasks == []
+
+
+def test_render_prometheus(scheduler):
+    task = scheduler.every(3600, lambda: None, name='keep-alive')
+    scheduler.every(3600, lambda: None, name='idle')
+    fire(scheduler, task, 1)
+    wait_for(lambda: task.runs == 1 and not task.running)
+
+    text = scheduler.render_prometheus()
+    assert '# TYPE scheduler_task_runs_total counter' in text
+    assert 'scheduler_task_runs_total{task="keep-alive"} 1' in text
+    assert 'scheduler_task_runs_total{task="idle"} 0' in text
+    assert 'scheduler_task_running{task="keep-alive"} 0' in text
+    assert 'scheduler_task_last_duration_seconds{task="keep-alive"}' in text
+    # A task that never ran has no duration yet
+    assert 'scheduler_task_last_duration_seconds{task="idle"}' not in text
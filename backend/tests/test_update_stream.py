@@ -0,0 +1,80 @@
+import threading
+
+from update_stream import RETRY_MILLISECONDS, UpdateBroker, format_event
+
+RETRY = f"retry: {RETRY_MILLISECONDS}\n\n".encode('utf-8')
+
+
+def test_format_event():
+    assert format_event({'generation': 3}, event='leaderboard', event_id=3) == \
+        b'id: 3\nevent: leaderboard\ndata: {"generation":3}\n\n'
+    assert format_event({'a': 1}) == b'data: {"a":1}\n\n'
+
+
+def test_connect_limits_open_streams():
+    broker = UpdateBroker(max_clients=2)
+    assert broker.connect() and broker.connect()
+    assert not broker.connect()
+    broker.disconnect()
+    assert broker.connect()
+    # Extra disconnects never free more slots than were taken
+    for _ in range(5):
+        broker.disconnect()
+    assert broker.clients == 0
+
+
+def test_stream_starts_with_the_current_update():
+    broker = UpdateBroker()
+    broker.publish(7, {'generation': 7})
+    stream = broker.stream(heartbeat=0.01)
+    assert next(stream) == RETRY
+    assert next(stream) == format_event({'generation': 7}, event='leaderboard', event_id=7)
+    stream.close()
+
+
+def test_reconnecting_client_does_not_get_its_last_update_again():
+    broker = UpdateBroker()
+    broker.publish(7, {'generation': 7})
+    stream = broker.stream(last_event_id='7', heartbeat=0.01)
+    assert next(stream) == RETRY
+    assert next(stream) == b": heartbeat\n\n"
+    stream.close()
+
+
+def test_waiting_stream_receives_a_publish():
+    broker = UpdateBroker()
+    stream = broker.stream(heartbeat=10)
+    assert next(stream) == RETRY
+    chunks = []
+    reader = threading.Thread(target=lambda: chunks.append(next(stream)))
+    reader.start()
+    broker.publish(1, {'generation': 1})
+    reader.join(5)
+    assert chunks == [format_event({'generation': 1}, event='leaderboard', event_id=1)]
+    stream.close()
+
+
+def test_slow_stream_only_gets_the_newest_update():
+    broker = UpdateBroker()
+    stream = broker.stream(heartbeat=0.01)
+    assert next(stream) == RETRY
+    # Published while the stream was not waiting: the older update is dropped
+    broker.publish(1, {'generation': 1})
+    broker.publish(2, {'generation': 2})
+    assert next(stream) == format_event({'generation': 2}, event='leaderboard', event_id=2)
+    assert next(stream) == b": heartbeat\n\n"
+    stream.close()
+
+
+def test_stream_closes_after_its_maximum_duration():
+    broker = UpdateBroker()
+    chunks = list(broker.stream(heartbeat=0.01, max_duration=0.05))
+    assert chunks[0] == RETRY
+    assert set(chunks[1:]) == {b": heartbeat\n\n"}
+
+
+def test_wait_times_out_without_updates():
+    broker = UpdateBroker()
+    assert broker.wait(0, 0.01) is None
+    broker.publish(1, {})
+    assert broker.wait(0, 0.01) == (1, (1, {}))
@@ -1,15 +1,37 @@
-import React, { useEffect, useState, useMemo, useCallback } from "react";
+import React, { useEffect, useState, useMemo, useCallback, useRef } from "react";
 import Papa from "papaparse";
 import ReactConfetti from "react-confetti";
 
 // API base URL - we'll set this to the Render deployment URL
 const API_BASE_URL = import.meta.env.VITE_API_URL || "http://localhost:5000";
 
+// Identifies a row across publishes, like row_key in backend/src/changefeed.py
+const rowKey = (row) =>
+  typeof row.profile_url === "string" && row.profile_url ? row.profile_url : `name:${row.name}`;
+
+const toParticipant = (row) => ({
+  name: row["name"] || "Unknown",
+  arcade: parseInt(row["game_badges"]) || 0,
+  specialArcade: parseInt(row["special_game_badges"]) || 0,
+  trivia: parseInt(row["trivia_badges"]) || 0,
+  skill: parseInt(row["skill_badges"]) || 0,
+  labs: parseInt(row["lab_badges"]) || 0,
+  score: parseInt(row["total_points"]) || 0,
+  milestone: row["milestone"] || "None",
+});
+
+// Same order as the published leaderboard: points descending, then name
+const byScore = (a, b) => b.score - a.score || (a.name < b.name ? -1 : a.name > b.name ? 1 : 0);
+
 export default function Leaderboard({ backendAvailable }) {
   const [participants, setParticipants] = useState([]);
   const [selectedParticipant, setSelectedParticipant] = useState(null);
   const [isLoading, setIsLoading] = useState(true);
   const [lastUpdated, setLastUpdated] = useState(null);
+  // Generation of the data on screen, compared with pushed update events
+  const generationRef = useRef(null);
+  // Rows on screen by rowKey, patched with /api/leaderboard/changes
+  const rowsRef = useRef(new Map());
   const [windowDimensions, setWindowDimensions] = useState({
     width: window.innerWidth,
     height: window.innerHeight
@@ -45,18 +67,11 @@ export default function Leaderboard({ backendAvailable }) {
           
           if (response.ok) {
             const jsonData = await response.json();
+            generationRef.current = response.headers.get("X-Leaderboard-Generation");
+            rowsRef.current = new Map(jsonData.map((row) => [rowKey(row), row]));
             setLastUpdated(new Date());
             
-            const processedData = jsonData.map((row) => ({
-              name: row["name"] || "Unknown",
-              arcade: parseInt(row["game_badges"]) || 0,
-              specialArcade: parseInt(row["special_game_badges"]) || 0,
-              trivia: parseInt(row["trivia_badges"]) || 0,
-              skill: parseInt(row["skill_badges"]) || 0,
-              labs: parseInt(row["lab_badges"]) || 0,
-              score: parseInt(row["total_points"]) || 0,
-              milestone: row["milestone"] || "None",
-            }));
+            const processedData = jsonData.map(toParticipant);
   
             const validData = processedData.filter(p => !isNaN(p.score));
             setParticipants(validData);
@@ -101,16 +116,9 @@ export default function Leaderboard({ backendAvailable }) {
         skipEmptyLines: true,
         fastMode: true,
         complete: function (results) {
-          const processedData = results.data.map((row) => ({
-            name: row["name"] || "Unknown",
-            arcade: parseInt(row["game_badges"]) || 0,
-            specialArcade: parseInt(row["special_game_badges"]) || 0,
-            trivia: parseInt(row["trivia_badges"]) || 0,
-            skill: parseInt(row["skill_badges"]) || 0,
-            labs: parseInt(row["lab_badges"]) || 0,
-            score: parseInt(row["total_points"]) || 0,
-            milestone: row["milestone"] || "None",
-          }));
+          // No generation for static files; the next update reloads in full
+          generationRef.current = null;
+          const processedData = results.data.map(toParticipant);
 
           const validData = processedData.filter(p => !isNaN(p.score));
           setParticipants(validData);
@@ -129,22 +137,81 @@ export default function Leaderboard({ backendAvailable }) {
     }
   }, [backendAvailable]);
 
+  // Apply only the rows changed since the generation on screen; fall back
+  // to a full load when there is none or the feed no longer covers it
+  const loadChanges = useCallback(async (abortController) => {
+    if (!backendAvailable || generationRef.current === null) {
+      return loadData(abortController);
+    }
+    try {
+      const response = await fetch(
+        `${API_BASE_URL}/api/leaderboard/changes?since=${encodeURIComponent(generationRef.current)}`,
+        { signal: abortController.signal }
+      );
+      if (!response.ok) {
+        throw new Error(`HTTP ${response.status}`);
+      }
+      const changes = await response.json();
+      const rows = changes.full ? new Map() : new Map(rowsRef.current);
+      if (changes.full) {
+        changes.rows.forEach((row) => rows.set(rowKey(row), row));
+      } else {
+        changes.upserts.forEach((row) => rows.set(rowKey(row), row));
+        changes.removals.forEach((key) => rows.delete(key));
+      }
+      rowsRef.current = rows;
+      generationRef.current = String(changes.generation);
+      setLastUpdated(new Date());
+      setParticipants(Array.from(rows.values(), toParticipant).sort(byScore));
+    } catch (e) {
+      if (!abortController.signal.aborted) {
+        console.log(`Failed to load changes: ${e.message}`);
+        return loadData(abortController);
+      }
+    }
+  }, [backendAvailable, loadData]);
+
   useEffect(() => {
     const abortController = new AbortController();
+    let intervalId = null;
+    let eventSource = null;
     
     // Load data immediately
     loadData(abortController);
     
-    // Set up interval to refresh data every 5 minutes
-    const intervalId = setInterval(() => {
-      loadData(new AbortController());
-    }, 5 * 60 * 1000); // 5 minutes in milliseconds
+    // Refresh data every 5 minutes when updates cannot be pushed
+    const startPolling = () => {
+      if (intervalId === null) {
+        intervalId = setInterval(() => {
+          loadChanges(new AbortController());
+        }, 5 * 60 * 1000); // 5 minutes in milliseconds
+      }
+    };
+    
+    if (backendAvailable && window.EventSource) {
+      // The server announces every publish, so only changed rows are fetched
+      eventSource = new EventSource(`${API_BASE_URL}/api/leaderboard/stream`);
+      eventSource.addEventListener("leaderboard", (event) => {
+        if (event.lastEventId !== generationRef.current) {
+          loadChanges(new AbortController());
+        }
+      });
+      eventSource.onerror = () => {
+        // EventSource reconnects by itself unless the server refused the stream
+        if (eventSource.readyState === EventSource.CLOSED) {
+          startPolling();
+        }
+      };
+    } else {
+      startPolling();
+    }
     
     return () => {
       abortController.abort();
-      clearInterval(intervalId);
+      if (eventSource) eventSource.close();
+      if (intervalId !== null) clearInterval(intervalId);
     };
-  }, [loadData]);
+  }, [loadData, loadChanges, backendAvailable]);
 
   const handleSelectParticipant = useCallback((participant, index) => {
     setSelectedParticipant({ ...participant, rank: index });